@@ -4,52 +4,48 @@ import numpy as np
 import pandas as pd
 
 
-def generate_synthetic_traffic(n=50000):
+def generate_synthetic_traffic(n=50000, seed=None):
+    """Generate n rows, drawing each column as a whole array."""
+    rng = np.random.default_rng(seed)
     peak_hours = [7, 8, 9, 17, 18, 19]  # morning & evening peak
 
     # Define protocols and services with their probabilities
-    protocols = ["TCP", "UDP", "ICMP"]
+    protocols = np.array(["TCP", "UDP", "ICMP"], dtype=object)
     protocol_probs = [0.8, 0.15, 0.05]  # TCP is most common
 
-    services = ["http", "ftp", "ssh", "dns", "smtp", "ntp", "other"]
+    services = np.array(
+        ["http", "ftp", "ssh", "dns", "smtp", "ntp", "other"], dtype=object
+    )
     service_probs = [0.4, 0.1, 0.1, 0.15, 0.1, 0.05, 0.1]  # http is most common
 
-    data = []
-
-    for _ in range(n):
-        hour = np.random.randint(0, 24)
-        is_peak = hour in peak_hours
-
-        duration = np.random.exponential(scale=8 if is_peak else 4)
-        src_bytes = int(np.random.normal(loc=5000 if is_peak else 1000, scale=800))
-        dst_bytes = int(np.random.normal(loc=3000 if is_peak else 700, scale=500))
-        packet_count = np.random.poisson(lam=60 if is_peak else 20)
+    hour = rng.integers(0, 24, size=n)
+    is_peak = np.isin(hour, peak_hours)
 
-        # Generate protocol and service
-        protocol = np.random.choice(protocols, p=protocol_probs)
-        service = np.random.choice(services, p=service_probs)
+    duration = rng.exponential(scale=np.where(is_peak, 8, 4))
+    src_bytes = rng.normal(loc=np.where(is_peak, 5000, 1000), scale=800).astype(int)
+    dst_bytes = rng.normal(loc=np.where(is_peak, 3000, 700), scale=500).astype(int)
+    packet_count = rng.poisson(lam=np.where(is_peak, 60, 20))
 
-        # ICMP doesn't use services
-        if protocol == "ICMP":
-            service = "none"
+    # Generate protocol and service
+    protocol = protocols[rng.choice(len(protocols), size=n, p=protocol_probs)]
+    service = services[rng.choice(len(services), size=n, p=service_probs)]
 
-        congestion = 1 if (is_peak and packet_count > 50) else 0
+    # ICMP doesn't use services
+    service[protocol == "ICMP"] = "none"
 
-        data.append(
-            [
-                duration,
-                max(0, src_bytes),
-                max(0, dst_bytes),
-                packet_count,
-                hour,
-                protocol,
-                service,
-                congestion,
-            ]
-        )
+    congestion = (is_peak & (packet_count > 50)).astype(int)
 
     df = pd.DataFrame(
-        data,
+        {
+            "duration": duration,
+            "src_bytes": np.maximum(0, src_bytes),
+            "dst_bytes": np.maximum(0, dst_bytes),
+            "packet_count": packet_count,
+            "hour": hour,
+            "protocol": protocol,
+            "service": service,
+            "congestion": congestion,
+        },
         columns=pd.Index(
             [
                 "duration",
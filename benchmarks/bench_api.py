@@ -0,0 +1,177 @@
+"""Requests/sec of /api/predict through the Flask test client and a gunicorn server.
+
+The server runs start ``gunicorn -c gunicorn.conf.py`` on a free local port,
+once with the Flask app on gthread workers and once with the micro-batching
+ASGI app, and drive it with keep-alive HTTP connections from a thread pool.
+Run from the project root after training a model:
+
+    python -m benchmarks.bench_api --n 2000 --workers 2 --concurrency 8
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+import yaml
+
+from benchmarks.common import (
+    PROJECT_ROOT,
+    load_records,
+    make_config,
+    summarize,
+    time_calls,
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_test_client(records: List[Dict[str, Any]]) -> dict:
+    """In-process throughput: Flask routing and JSON, no network."""
+    from web.app import app
+
+    client = app.test_client()
+    latencies = time_calls(
+        lambda record: client.post("/api/predict", json=record), records
+    )
+    return {"rps": len(records) / latencies.sum(), **summarize(latencies)}
+
+
+def _client_worker(port: int, payloads: List[bytes]) -> np.ndarray:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    latencies = np.empty(len(payloads))
+    try:
+        for i, body in enumerate(payloads):
+            start = time.perf_counter()
+            connection.request("POST", "/api/predict", body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            latencies[i] = time.perf_counter() - start
+            if response.status != 200:
+                raise RuntimeError(f"/api/predict returned {response.status}")
+    finally:
+        connection.close()
+    return latencies
+
+
+def run_server(
+    records: List[Dict[str, Any]],
+    workers: int,
+    threads: int,
+    concurrency: int,
+    asgi: bool = False,
+) -> dict:
+    """End-to-end throughput against a preloaded multi-worker gunicorn."""
+    port = _free_port()
+    with open(PROJECT_ROOT / "core" / "config.yaml", "r") as f:
+        server_config = (yaml.safe_load(f) or {}).get("server") or {}
+    config = make_config(
+        model_reload={"enabled": False}, server={**server_config, "asgi": asgi}
+    )
+    env = {**os.environ, "MODEL_CONFIG": config}
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "--threads",
+            str(threads),
+            "--access-logfile",
+            "/dev/null",
+        ],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            try:
+                connection.request("GET", "/readyz")
+                if connection.getresponse().status == 200:
+                    break
+            except OSError:
+                pass
+            finally:
+                connection.close()
+            if server.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("gunicorn did not become ready")
+            time.sleep(0.1)
+
+        payloads = [json.dumps(record).encode() for record in records]
+        chunks = [payloads[i::concurrency] for i in range(concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = np.concatenate(
+                list(pool.map(lambda chunk: _client_worker(port, chunk), chunks))
+            )
+        elapsed = time.perf_counter() - start
+    finally:
+        # SIGINT is gunicorn's quick shutdown; no need to drain idle keep-alives
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=30)
+
+    return {
+        "rps": len(records) / elapsed,
+        "workers": workers,
+        "threads": 1 if asgi else threads,
+        "concurrency": concurrency,
+        **summarize(latencies),
+    }
+
+
+def run(
+    n: int = 2000,
+    workers: int = 2,
+    threads: int = 4,
+    concurrency: int = 8,
+    server: bool = True,
+) -> dict:
+    records = load_records(n)
+    results = {"test_client": run_test_client(records)}
+    if server:
+        results["gunicorn"] = run_server(records, workers, threads, concurrency)
+        results["gunicorn_asgi"] = run_server(
+            records, workers, threads, concurrency, asgi=True
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=2000, help="Requests per run.")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--no-server", action="store_true", help="Test client only.")
+    args = parser.parse_args()
+
+    results = run(
+        args.n, args.workers, args.threads, args.concurrency, not args.no_server
+    )
+    for name, stats in results.items():
+        print(
+            f"{name:>13}: {stats['rps']:8.0f} req/s  p50 {stats['p50_us']:8.1f} us  "
+            f"p99 {stats['p99_us']:8.1f} us"
+        )
@@ -0,0 +1,44 @@
+"""Single-record latency of the sklearn pipeline vs the compiled engine.
+
+Run from the project root after training a model:
+
+    python -m benchmarks.bench_compiled --n 2000
+"""
+
+import argparse
+
+from benchmarks.common import load_records, make_config, summarize, time_calls
+from core.predictor import TrafficPredictor
+
+
+def run(n: int = 2000) -> dict:
+    records = load_records(n)
+    results = {}
+    for engine in ("sklearn", "compiled"):
+        predictor = TrafficPredictor(config_path=make_config(inference_engine=engine))
+        results[engine] = summarize(time_calls(predictor.predict, records))
+    results["speedup_p50"] = (
+        results["sklearn"]["p50_us"] / results["compiled"]["p50_us"]
+    )
+    results["speedup_p99"] = (
+        results["sklearn"]["p99_us"] / results["compiled"]["p99_us"]
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=2000, help="Number of predictions.")
+    args = parser.parse_args()
+
+    results = run(args.n)
+    for engine in ("sklearn", "compiled"):
+        stats = results[engine]
+        print(
+            f"{engine:>9}: p50 {stats['p50_us']:8.1f} us  "
+            f"p99 {stats['p99_us']:8.1f} us  mean {stats['mean_us']:8.1f} us"
+        )
+    print(
+        f"  speedup: p50 x{results['speedup_p50']:.1f}  "
+        f"p99 x{results['speedup_p99']:.1f}"
+    )
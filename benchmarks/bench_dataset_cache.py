@@ -0,0 +1,43 @@
+"""Training data load time: CSV parsing vs the columnar dataset cache.
+
+python -m benchmarks.bench_dataset_cache
+"""
+
+import tempfile
+import time
+
+from benchmarks.common import DATA_PATH
+from core.data_loader import concat_chunks, iter_chunks
+from core.dataset_cache import DatasetCache
+
+
+def run(repeats: int = 5) -> dict:
+    def best_of(fn) -> float:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DatasetCache(cache_dir)
+        start = time.perf_counter()
+        cache.load(DATA_PATH)
+        build = time.perf_counter() - start
+
+        return {
+            "csv_seconds": best_of(lambda: concat_chunks(iter_chunks(DATA_PATH))),
+            "cache_build_seconds": build,
+            "cache_load_seconds": best_of(lambda: cache.load(DATA_PATH)),
+        }
+
+
+if __name__ == "__main__":
+    results = run()
+    print(f"       csv parse: {results['csv_seconds'] * 1e3:8.1f} ms")
+    print(f"     cache build: {results['cache_build_seconds'] * 1e3:8.1f} ms")
+    print(f"      cache load: {results['cache_load_seconds'] * 1e3:8.1f} ms")
+    print(
+        f"         speedup: x{results['csv_seconds'] / results['cache_load_seconds']:.0f}"
+    )
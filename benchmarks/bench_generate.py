@@ -0,0 +1,45 @@
+"""Rows per second of the synthetic traffic generator, in memory and to CSV.
+
+python -m benchmarks.bench_generate --rows 100000 1000000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Sequence
+
+from benchmarks.common import PROJECT_ROOT  # noqa: F401  (puts the root on sys.path)
+from generate_data import generate_synthetic_traffic
+
+ROW_COUNTS = (100_000, 1_000_000)
+
+
+def run(row_counts: Sequence[int] = ROW_COUNTS) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in row_counts:
+            start = time.perf_counter()
+            df = generate_synthetic_traffic(n, seed=0)
+            generated = time.perf_counter()
+            df.to_csv(Path(tmp_dir) / "data.csv", index=False)
+            written = time.perf_counter()
+            results[str(n)] = {
+                "generate_seconds": generated - start,
+                "generate_rows_per_s": n / (generated - start),
+                "csv_seconds": written - generated,
+                "csv_rows_per_s": n / (written - generated),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=list(ROW_COUNTS))
+    args = parser.parse_args()
+
+    for n, stats in run(args.rows).items():
+        print(
+            f"{int(n):>10,} rows: generate {stats['generate_rows_per_s']:12,.0f} rows/s"
+            f"  csv {stats['csv_rows_per_s']:12,.0f} rows/s"
+        )
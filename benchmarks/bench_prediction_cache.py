@@ -0,0 +1,72 @@
+"""Latency and hit ratio of the prediction cache on repetitive traffic.
+
+The workload replays a small pool of flows with small jitter on the byte
+counts, mimicking repeated (protocol, service, hour) combinations. Run from
+the project root after training a model:
+
+    python -m benchmarks.bench_prediction_cache --n 5000 --pool 200
+"""
+
+import argparse
+
+import numpy as np
+
+from benchmarks.common import load_records, make_config, summarize, time_calls
+from core.predictor import TrafficPredictor
+
+QUANTIZE = {"src_bytes": 50, "dst_bytes": 50, "duration": 0.5}
+
+
+def repetitive_records(n: int, pool: int, jitter: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    base = load_records(pool, seed=seed)
+    records = []
+    for i in rng.integers(0, pool, size=n):
+        record = dict(base[i])
+        for name in ("src_bytes", "dst_bytes"):
+            record[name] = int(record[name] + rng.integers(-jitter, jitter + 1))
+        records.append(record)
+    return records
+
+
+def run(n: int = 5000, pool: int = 200, jitter: int = 10) -> dict:
+    records = repetitive_records(n, pool, jitter)
+    variants = {
+        "sklearn": dict(inference_engine="sklearn"),
+        "sklearn+cache": dict(
+            inference_engine="sklearn",
+            prediction_cache={"enabled": True, "quantize": QUANTIZE},
+        ),
+        "compiled": dict(inference_engine="compiled"),
+        "compiled+exact": dict(
+            inference_engine="compiled", prediction_cache={"enabled": True}
+        ),
+        "compiled+cache": dict(
+            inference_engine="compiled",
+            prediction_cache={"enabled": True, "quantize": QUANTIZE},
+        ),
+    }
+    results = {}
+    for name, overrides in variants.items():
+        predictor = TrafficPredictor(config_path=make_config(**overrides))
+        stats = summarize(time_calls(predictor.predict, records, warmup=0))
+        stats["hit_ratio"] = (
+            predictor.cache.stats()["hit_ratio"] if predictor.cache else 0.0
+        )
+        results[name] = stats
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=5000, help="Number of predictions.")
+    parser.add_argument("--pool", type=int, default=200, help="Distinct base flows.")
+    parser.add_argument("--jitter", type=int, default=10, help="Byte count jitter.")
+    args = parser.parse_args()
+
+    for name, stats in run(args.n, args.pool, args.jitter).items():
+        print(
+            f"{name:>15}: p50 {stats['p50_us']:8.1f} us  "
+            f"p99 {stats['p99_us']:8.1f} us  mean {stats['mean_us']:8.1f} us  "
+            f"hit ratio {stats['hit_ratio']:.1%}"
+        )
@@ -0,0 +1,84 @@
+"""Single-record latency and batch throughput of TrafficPredictor.
+
+Run from the project root after training a model:
+
+    python -m benchmarks.bench_predictor --engine compiled
+    python -m benchmarks.bench_predictor --engine sklearn --backend process
+"""
+
+import argparse
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+
+from benchmarks.common import load_records, make_config, summarize, time_calls
+from core.predictor import TrafficPredictor
+
+BATCH_SIZES = (1, 100, 1000, 10000)
+
+
+def run(
+    engine: Optional[str] = None,
+    n: int = 2000,
+    batch_sizes: Sequence[int] = BATCH_SIZES,
+    repeats: int = 5,
+    backend: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    overrides = {"model_reload": {"enabled": False}}
+    if engine:
+        overrides["inference_engine"] = engine
+    if backend:
+        overrides["executor"] = {"backend": backend, "workers": workers}
+    predictor = TrafficPredictor(config_path=make_config(**overrides))
+
+    results = {
+        "engine": predictor.metric_samples()["model_info"][0][0]["engine"],
+        "backend": predictor.backend.name,
+        "single": summarize(time_calls(predictor.predict, load_records(n))),
+        "batch": {},
+    }
+    for size in batch_sizes:
+        records = load_records(size, seed=size)
+        predictor.predict_batch(records)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predictor.predict_batch(records)
+            timings.append(time.perf_counter() - start)
+        seconds = float(np.median(timings))
+        results["batch"][str(size)] = {
+            "ms": seconds * 1e3,
+            "rows_per_s": size / seconds,
+        }
+    predictor.backend.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=["sklearn", "flat", "compiled"])
+    parser.add_argument("--n", type=int, default=2000, help="Single predictions.")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per batch size.")
+    parser.add_argument("--backend", choices=["inline", "thread", "process"])
+    parser.add_argument("--workers", type=int, help="Pool size (default: CPU count).")
+    args = parser.parse_args()
+
+    results = run(
+        args.engine,
+        args.n,
+        repeats=args.repeats,
+        backend=args.backend,
+        workers=args.workers,
+    )
+    single = results["single"]
+    print(
+        f"{results['engine']} ({results['backend']}) single: p50 {single['p50_us']:.1f} us  "
+        f"p99 {single['p99_us']:.1f} us"
+    )
+    for size, stats in results["batch"].items():
+        print(
+            f"  batch {size:>6}: {stats['ms']:9.2f} ms  "
+            f"{stats['rows_per_s']:12,.0f} rows/s"
+        )
@@ -0,0 +1,45 @@
+"""Hyperparameter search wall time and ROC AUC: grid vs successive halving.
+
+python -m benchmarks.bench_search
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_config
+from core.trainer import TrafficModelTrainer
+
+DATA_FILE = "assets/datasets/synthetic_network_data.csv"
+STRATEGIES = {
+    "grid": {"strategy": "grid"},
+    "halving": {"strategy": "halving", "resource": "n_samples"},
+    "halving+early_stop": {
+        "strategy": "halving",
+        "resource": "n_samples",
+        "early_stopping": True,
+    },
+}
+
+
+def run() -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        for name, search in STRATEGIES.items():
+            trainer = TrafficModelTrainer(
+                config_path=make_config(
+                    model_path=str(Path(model_dir) / "model.pkl"), search=search
+                )
+            )
+            start = time.perf_counter()
+            metrics = trainer.train(DATA_FILE)
+            results[name] = {
+                "seconds": time.perf_counter() - start,
+                "roc_auc": metrics["roc_auc"],
+            }
+    return results
+
+
+if __name__ == "__main__":
+    for name, stats in run().items():
+        print(f"{name:>20}: {stats['seconds']:7.2f} s  roc_auc {stats['roc_auc']:.4f}")
@@ -0,0 +1,83 @@
+"""Cold-start cost of the predictor: import, model load and first prediction.
+
+Every variant runs in fresh interpreters, so nothing is cached between runs.
+Run from the project root after training a model:
+
+    python -m benchmarks.bench_startup --repeat 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.common import PROJECT_ROOT, make_config
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from core.predictor import TrafficPredictor, WARM_UP_RECORD
+imported = time.perf_counter()
+predictor = TrafficPredictor(config_path={config!r})
+loaded = time.perf_counter()
+predictor.predict(WARM_UP_RECORD)
+first = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1e3,
+    "load_ms": (loaded - imported) * 1e3,
+    "first_prediction_ms": (first - loaded) * 1e3,
+    "total_ms": (first - start) * 1e3,
+    "sklearn_imported": "sklearn" in sys.modules,
+    "pandas_imported": "pandas" in sys.modules,
+}}))
+"""
+
+
+def measure(config: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(config=config)],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    result = {
+        key: float(np.median([run[key] for run in runs]))
+        for key in ("import_ms", "load_ms", "first_prediction_ms", "total_ms")
+    }
+    result["sklearn_imported"] = runs[0]["sklearn_imported"]
+    result["pandas_imported"] = runs[0]["pandas_imported"]
+    return result
+
+
+def run(repeat: int = 5) -> dict:
+    variants = {
+        "pickle+sklearn": make_config(
+            inference_engine="sklearn", compiled_model_path=None
+        ),
+        "pickle+compiled": make_config(
+            inference_engine="compiled", compiled_model_path=None
+        ),
+        "npz+compiled": make_config(inference_engine="compiled"),
+    }
+    return {name: measure(config, repeat) for name, config in variants.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh runs each.")
+    args = parser.parse_args()
+
+    for name, stats in run(args.repeat).items():
+        print(
+            f"{name:>15}: import {stats['import_ms']:7.1f} ms  "
+            f"load {stats['load_ms']:7.1f} ms  "
+            f"first {stats['first_prediction_ms']:6.1f} ms  "
+            f"total {stats['total_ms']:7.1f} ms  "
+            f"(sklearn {stats['sklearn_imported']}, pandas {stats['pandas_imported']})"
+        )
@@ -0,0 +1,49 @@
+"""Wall time of TrafficModelTrainer.train with and without grid search.
+
+python -m benchmarks.bench_training [--skip-grid]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_config
+from core.trainer import TrafficModelTrainer
+
+DATA_FILE = "assets/datasets/synthetic_network_data.csv"
+
+
+def run(grid: bool = True) -> dict:
+    variants = {"fit": {"grid_search_params": None}}
+    if grid:
+        variants["grid_search"] = {}
+
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        for name, overrides in variants.items():
+            trainer = TrafficModelTrainer(
+                config_path=make_config(
+                    model_path=str(Path(model_dir) / f"{name}.pkl"), **overrides
+                )
+            )
+            start = time.perf_counter()
+            metrics = trainer.train(DATA_FILE)
+            results[name] = {
+                "seconds": time.perf_counter() - start,
+                "roc_auc": metrics["roc_auc"],
+                "f1": metrics["f1"],
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skip-grid", action="store_true", help="Only the plain fit.")
+    args = parser.parse_args()
+
+    for name, stats in run(grid=not args.skip_grid).items():
+        print(
+            f"{name:>12}: {stats['seconds']:7.2f} s  "
+            f"roc_auc {stats['roc_auc']:.4f}  f1 {stats['f1']:.4f}"
+        )
@@ -0,0 +1,47 @@
+"""Training time and accuracy of the GradientBoosting vs HistGradientBoosting backends.
+
+python -m benchmarks.bench_training_backends [--grid]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import make_config
+from core.trainer import TrafficModelTrainer
+
+DATA_FILE = "assets/datasets/synthetic_network_data.csv"
+BACKENDS = ("gradient_boosting", "hist_gradient_boosting")
+
+
+def run(grid: bool = False) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        for backend in BACKENDS:
+            overrides = {
+                "model_type": backend,
+                "model_path": str(Path(model_dir) / f"{backend}.pkl"),
+            }
+            if not grid:
+                overrides.update(grid_search_params=None, hist_grid_search_params=None)
+            trainer = TrafficModelTrainer(config_path=make_config(**overrides))
+
+            start = time.perf_counter()
+            metrics = trainer.train(DATA_FILE)
+            results[backend] = {"seconds": time.perf_counter() - start, **metrics}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--grid", action="store_true", help="Include the configured grid search."
+    )
+    args = parser.parse_args()
+
+    for backend, stats in run(grid=args.grid).items():
+        print(
+            f"{backend:>22}: {stats['seconds']:7.2f} s  "
+            f"accuracy {stats['accuracy']:.4f}  roc_auc {stats['roc_auc']:.4f}"
+        )
@@ -0,0 +1,44 @@
+"""Batch scoring throughput of the sklearn, flat and compiled engines.
+
+Run from the project root after training a model:
+
+    python -m benchmarks.bench_tree_ensemble --batch-size 10000
+"""
+
+import argparse
+import time
+
+from benchmarks.common import load_records, make_config
+from core.predictor import TrafficPredictor
+
+ENGINES = ("sklearn", "flat", "compiled")
+
+
+def run(batch_size: int = 10000, repeats: int = 5) -> dict:
+    records = load_records(batch_size)
+    results = {}
+    for engine in ENGINES:
+        predictor = TrafficPredictor(config_path=make_config(inference_engine=engine))
+        predictor.max_batch_size = batch_size
+        predictor.predict_batch(records[:100])
+
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predictor.predict_batch(records)
+            best = min(best, time.perf_counter() - start)
+        results[engine] = {"seconds": best, "rows_per_sec": batch_size / best}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for engine, stats in run(args.batch_size, args.repeats).items():
+        print(
+            f"{engine:>9}: {stats['seconds'] * 1e3:8.1f} ms  "
+            f"{stats['rows_per_sec']:12,.0f} rows/s"
+        )
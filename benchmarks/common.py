@@ -0,0 +1,77 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DEFAULT_CONFIG = PROJECT_ROOT / "core" / "config.yaml"
+DATA_PATH = PROJECT_ROOT / "assets" / "datasets" / "synthetic_network_data.csv"
+
+# Holds make_config's files; removed when the benchmark process exits
+_config_dir: Optional[tempfile.TemporaryDirectory] = None
+
+
+def load_records(n: int = 1000, seed: int = 0) -> List[Dict[str, Any]]:
+    """Sample raw feature records from the bundled dataset."""
+    df = pd.read_csv(DATA_PATH).drop("congestion", axis=1)
+    return df.sample(n, random_state=seed, replace=n > len(df)).to_dict("records")
+
+
+def make_config(**overrides: Any) -> str:
+    """Write a copy of the project config with overrides to a temp file.
+
+    The file lives in a directory owned by this process and deleted on exit,
+    so child processes given its path can read it while the benchmark runs.
+    """
+    global _config_dir
+    with open(DEFAULT_CONFIG, "r") as f:
+        config = yaml.safe_load(f)
+    config.update(overrides)
+    # A benchmark model saved elsewhere must not overwrite the project's export
+    if "model_path" in overrides and "compiled_model_path" not in overrides:
+        config["compiled_model_path"] = str(
+            Path(overrides["model_path"]).with_suffix(".npz")
+        )
+    # Keep relative paths such as model_path pointing into the project
+    for key in ("model_path", "compiled_model_path"):
+        if config.get(key) and not Path(config[key]).is_absolute():
+            config[key] = str(PROJECT_ROOT / config[key])
+
+    if _config_dir is None:
+        _config_dir = tempfile.TemporaryDirectory(prefix="bench-config-")
+    handle = tempfile.NamedTemporaryFile(
+        "w", suffix=".yaml", dir=_config_dir.name, delete=False
+    )
+    with handle:
+        yaml.safe_dump(config, handle)
+    return handle.name
+
+
+def time_calls(
+    fn: Callable[[Any], Any], inputs: List[Any], warmup: int = 20
+) -> np.ndarray:
+    """Time fn on every input, returning per-call latencies in seconds."""
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = np.empty(len(inputs))
+    for i, item in enumerate(inputs):
+        start = time.perf_counter()
+        fn(item)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def summarize(latencies: np.ndarray) -> Dict[str, float]:
+    """p50/p99/mean latency in microseconds."""
+    return {
+        "p50_us": float(np.percentile(latencies, 50) * 1e6),
+        "p99_us": float(np.percentile(latencies, 99) * 1e6),
+        "mean_us": float(latencies.mean() * 1e6),
+    }
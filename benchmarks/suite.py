@@ -0,0 +1,231 @@
+"""Run the benchmark suite, save the results as JSON and compare two runs.
+
+Run from the project root after training a model:
+
+    python -m benchmarks.suite                      # full run
+    python -m benchmarks.suite --quick --only predictor api
+    python -m benchmarks.suite --compare baseline.json candidate.json
+
+Each run is written to ``benchmarks/results/<timestamp>-<commit>.json``
+unless ``--output`` is given. ``--baseline`` compares the new run against an
+earlier file; a comparison exits with status 1 when any metric regressed by
+more than ``--threshold``.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.common import PROJECT_ROOT
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+# name -> (module, kwargs for a full run, kwargs for --quick)
+BENCHMARKS: Dict[str, Tuple[str, Dict[str, Any], Dict[str, Any]]] = {
+    "predictor_compiled": (
+        "benchmarks.bench_predictor",
+        {"engine": "compiled"},
+        {"engine": "compiled", "n": 500, "batch_sizes": (1, 100, 1000), "repeats": 2},
+    ),
+    "predictor_sklearn": (
+        "benchmarks.bench_predictor",
+        {"engine": "sklearn"},
+        {"engine": "sklearn", "n": 200, "batch_sizes": (1, 100, 1000), "repeats": 2},
+    ),
+    "predictor_process": (
+        "benchmarks.bench_predictor",
+        {"engine": "sklearn", "backend": "process"},
+        {
+            "engine": "sklearn",
+            "backend": "process",
+            "n": 200,
+            "batch_sizes": (1000, 10000),
+            "repeats": 2,
+        },
+    ),
+    "api": (
+        "benchmarks.bench_api",
+        {},
+        {"n": 300, "workers": 2, "concurrency": 4},
+    ),
+    "startup": ("benchmarks.bench_startup", {}, {"repeat": 2}),
+    "training": ("benchmarks.bench_training", {}, {"grid": False}),
+    "generate": ("benchmarks.bench_generate", {}, {"row_counts": (100_000,)}),
+}
+
+# Metric names (or ``_``-separated suffixes, as in ``p50_us``) where a larger
+# value is an improvement, and timings where a smaller one is
+HIGHER_IS_BETTER = ("rps", "rows_per_s", "speedup", "hit_ratio", "roc_auc", "f1")
+LOWER_IS_BETTER = ("us", "ms", "seconds")
+
+
+def _version(module: str) -> Optional[str]:
+    try:
+        return importlib.import_module(module).__version__
+    except ImportError:
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Where and on what a run happened, so results are comparable."""
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": _version("numpy"),
+        "pandas": _version("pandas"),
+        "sklearn": _version("sklearn"),
+    }
+
+
+def run_suite(names: List[str], quick: bool = False) -> Dict[str, Any]:
+    results = {}
+    for name in names:
+        module, full, reduced = BENCHMARKS[name]
+        print(f"running {name} ...", file=sys.stderr)
+        start = time.perf_counter()
+        results[name] = importlib.import_module(module).run(
+            **(reduced if quick else full)
+        )
+        print(
+            f"  done in {time.perf_counter() - start:.1f}s", file=sys.stderr, flush=True
+        )
+    return {"meta": {**environment(), "quick": quick}, "results": results}
+
+
+def flatten(tree: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by their dotted path."""
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def direction(path: str) -> int:
+    """+1 if larger is better, -1 if smaller is better, 0 if not a metric."""
+    leaf = path.rsplit(".", 1)[-1]
+    for sign, names in ((1, HIGHER_IS_BETTER), (-1, LOWER_IS_BETTER)):
+        if any(leaf == name or leaf.endswith(f"_{name}") for name in names):
+            return sign
+    return 0
+
+
+def compare(
+    baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float = 0.15
+) -> List[Dict[str, Any]]:
+    """Relative change of every metric present in both runs.
+
+    ``change`` is signed so that positive means better; a row is a regression
+    when it got worse by more than ``threshold``.
+    """
+    old = flatten(baseline["results"])
+    new = flatten(candidate["results"])
+    rows = []
+    for path in sorted(old.keys() & new.keys()):
+        sign = direction(path)
+        if sign == 0 or old[path] == 0:
+            continue
+        change = sign * (new[path] - old[path]) / abs(old[path])
+        rows.append(
+            {
+                "metric": path,
+                "baseline": old[path],
+                "candidate": new[path],
+                "change": change,
+                "regression": change < -threshold,
+            }
+        )
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], out: Callable = print) -> None:
+    width = max((len(row["metric"]) for row in rows), default=10)
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        out(
+            f"{row['metric']:<{width}}  {row['baseline']:>14.4g}  "
+            f"{row['candidate']:>14.4g}  {row['change']:>+8.1%}{flag}"
+        )
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run."
+    )
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs.")
+    parser.add_argument("--output", help="Where to write the results JSON.")
+    parser.add_argument("--baseline", help="Compare the new run to this results file.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CANDIDATE"),
+        help="Compare two saved results files without running anything.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="Relative slowdown that counts as a regression (default 0.15).",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, candidate = (_load(path) for path in args.compare)
+    else:
+        candidate = run_suite(args.only or list(BENCHMARKS), quick=args.quick)
+        output = args.output
+        if output is None:
+            RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            output = RESULTS_DIR / f"{stamp}-{candidate['meta']['commit']}.json"
+        with open(output, "w") as f:
+            json.dump(candidate, f, indent=2)
+        print(f"results written to {output}")
+        if not args.baseline:
+            return 0
+        baseline = _load(args.baseline)
+
+    rows = compare(baseline, candidate, args.threshold)
+    print_comparison(rows)
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(
+            f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import abc
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+BACKENDS = ("inline", "thread", "process")
+
+
+def predict_encoded(state: Any, X: np.ndarray) -> np.ndarray:
+    """P(congestion) from an encoded feature matrix with a model state's scorer."""
+    if state.ensemble is not None:
+        return state.ensemble.predict_proba(X)[:, 1]
+    return np.asarray(state.pipeline[-1].predict_proba(X), dtype=np.float64)[:, 1]
+
+
+class InlineBackend:
+    """Score on the calling thread."""
+
+    name = "inline"
+
+    def predict_proba(self, X: np.ndarray, state: Any) -> np.ndarray:
+        return predict_encoded(state, X)
+
+    def close(self) -> None:
+        pass
+
+
+class _PoolBackend(abc.ABC):
+    """Split large batches into row chunks scored on a lazily started pool.
+
+    Batches smaller than ``min_rows`` are scored inline, since handing them to
+    the pool would cost more than it saves; larger ones are cut into at most
+    ``workers`` chunks of at least ``min_rows`` rows. The pool is created on
+    first use in each process, so a predictor built in a gunicorn master
+    before ``fork`` does not hand its workers a pool they cannot use.
+    """
+
+    name = ""
+
+    def __init__(self, workers: Optional[int] = None, min_rows: int = 512):
+        if min_rows <= 0:
+            raise ValueError("min_rows must be positive")
+        self.workers = int(workers or multiprocessing.cpu_count())
+        self.min_rows = min_rows
+        self._pool: Optional[Executor] = None
+        self._pool_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _make_pool(self) -> Executor:
+        """A new pool for this process."""
+
+    def _get_pool(self) -> Executor:
+        if self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool_pid != os.getpid():
+                    self._pool = self._make_pool()
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _chunks(self, n_rows: int) -> List[Tuple[int, int]]:
+        n_chunks = max(1, min(self.workers, n_rows // self.min_rows))
+        size = math.ceil(n_rows / n_chunks)
+        return [(start, min(start + size, n_rows)) for start in range(0, n_rows, size)]
+
+    def close(self) -> None:
+        """Shut the pool down; it is restarted if the backend is used again."""
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+            self._pool_pid = None
+
+
+class ThreadPoolBackend(_PoolBackend):
+    """Score chunks on threads; helps where the model releases the GIL."""
+
+    name = "thread"
+
+    def _make_pool(self) -> Executor:
+        return ThreadPoolExecutor(self.workers, thread_name_prefix="scoring")
+
+    def predict_proba(self, X: np.ndarray, state: Any) -> np.ndarray:
+        if len(X) < self.min_rows:
+            return predict_encoded(state, X)
+        pool = self._get_pool()
+        futures = [
+            pool.submit(predict_encoded, state, X[start:stop])
+            for start, stop in self._chunks(len(X))
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+
+class ModelVersionMismatch(RuntimeError):
+    """A pool worker could not load the model version the caller is serving."""
+
+
+# The model state of a ProcessPoolBackend worker
+_worker_predictor = None
+
+
+def _init_worker(config_path: str, model_ref: Optional[str]) -> None:
+    global _worker_predictor
+    from core.predictor import TrafficPredictor
+
+    _worker_predictor = TrafficPredictor(config_path=config_path, model_ref=model_ref)
+
+
+def _score_shared(
+    name: str, shape: Tuple[int, int], start: int, stop: int, sha256: str
+) -> None:
+    """Score rows ``start:stop`` of the shared matrix into the shared output."""
+    state = _worker_predictor._state
+    if state.sha256 != sha256:
+        # The front end reloaded a new model; follow it
+        state = _worker_predictor._load_state()
+        _worker_predictor._state = state
+        if state.sha256 != sha256:
+            raise ModelVersionMismatch(
+                f"worker loaded model {state.sha256[:12]}, expected {sha256[:12]}"
+            )
+
+    offset = shape[0] * shape[1] * np.dtype(np.float64).itemsize
+    block = SharedMemory(name=name)
+    try:
+        # No view of the block may outlive it, not even in a traceback, so
+        # the model scores a private copy of its rows
+        rows = np.ndarray(shape, dtype=np.float64, buffer=block.buf)[start:stop].copy()
+        probabilities = predict_encoded(state, rows)
+        out = np.ndarray((shape[0],), dtype=np.float64, buffer=block.buf, offset=offset)
+        out[start:stop] = probabilities
+        del out
+    finally:
+        block.close()
+
+
+class ProcessPoolBackend(_PoolBackend):
+    """Score chunks in worker processes that each load the model once.
+
+    The encoded batch is copied into one ``multiprocessing.shared_memory``
+    block followed by room for the probabilities. Workers map the block, read
+    their rows and write the probabilities back into it, so only the block's
+    name and row bounds are pickled. Each task carries the caller's model hash; a
+    worker holding another version reloads the model file first. If it still
+    differs, because the file changed again, the batch is scored inline.
+    Workers are spawned rather than forked, so they never inherit the locks
+    of a threaded server. They serve the same ``model_ref`` as the caller,
+    which may differ from the config's ``registry.serve``.
+    """
+
+    name = "process"
+
+    def __init__(
+        self,
+        config_path: str,
+        workers: Optional[int] = None,
+        min_rows: int = 512,
+        model_ref: Optional[str] = None,
+    ):
+        super().__init__(workers, min_rows)
+        self.config_path = config_path
+        self.model_ref = model_ref
+
+    def _make_pool(self) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.config_path, self.model_ref),
+        )
+
+    def predict_proba(self, X: np.ndarray, state: Any) -> np.ndarray:
+        if len(X) < self.min_rows:
+            return predict_encoded(state, X)
+        pool = self._get_pool()
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        block = SharedMemory(create=True, size=X.nbytes + len(X) * 8)
+        try:
+            np.ndarray(X.shape, dtype=np.float64, buffer=block.buf)[:] = X
+            futures = [
+                pool.submit(
+                    _score_shared, block.name, X.shape, start, stop, state.sha256
+                )
+                for start, stop in self._chunks(len(X))
+            ]
+            # Let every chunk finish before the block is released
+            wait(futures)
+            try:
+                for future in futures:
+                    future.result()
+            except ModelVersionMismatch as e:
+                logger.warning(f"Scoring batch inline: {e}")
+                return predict_encoded(state, X)
+            return np.ndarray(
+                (len(X),), dtype=np.float64, buffer=block.buf, offset=X.nbytes
+            ).copy()
+        finally:
+            block.close()
+            block.unlink()
+
+
+def build_backend(
+    settings: Dict[str, Any], config_path: str, model_ref: Optional[str] = None
+) -> Any:
+    """The scoring backend selected by the ``executor`` config section."""
+    backend = settings.get("backend", "inline")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown executor backend {backend!r}; expected {BACKENDS}")
+    if backend == "inline":
+        return InlineBackend()
+    workers = settings.get("workers")
+    min_rows = int(settings.get("min_rows", 512))
+    if backend == "thread":
+        return ThreadPoolBackend(workers, min_rows)
+    return ProcessPoolBackend(config_path, workers, min_rows, model_ref)
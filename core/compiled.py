@@ -0,0 +1,268 @@
+import io
+import json
+import math
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from core.tree_ensemble import FlatTreeEnsemble
+
+# Bump when the .npz layout written by CompiledPipeline.save changes
+EXPORT_FORMAT_VERSION = 1
+
+
+class CompiledPipeline:
+    """Pandas-free scorer compiled from a fitted congestion pipeline.
+
+    At build time the fitted StandardScaler statistics, OneHotEncoder
+    categories, SelectKBest mask and GradientBoosting trees are pulled out of
+    the sklearn ``Pipeline``. Scoring a record then writes straight from the
+    input dict into a preallocated row holding only the selected features and
+    evaluates the trees with a ``FlatTreeEnsemble``, skipping the DataFrame
+    build, column reindexing and estimator dispatch of
+    ``pipeline.predict_proba``.
+
+    ``save`` exports the compiled parameters as a NumPy ``.npz`` archive that
+    ``load`` reads back with only NumPy, so a server can start scoring without
+    importing sklearn or pandas or unpickling the pipeline.
+    """
+
+    def __init__(
+        self,
+        numerical: List[Tuple[str, float, float, int]],
+        categorical: List[Tuple[str, Dict[str, int]]],
+        n_features: int,
+        ensemble: FlatTreeEnsemble,
+    ):
+        self.numerical_names = [name for name, _, _, _ in numerical]
+        self.numerical_mean = np.array(
+            [m for _, m, _, _ in numerical], dtype=np.float64
+        )
+        self.numerical_scale = np.array(
+            [s for _, _, s, _ in numerical], dtype=np.float64
+        )
+        self.numerical_pos = np.array([p for _, _, _, p in numerical], dtype=np.intp)
+        self.categorical = categorical
+        self.categorical_pos = np.array(
+            sorted(p for _, lookup in categorical for p in lookup.values()),
+            dtype=np.intp,
+        )
+        self.input_features = self.numerical_names + [name for name, _ in categorical]
+        self.n_features = n_features
+
+        self.ensemble = ensemble
+
+        self._local = threading.local()
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Any) -> "CompiledPipeline":
+        """Extract the fitted parameters needed for scoring from a pipeline."""
+        steps = getattr(pipeline, "named_steps", None)
+        if not steps or "preprocessor" not in steps or "model" not in steps:
+            raise TypeError("Expected a fitted preprocessor/selector/model Pipeline")
+
+        preprocessor = steps["preprocessor"]
+        ensemble = FlatTreeEnsemble.from_model(steps["model"])
+
+        # Lay out the preprocessor's output columns as (kind, input, detail)
+        columns: List[Tuple[str, str, Any]] = []
+        for name, transformer, features in preprocessor.transformers_:
+            if transformer == "drop" or name == "remainder":
+                continue
+            kind = type(transformer).__name__
+            if kind == "StandardScaler":
+                mean = (
+                    transformer.mean_
+                    if transformer.mean_ is not None
+                    else np.zeros(len(features))
+                )
+                scale = (
+                    transformer.scale_
+                    if transformer.scale_ is not None
+                    else np.ones(len(features))
+                )
+                for feature, m, s in zip(features, mean, scale):
+                    columns.append(("num", feature, (float(m), float(s))))
+            elif kind == "OneHotEncoder":
+                if transformer.drop is not None:
+                    raise TypeError("OneHotEncoder(drop=...) is not supported")
+                for feature, categories in zip(features, transformer.categories_):
+                    for category in categories:
+                        columns.append(("cat", feature, category))
+            else:
+                raise TypeError(f"Cannot compile preprocessing step {kind}")
+
+        if "selector" in steps:
+            mask = steps["selector"].get_support()
+        else:
+            mask = np.ones(len(columns), dtype=bool)
+        if len(mask) != len(columns):
+            raise ValueError("Selector mask does not match preprocessor output")
+
+        numerical: List[Tuple[str, float, float, int]] = []
+        lookups: Dict[str, Dict[str, int]] = {}
+        position = 0
+        for (kind, feature, detail), keep in zip(columns, mask):
+            if kind == "cat":
+                lookups.setdefault(feature, {})
+            if not keep:
+                continue
+            if kind == "num":
+                numerical.append((feature, detail[0], detail[1], position))
+            else:
+                lookups[feature][str(detail)] = position
+            position += 1
+
+        if position != ensemble.n_features:
+            raise ValueError("Selected features do not match the model input")
+
+        return cls(
+            numerical=numerical,
+            categorical=list(lookups.items()),
+            n_features=position,
+            ensemble=ensemble,
+        )
+
+    def save(
+        self,
+        target: Union[str, Path, BinaryIO],
+        source_sha256: str = "",
+        feature_spec: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Write the compiled model as an uncompressed ``.npz`` archive.
+
+        ``feature_spec`` is stored in the metadata and returned by ``load``.
+        """
+        meta = {
+            "format_version": EXPORT_FORMAT_VERSION,
+            "n_features": self.n_features,
+            "categorical": [name for name, _ in self.categorical],
+            "source_sha256": source_sha256,
+            "feature_spec": feature_spec,
+        }
+        arrays = {
+            "meta": np.array(json.dumps(meta)),
+            "numerical_names": np.array(self.numerical_names, dtype=str),
+            "numerical_mean": self.numerical_mean,
+            "numerical_scale": self.numerical_scale,
+            "numerical_pos": self.numerical_pos,
+        }
+        for i, (_, lookup) in enumerate(self.categorical):
+            arrays[f"cat{i}_values"] = np.array(list(lookup), dtype=str)
+            arrays[f"cat{i}_pos"] = np.array(list(lookup.values()), dtype=np.intp)
+        for name, values in self.ensemble.to_arrays().items():
+            arrays[f"tree_{name}"] = values
+        if hasattr(target, "write"):
+            np.savez(target, **arrays)
+            return
+        # np.savez appends .npz to bare paths, so write through a file object
+        with open(target, "wb") as f:
+            np.savez(f, **arrays)
+
+    @staticmethod
+    def read_meta(source: Union[str, Path]) -> Dict[str, Any]:
+        """The metadata of a ``save``d archive, without reading its arrays."""
+        with np.load(source, allow_pickle=False) as archive:
+            return json.loads(str(archive["meta"]))
+
+    @classmethod
+    def load(
+        cls, source: Union[str, Path, bytes]
+    ) -> Tuple["CompiledPipeline", Dict[str, Any]]:
+        """Read a ``save``d archive from a path or its bytes; returns (model, meta)."""
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        with np.load(source, allow_pickle=False) as archive:
+            meta = json.loads(str(archive["meta"]))
+            if meta.get("format_version") != EXPORT_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported compiled model format {meta.get('format_version')}"
+                )
+            numerical = [
+                (str(name), float(mean), float(scale), int(pos))
+                for name, mean, scale, pos in zip(
+                    archive["numerical_names"],
+                    archive["numerical_mean"],
+                    archive["numerical_scale"],
+                    archive["numerical_pos"],
+                )
+            ]
+            categorical = [
+                (
+                    name,
+                    {
+                        str(value): int(pos)
+                        for value, pos in zip(
+                            archive[f"cat{i}_values"], archive[f"cat{i}_pos"]
+                        )
+                    },
+                )
+                for i, name in enumerate(meta["categorical"])
+            ]
+            ensemble = FlatTreeEnsemble.from_arrays(
+                {
+                    key[len("tree_") :]: archive[key]
+                    for key in archive.files
+                    if key.startswith("tree_")
+                }
+            )
+        compiled = cls(numerical, categorical, meta["n_features"], ensemble)
+        return compiled, meta
+
+    def _row(self) -> np.ndarray:
+        """Per-thread preallocated feature row."""
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros(self.n_features, dtype=np.float64)
+        return row
+
+    def transform_one(self, record: Dict[str, Any]) -> np.ndarray:
+        """Encode one raw record into the selected, scaled feature row."""
+        row = self._row()
+        values = np.array(
+            [record[name] for name in self.numerical_names], dtype=np.float64
+        )
+        row[self.numerical_pos] = (values - self.numerical_mean) / self.numerical_scale
+
+        row[self.categorical_pos] = 0.0
+        for name, lookup in self.categorical:
+            # Unknown categories encode as all zeros (handle_unknown="ignore")
+            position = lookup.get(str(record[name]))
+            if position is not None:
+                row[position] = 1.0
+        return row
+
+    def predict_proba_one(self, record: Dict[str, Any]) -> float:
+        """Return P(congestion) for a single raw record."""
+        return self.predict_proba_row(self.transform_one(record))
+
+    def predict_proba_row(self, row: np.ndarray) -> float:
+        """Return P(congestion) for one row produced by ``transform_one``."""
+        # Trees split on float32 features, exactly as sklearn casts them
+        raw = self.ensemble.raw_predict_one(row.astype(np.float32))
+        return 1.0 / (1.0 + math.exp(-raw))
+
+    def transform(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """Encode many raw records into a selected, scaled feature matrix."""
+        X = np.zeros((len(records), self.n_features), dtype=np.float64)
+        values = np.array(
+            [[record[name] for name in self.numerical_names] for record in records],
+            dtype=np.float64,
+        ).reshape(len(records), len(self.numerical_names))
+        X[:, self.numerical_pos] = (values - self.numerical_mean) / self.numerical_scale
+
+        rows = np.arange(len(records))
+        for name, lookup in self.categorical:
+            positions = np.array(
+                [lookup.get(str(record[name]), -1) for record in records],
+                dtype=np.intp,
+            )
+            known = positions >= 0
+            X[rows[known], positions[known]] = 1.0
+        return X
+
+    def predict_proba(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """Return P(congestion) for a batch of raw records."""
+        return self.ensemble.predict_proba(self.transform(records))[:, 1]
@@ -0,0 +1,177 @@
+from functools import reduce
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+LABEL = "congestion"
+
+# Compact dtypes for the flow log columns; anything else keeps pandas' default
+COLUMN_DTYPES: Dict[str, str] = {
+    "duration": "float32",
+    # Byte counts of long flows exceed 2**31
+    "src_bytes": "int64",
+    "dst_bytes": "int64",
+    "packet_count": "int32",
+    "service_count": "int32",
+    "hour": "int32",
+    "protocol": "category",
+    "service": "category",
+    LABEL: "int8",
+}
+
+SPLIT_METHODS = ("hash", "reservoir")
+
+
+def iter_chunks(
+    path: Union[str, Path],
+    chunksize: int = 100_000,
+    usecols: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream a flow log CSV in chunks with compact column dtypes."""
+    yield from pd.read_csv(
+        path, chunksize=chunksize, usecols=usecols, dtype=COLUMN_DTYPES
+    )
+
+
+def concat_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate chunks, keeping categorical columns categorical.
+
+    Chunks read separately each carry their own category set, and a plain
+    ``pd.concat`` would silently fall back to object columns.
+    """
+    chunks = [chunk for chunk in chunks if len(chunk)]
+    if not chunks:
+        return pd.DataFrame()
+
+    for column, dtype in chunks[0].dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        categories = reduce(
+            lambda left, right: left.union(right),
+            (chunk[column].cat.categories for chunk in chunks),
+        )
+        merged = pd.CategoricalDtype(categories)
+        chunks = [chunk.astype({column: merged}) for chunk in chunks]
+
+    return pd.concat(chunks, ignore_index=True)
+
+
+def hash_test_mask(chunk: pd.DataFrame, test_size: float, seed: int = 42) -> np.ndarray:
+    """Deterministically assign rows to the test split by hashing their content.
+
+    The assignment depends only on the row values and the seed, so it is the
+    same for every chunking of the file and across reruns.
+    """
+    hashes = pd.util.hash_pandas_object(
+        chunk, index=False, hash_key=f"{seed:016d}"[-16:]
+    ).to_numpy()
+    return (hashes % np.uint64(1_000_000)) < np.uint64(round(test_size * 1_000_000))
+
+
+class StratifiedReservoir:
+    """Bounded uniform sample of a stream that preserves label proportions.
+
+    Every row gets a random priority and each label keeps only the rows with
+    the smallest priorities (bottom-k sampling), so at most ``capacity`` rows
+    per label are held no matter how long the stream is. ``sample`` then trims
+    each label to its observed share of ``capacity``.
+    """
+
+    def __init__(self, capacity: int, label: str = LABEL, seed: int = 42):
+        if capacity <= 0:
+            raise ValueError("Reservoir capacity must be positive")
+        self.capacity = capacity
+        self.label = label
+        self.rng = np.random.default_rng(seed)
+        self.counts: Dict[int, int] = {}
+        self._keys: Dict[int, np.ndarray] = {}
+        self._rows: Dict[int, pd.DataFrame] = {}
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        """Offer every row of a chunk to the reservoir."""
+        keys = self.rng.random(len(chunk))
+        for value, index in chunk.groupby(self.label, observed=True).indices.items():
+            self.counts[value] = self.counts.get(value, 0) + len(index)
+            rows = chunk.iloc[index]
+            row_keys = keys[index]
+            if value in self._rows:
+                rows = concat_chunks([self._rows[value], rows])
+                row_keys = np.concatenate([self._keys[value], row_keys])
+            if len(rows) > self.capacity:
+                keep = np.argpartition(row_keys, self.capacity)[: self.capacity]
+                rows = rows.iloc[keep].reset_index(drop=True)
+                row_keys = row_keys[keep]
+            self._rows[value] = rows
+            self._keys[value] = row_keys
+
+    def sample(self) -> pd.DataFrame:
+        """Return the stratified sample, at most ``capacity`` rows in total."""
+        total = sum(self.counts.values())
+        parts = []
+        for value, rows in self._rows.items():
+            share = max(1, round(self.capacity * self.counts[value] / total))
+            keys = self._keys[value]
+            if len(rows) > share:
+                rows = rows.iloc[np.argsort(keys)[:share]]
+            parts.append(rows)
+        return concat_chunks(parts)
+
+
+def stream_train_test_split(
+    chunks: Iterable[pd.DataFrame],
+    test_size: float = 0.2,
+    method: str = "hash",
+    max_rows: Optional[int] = None,
+    seed: int = 42,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a stream of chunks into train/test frames as it is consumed.
+
+    ``hash`` assigns rows by content hash; with ``max_rows`` each side is also
+    capped by a stratified reservoir. ``reservoir`` assigns rows at random and
+    requires ``max_rows``. Peak memory is bounded by the chunk size plus the
+    retained rows, not by the size of the source.
+    """
+    if method not in SPLIT_METHODS:
+        raise ValueError(f"Unknown split method '{method}', expected {SPLIT_METHODS}")
+    if method == "reservoir" and not max_rows:
+        raise ValueError("Reservoir splitting requires max_rows")
+
+    rng = np.random.default_rng(seed)
+    reservoirs: Optional[Tuple[StratifiedReservoir, StratifiedReservoir]] = None
+    if max_rows:
+        n_test = max(1, round(max_rows * test_size))
+        reservoirs = (
+            StratifiedReservoir(max_rows - n_test, seed=seed),
+            StratifiedReservoir(n_test, seed=seed + 1),
+        )
+    train_parts: List[pd.DataFrame] = []
+    test_parts: List[pd.DataFrame] = []
+
+    n_rows = 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        if method == "hash":
+            is_test = hash_test_mask(chunk, test_size, seed)
+        else:
+            is_test = rng.random(len(chunk)) < test_size
+
+        if reservoirs is not None:
+            reservoirs[0].add(chunk[~is_test])
+            reservoirs[1].add(chunk[is_test])
+        else:
+            train_parts.append(chunk[~is_test])
+            test_parts.append(chunk[is_test])
+
+    if reservoirs is not None:
+        train, test = reservoirs[0].sample(), reservoirs[1].sample()
+    else:
+        train, test = concat_chunks(train_parts), concat_chunks(test_parts)
+
+    logger.info(
+        f"Streamed {n_rows} rows: "
+        f"{len(train)} train / {len(test)} test ({method} split)"
+    )
+    return train, test
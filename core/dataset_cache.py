@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from core.data_loader import iter_chunks
+
+# Bump when the on-disk layout changes so stale caches are rebuilt
+CACHE_FORMAT_VERSION = 3
+
+
+def file_sha256(path: Union[str, Path], block_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in fixed-size blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Columnar, memory-mapped cache of parsed training CSVs.
+
+    The first load of a CSV streams it through ``iter_chunks`` and writes one
+    raw binary file per column, with categorical columns stored as integer
+    codes plus their vocabulary in ``meta.json``. Entries are keyed on the
+    SHA-256 of the source file, so an edited CSV never reuses a stale cache.
+    Later loads ``np.memmap`` the columns instead of reparsing text.
+
+    Hashing a large file is itself a full read, so the hash is remembered in
+    ``index.json`` against the file's size and mtime and only recomputed when
+    either changes.
+    """
+
+    def __init__(self, cache_dir: Union[str, Path]):
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / "index.json"
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def source_hash(self, path: Union[str, Path]) -> str:
+        """Content hash of ``path``, reusing the remembered one if unchanged."""
+        path = Path(path).resolve()
+        stat = path.stat()
+        index = self._read_index()
+        entry = index.get(str(path))
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry["sha256"]
+
+        sha256 = file_sha256(path)
+        index[str(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+        }
+        self._write_index(index)
+        return sha256
+
+    def entry_dir(self, path: Union[str, Path]) -> Path:
+        return self.cache_dir / f"v{CACHE_FORMAT_VERSION}-{self.source_hash(path)}"
+
+    def load(self, path: Union[str, Path], chunksize: int = 100_000) -> pd.DataFrame:
+        """Return the dataset for ``path``, building the cache on first use."""
+        entry = self.entry_dir(path)
+        if not (entry / "meta.json").exists():
+            self.build(path, entry, chunksize=chunksize)
+        else:
+            logger.info(f"Loading cached dataset from {entry}")
+        return self.open(entry)
+
+    def iter_chunks(
+        self, path: Union[str, Path], chunksize: int = 100_000
+    ) -> Iterator[pd.DataFrame]:
+        """Stream the cached dataset in row slices of ``chunksize``."""
+        df = self.load(path, chunksize=chunksize)
+        for start in range(0, len(df), chunksize):
+            yield df.iloc[start : start + chunksize]
+
+    def build(self, path: Union[str, Path], entry: Path, chunksize: int) -> None:
+        """Convert the CSV into per-column binary files under ``entry``."""
+        logger.info(f"Building columnar cache for {path} in {entry}")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_columnar(iter_chunks(path, chunksize=chunksize), entry, source=str(path))
+
+    @staticmethod
+    def open(entry: Path) -> pd.DataFrame:
+        """Memory-map a cache entry as a DataFrame."""
+        return open_columnar(entry)
+
+
+def write_columnar(
+    chunks: Iterable[pd.DataFrame],
+    out_dir: Union[str, Path],
+    source: str = "",
+    overwrite: bool = False,
+) -> None:
+    """Write chunks as a columnar directory readable by ``open_columnar``.
+
+    Every column becomes one raw binary file; categorical and string columns
+    are stored as int32 codes into a vocabulary kept in ``meta.json``. The directory is
+    assembled under a temporary name and renamed into place, so readers never
+    see a partial entry. An existing ``out_dir`` is kept unless ``overwrite``
+    is set: cache entries are content addressed, so it already holds the data.
+    """
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=out_dir.parent, prefix=".build-"))
+
+    handles = {}
+    try:
+        columns: Dict[str, Dict[str, Any]] = {}
+        n_rows = 0
+        for chunk in chunks:
+            for name in chunk.columns:
+                series = chunk[name]
+                if name not in columns:
+                    columns[name] = {"categories": None}
+                    handles[name] = open(tmp_dir / f"{name}.bin", "wb")
+
+                if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+                    # Raw bytes of Python objects are pointers, not data
+                    series = series.astype("category")
+                    if not all(isinstance(v, str) for v in series.cat.categories):
+                        raise ValueError(
+                            f"Column '{name}' mixes strings with other values; "
+                            "only numeric and string columns can be cached"
+                        )
+
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    # Remap chunk-local codes onto one growing vocabulary
+                    vocab = columns[name]["categories"] or []
+                    lookup = {value: i for i, value in enumerate(vocab)}
+                    for value in series.cat.categories:
+                        if value not in lookup:
+                            lookup[value] = len(vocab)
+                            vocab.append(value)
+                    columns[name]["categories"] = vocab
+                    remap = np.array(
+                        [lookup[v] for v in series.cat.categories], dtype=np.int32
+                    )
+                    codes = series.cat.codes.to_numpy()
+                    values = np.where(codes >= 0, remap[codes], -1).astype(np.int32)
+                else:
+                    values = series.to_numpy()
+                    if values.dtype.hasobject:
+                        raise ValueError(
+                            f"Column '{name}' of dtype {series.dtype} cannot be cached"
+                        )
+                dtype = columns[name].setdefault("dtype", values.dtype.str)
+                if dtype != values.dtype.str:
+                    raise ValueError(
+                        f"Column '{name}' changes dtype from {dtype} to "
+                        f"{values.dtype.str} between chunks"
+                    )
+                handles[name].write(np.ascontiguousarray(values).tobytes())
+            n_rows += len(chunk)
+
+        for handle in handles.values():
+            handle.close()
+
+        meta = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "source": source,
+            "n_rows": n_rows,
+            "columns": [{"name": name, **info} for name, info in columns.items()],
+        }
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+
+        if overwrite and out_dir.exists():
+            # Move the old directory aside so the new one still lands in one
+            # rename; readers that mapped the old files keep their data
+            stale = Path(tempfile.mkdtemp(dir=out_dir.parent, prefix=".stale-"))
+            os.replace(out_dir, stale / out_dir.name)
+            shutil.rmtree(stale, ignore_errors=True)
+        # Publish the finished directory in one step; a concurrent writer of
+        # the same entry simply loses the race
+        try:
+            os.replace(tmp_dir, out_dir)
+        except OSError:
+            if not (out_dir / "meta.json").exists():
+                raise
+    finally:
+        for handle in handles.values():
+            handle.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def open_columnar(entry: Union[str, Path]) -> pd.DataFrame:
+    """Memory-map a columnar directory written by ``write_columnar``."""
+    entry = Path(entry)
+    with open(entry / "meta.json", "r") as f:
+        meta = json.load(f)
+
+    n_rows = meta["n_rows"]
+    data = {}
+    for column in meta["columns"]:
+        path = entry / f"{column['name']}.bin"
+        dtype = np.dtype(column["dtype"])
+        # A plain ndarray view keeps pandas from propagating the memmap
+        # subclass while still sharing the mapped pages
+        values = (
+            np.memmap(path, dtype=dtype, mode="r", shape=(n_rows,)).view(np.ndarray)
+            if n_rows
+            else np.empty(0, dtype=dtype)
+        )
+        if column["categories"] is not None:
+            values = pd.Categorical.from_codes(values, column["categories"])
+        data[column["name"]] = values
+    return pd.DataFrame(data, copy=False)
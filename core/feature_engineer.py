@@ -1,17 +1,187 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
+from core.schema import FeatureSpec
+
+AGGREGATE_STATS = ("flows", "bytes", "packet_rate")
+
 
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+def engineer_features(
+    df: pd.DataFrame, spec: Optional[FeatureSpec] = None
+) -> pd.DataFrame:
     """
-    Engineer features for the traffic congestion model.
-    Currently only handles one-hot encoding of categorical variables.
+    One-hot encode a frame into a fixed numeric layout from a feature spec.
+
+    Only the spec's columns are kept. Each category gets one indicator column
+    per value in the spec's vocabulary, whether or not the value occurs in
+    ``df``, so every frame encodes to the same columns; categories without a
+    vocabulary fall back to the values present.
     """
-    # One-hot encode protocol and service
-    categorical = ["protocol", "service"]
-    df = pd.get_dummies(df, columns=categorical, drop_first=True)
+    spec = spec or FeatureSpec.from_config({})
+    df = df[spec.columns].copy()
+    for name in spec.categorical:
+        values = spec.categories.get(name)
+        if values is not None:
+            df[name] = pd.Categorical(df[name].astype(str), categories=values)
+    df = pd.get_dummies(df, columns=spec.categorical, dtype=np.uint8)
 
     # Validation: check for missing/invalid values
     if df.isnull().values.any():
         raise ValueError("Missing values found in features!")
 
     return df
+
+
+class OnlineFeatureStore:
+    """Rolling per-service and per-protocol load, updated in O(1) per flow.
+
+    For every value of each key column (e.g. ``service=http``) and every
+    window length ``w`` the store keeps exponentially decaying sums with time
+    constant ``w``: the number of flows, their total src+dst bytes and their
+    packets. A steady stream of ``r`` flows per second settles at ``r * w``
+    flows, the same as a ``w``-second sliding window, but an update only
+    scales a few floats by ``exp(-dt / w)`` instead of expiring old events.
+
+    ``observe`` adds a flow and returns the aggregates including it, as
+    ``<key>_flows_<w>s``, ``<key>_bytes_<w>s`` and ``<key>_packet_rate_<w>s``
+    (packets per second). Training replays rows in order through the same
+    code, so served features match the ones the model was fitted on. Times
+    come from a record's ``timestamp`` (epoch seconds) when present; training
+    data without one is replayed at ``replay_rate`` rows per second, and
+    serving uses the wall clock. Flows older than the newest one seen for a
+    key count as arriving at that newest time.
+    """
+
+    def __init__(
+        self,
+        windows: Sequence[float] = (60.0, 300.0),
+        keys: Sequence[str] = ("service", "protocol"),
+        replay_rate: float = 100.0,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ):
+        if not windows or any(w <= 0 for w in windows):
+            raise ValueError("Feature windows must be positive")
+        if replay_rate <= 0:
+            raise ValueError("replay_rate must be positive")
+        self.windows = tuple(float(w) for w in windows)
+        self.keys = tuple(keys)
+        self.replay_rate = float(replay_rate)
+        self.max_keys = max_keys
+        self.clock = clock
+        # Per key: (window, flows, bytes, packet rate feature names) per window
+        self._names = {
+            key: [
+                (w, *(f"{key}_{stat}_{w:g}s" for stat in AGGREGATE_STATS))
+                for w in self.windows
+            ]
+            for key in self.keys
+        }
+        self.feature_names = [
+            name
+            for key in self.keys
+            for _, *names in self._names[key]
+            for name in names
+        ]
+        self._empty = [0.0] * (1 + 3 * len(self.windows))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all traffic seen so far."""
+        # (key, value) -> [last_time, flows, bytes, packets] + 3 sums per extra window
+        self._state: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._replayed = 0
+
+    def observe(
+        self, record: Dict[str, Any], timestamp: Optional[float] = None
+    ) -> Dict[str, float]:
+        """Add a flow to the aggregates and return them, this flow included."""
+        return self._update(record, timestamp, store=True)
+
+    def peek(
+        self, record: Dict[str, Any], timestamp: Optional[float] = None
+    ) -> Dict[str, float]:
+        """The aggregates ``observe`` would return, without recording the flow."""
+        return self._update(record, timestamp, store=False)
+
+    def _update(
+        self, record: Dict[str, Any], timestamp: Optional[float], store: bool
+    ) -> Dict[str, float]:
+        if timestamp is None:
+            timestamp = record.get("timestamp")
+        now = self.clock() if timestamp is None else float(timestamp)
+        volume = float(record["src_bytes"]) + float(record["dst_bytes"])
+        packets = float(record["packet_count"])
+
+        features: Dict[str, float] = {}
+        with self._lock:
+            for key in self.keys:
+                slot = (key, str(record[key]))
+                state = self._state.get(slot)
+                if state is None:
+                    state = self._empty
+                elapsed = max(0.0, now - state[0])
+                sums = [max(now, state[0])]
+                for base, (window, flows_name, bytes_name, rate_name) in zip(
+                    range(1, len(state), 3), self._names[key]
+                ):
+                    factor = math.exp(-elapsed / window) if elapsed else 1.0
+                    flows = state[base] * factor + 1.0
+                    total = state[base + 1] * factor + volume
+                    packet_sum = state[base + 2] * factor + packets
+                    sums += (flows, total, packet_sum)
+                    features[flows_name] = flows
+                    features[bytes_name] = total
+                    features[rate_name] = packet_sum / window
+                if store:
+                    self._state[slot] = sums
+                    self._state.move_to_end(slot)
+                    while len(self._state) > self.max_keys:
+                        self._state.popitem(last=False)
+        return features
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Replay a frame in row order, appending the aggregate columns.
+
+        Call on consecutive chunks of a time-ordered log; the store carries
+        its state, and the replay clock, from one chunk to the next.
+        """
+        if "timestamp" in df.columns:
+            timestamps = df["timestamp"].to_numpy(dtype=np.float64)
+        else:
+            offsets = np.arange(self._replayed, self._replayed + len(df))
+            timestamps = offsets / self.replay_rate
+        self._replayed += len(df)
+
+        columns = ["src_bytes", "dst_bytes", "packet_count", *self.keys]
+        records = df[columns].to_dict("records")
+        rows = [
+            list(self.observe(record, t).values())
+            for record, t in zip(records, timestamps)
+        ]
+        aggregates = pd.DataFrame(
+            np.array(rows, dtype=np.float64).reshape(len(df), -1),
+            columns=self.feature_names,
+            index=df.index,
+        )
+        return pd.concat([df, aggregates], axis=1)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["OnlineFeatureStore"]:
+        """Build the store from the ``online_features`` config section, if enabled."""
+        settings = config.get("online_features") or {}
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            windows=settings.get("windows", (60.0, 300.0)),
+            keys=settings.get("keys", ("service", "protocol")),
+            replay_rate=float(settings.get("replay_rate", 100.0)),
+            max_keys=int(settings.get("max_keys", 10000)),
+        )
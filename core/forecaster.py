@@ -0,0 +1,437 @@
+import io
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from loguru import logger
+
+# Per-interval totals; congestion is the mean congestion of the interval's flows
+SERIES_COLUMNS = ("flows", "bytes", "packets", "congestion")
+
+# Bump when the .npz layout written by LagForecaster.save changes
+FORECAST_FORMAT_VERSION = 1
+
+
+class IntervalSeries:
+    """Per-interval load totals kept in a preallocated circular buffer.
+
+    Flows are added to the open interval; when a flow or ``advance`` moves
+    past its end, the interval is closed into the next ring slot, and any
+    intervals without traffic are recorded as zero load. Only the last
+    ``capacity`` closed intervals are kept and nothing is reallocated, so
+    memory stays fixed however long the server runs.
+    """
+
+    def __init__(self, interval_seconds: float = 60.0, capacity: int = 1440):
+        if interval_seconds <= 0 or capacity <= 0:
+            raise ValueError("interval_seconds and capacity must be positive")
+        self.interval_seconds = float(interval_seconds)
+        self.capacity = capacity
+        self.values = np.zeros((capacity, len(SERIES_COLUMNS)))
+        self.starts = np.zeros(capacity)
+        self.reset()
+
+    def reset(self) -> None:
+        self.closed = 0  # total intervals closed; the next slot is closed % capacity
+        self.current_start: Optional[float] = None
+        self._current = [0.0, 0.0, 0.0, 0.0]
+
+    def _interval_start(self, t: float) -> float:
+        return math.floor(t / self.interval_seconds) * self.interval_seconds
+
+    def _close(self, start: float, totals: List[float]) -> None:
+        slot = self.closed % self.capacity
+        flows = totals[0]
+        self.values[slot] = (
+            flows,
+            totals[1],
+            totals[2],
+            totals[3] / flows if flows else 0.0,
+        )
+        self.starts[slot] = start
+        self.closed += 1
+
+    def advance(self, now: float) -> int:
+        """Close every interval that ended by ``now``; returns how many closed."""
+        start = self._interval_start(now)
+        if self.current_start is None:
+            self.current_start = start
+            return 0
+        gap = int(round((start - self.current_start) / self.interval_seconds))
+        if gap <= 0:
+            return 0
+        self._close(self.current_start, self._current)
+        # Idle intervals beyond the buffer would be overwritten anyway
+        empty = [0.0, 0.0, 0.0, 0.0]
+        for i in range(max(1, gap - self.capacity), gap):
+            self._close(self.current_start + i * self.interval_seconds, empty)
+        self.current_start = start
+        self._current = [0.0, 0.0, 0.0, 0.0]
+        return gap
+
+    def add(self, t: float, volume: float, packets: float, congestion: float) -> int:
+        """Count a flow in its interval; returns how many intervals closed.
+
+        A flow older than the open interval is counted in the open interval.
+        """
+        closed = self.advance(t)
+        current = self._current
+        current[0] += 1.0
+        current[1] += volume
+        current[2] += packets
+        current[3] += congestion
+        return closed
+
+    def window(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The last ``n`` closed intervals, oldest first, as (values, starts)."""
+        if n > min(self.closed, self.capacity):
+            raise ValueError(f"Only {min(self.closed, self.capacity)} intervals kept")
+        slots = np.arange(self.closed - n, self.closed) % self.capacity
+        return self.values[slots], self.starts[slots]
+
+
+def hour_features(starts: np.ndarray) -> np.ndarray:
+    """Time of day of interval start times (epoch seconds) as (sin, cos)."""
+    angle = 2 * np.pi * (np.asarray(starts) % 86400) / 86400
+    return np.stack([np.sin(angle), np.cos(angle)], axis=-1)
+
+
+def build_series(
+    chunks: Iterable[Any], interval_seconds: float = 60.0, replay_rate: float = 5.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Aggregate a time-ordered flow log into per-interval (starts, values).
+
+    Flows are placed in time by a ``timestamp`` column, or replayed at
+    ``replay_rate`` rows per second when there is none. Interval congestion
+    is the mean of the ``congestion`` label.
+    """
+    totals = np.zeros((0, len(SERIES_COLUMNS)))
+    origin: Optional[int] = None
+    offset = 0
+    for chunk in chunks:
+        if "timestamp" in chunk.columns:
+            t = chunk["timestamp"].to_numpy(dtype=np.float64)
+        else:
+            t = np.arange(offset, offset + len(chunk)) / replay_rate
+        offset += len(chunk)
+        index = np.floor(t / interval_seconds).astype(np.int64)
+        if origin is None:
+            origin = int(index.min()) if len(index) else 0
+        index = np.maximum(index - origin, 0)
+
+        size = int(index.max()) + 1 if len(index) else 0
+        if size > len(totals):
+            totals = np.vstack(
+                [totals, np.zeros((size - len(totals), totals.shape[1]))]
+            )
+        weights = (
+            np.ones(len(chunk)),
+            chunk["src_bytes"].to_numpy(np.float64)
+            + chunk["dst_bytes"].to_numpy(np.float64),
+            chunk["packet_count"].to_numpy(np.float64),
+            chunk["congestion"].to_numpy(np.float64),
+        )
+        for column, weight in enumerate(weights):
+            totals[:, column] += np.bincount(index, weight, minlength=len(totals))
+
+    flows = totals[:, 0]
+    totals[:, 3] = np.divide(
+        totals[:, 3], flows, out=np.zeros_like(flows), where=flows > 0
+    )
+    starts = (np.arange(len(totals)) + (origin or 0)) * interval_seconds
+    return starts, totals
+
+
+class LagForecaster:
+    """Direct multi-step forecast of interval congestion from lagged load.
+
+    For each step ``h`` ahead a separate linear model sees the last ``lags``
+    intervals of flows, bytes, packets and congestion (standardized) and the
+    time of day of the interval being forecast, and predicts that interval's
+    mean congestion probability, clipped to [0, 1]. Scoring is a handful of
+    dot products over NumPy arrays; models are saved as ``.npz`` archives
+    that load without sklearn.
+    """
+
+    def __init__(
+        self,
+        lags: int,
+        horizon: int,
+        interval_seconds: float,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+    ):
+        self.lags = lags
+        self.horizon = horizon
+        self.interval_seconds = float(interval_seconds)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)  # (horizon, lags * 4 + 2)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+
+    def predict(self, window: np.ndarray, last_start: float) -> np.ndarray:
+        """Congestion for the ``horizon`` intervals after a ``(lags, 4)`` window."""
+        n_lag = self.lags * len(SERIES_COLUMNS)
+        lagged = ((window - self.mean) / self.scale).ravel()
+        starts = last_start + self.interval_seconds * np.arange(1, self.horizon + 1)
+        hours = hour_features(starts)
+        forecast = (
+            self.intercept
+            + self.coef[:, :n_lag] @ lagged
+            + np.einsum("hk,hk->h", self.coef[:, n_lag:], hours)
+        )
+        return np.clip(forecast, 0.0, 1.0)
+
+    def save(self, target: Union[str, Path, BinaryIO]) -> None:
+        """Write the model as an uncompressed ``.npz`` archive."""
+        meta = {
+            "format_version": FORECAST_FORMAT_VERSION,
+            "lags": self.lags,
+            "horizon": self.horizon,
+            "interval_seconds": self.interval_seconds,
+        }
+        arrays = {
+            "meta": np.array(json.dumps(meta)),
+            "mean": self.mean,
+            "scale": self.scale,
+            "coef": self.coef,
+            "intercept": self.intercept,
+        }
+        if hasattr(target, "write"):
+            np.savez(target, **arrays)
+            return
+        with open(target, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, source: Union[str, Path, bytes]) -> "LagForecaster":
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+        with np.load(source, allow_pickle=False) as archive:
+            meta = json.loads(str(archive["meta"]))
+            if meta.get("format_version") != FORECAST_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unsupported forecast model format {meta.get('format_version')}"
+                )
+            return cls(
+                meta["lags"],
+                meta["horizon"],
+                meta["interval_seconds"],
+                archive["mean"],
+                archive["scale"],
+                archive["coef"],
+                archive["intercept"],
+            )
+
+
+def lagged_samples(
+    starts: np.ndarray, values: np.ndarray, lags: int, horizon: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Training windows ``(n, lags, 4)``, target starts and targets ``(n, horizon)``."""
+    n = len(values) - lags - horizon + 1
+    if n <= 0:
+        raise ValueError(
+            f"Need more than {lags + horizon} intervals to train, got {len(values)}"
+        )
+    positions = np.arange(n)[:, None]
+    windows = values[positions + np.arange(lags)]
+    targets = values[positions + lags + np.arange(horizon), 3]
+    target_starts = starts[positions + lags + np.arange(horizon)]
+    return windows, target_starts, targets
+
+
+def fit_forecaster(
+    starts: np.ndarray,
+    values: np.ndarray,
+    lags: int = 12,
+    horizon: int = 5,
+    interval_seconds: float = 60.0,
+    alpha: float = 1.0,
+) -> LagForecaster:
+    """Fit one ridge regression per forecast step on a load series."""
+    from sklearn.linear_model import Ridge
+
+    windows, target_starts, targets = lagged_samples(starts, values, lags, horizon)
+    flat = values.reshape(-1, len(SERIES_COLUMNS))
+    mean = flat.mean(axis=0)
+    scale = flat.std(axis=0)
+    scale[scale == 0] = 1.0
+    lagged = ((windows - mean) / scale).reshape(len(windows), -1)
+
+    coef, intercept = [], []
+    for h in range(horizon):
+        X = np.hstack([lagged, hour_features(target_starts[:, h])])
+        model = Ridge(alpha=alpha).fit(X, targets[:, h])
+        coef.append(model.coef_)
+        intercept.append(model.intercept_)
+    return LagForecaster(
+        lags,
+        horizon,
+        interval_seconds,
+        mean,
+        scale,
+        np.array(coef),
+        np.array(intercept),
+    )
+
+
+def evaluate_forecaster(
+    model: LagForecaster, starts: np.ndarray, values: np.ndarray
+) -> Dict[str, float]:
+    """Mean absolute error per step, against repeating the last interval."""
+    windows, _, targets = lagged_samples(starts, values, model.lags, model.horizon)
+    last_starts = starts[np.arange(len(windows)) + model.lags - 1]
+    predictions = np.array(
+        [model.predict(w, s) for w, s in zip(windows, last_starts)]
+    ).reshape(targets.shape)
+    persistence = windows[:, -1, 3][:, None]
+    metrics = {}
+    for h in range(model.horizon):
+        metrics[f"mae_t+{h + 1}"] = float(
+            np.abs(predictions[:, h] - targets[:, h]).mean()
+        )
+    metrics["mae"] = float(np.abs(predictions - targets).mean())
+    metrics["mae_persistence"] = float(np.abs(persistence - targets).mean())
+    return metrics
+
+
+def train_forecaster(
+    config: Dict[str, Any], data_path: Union[str, Path]
+) -> Dict[str, float]:
+    """Build the load series of a flow log, fit, evaluate and save the forecaster.
+
+    The last 20% of intervals are held out for the reported errors; the saved
+    model is fitted on all of them.
+    """
+    from core.data_loader import iter_chunks
+    from core.trainer import atomic_write
+
+    settings = config.get("forecast") or {}
+    interval = float(settings.get("interval_seconds", 60))
+    lags = int(settings.get("lags", 12))
+    horizon = int(settings.get("horizon", 5))
+    alpha = float(settings.get("alpha", 1.0))
+    try:
+        starts, values = build_series(
+            iter_chunks(data_path), interval, float(settings.get("replay_rate", 5))
+        )
+        split = int(len(values) * 0.8)
+        held_out = fit_forecaster(
+            starts[:split], values[:split], lags, horizon, interval, alpha
+        )
+        metrics = evaluate_forecaster(held_out, starts[split:], values[split:])
+        model = fit_forecaster(starts, values, lags, horizon, interval, alpha)
+
+        model_path = settings.get("model_path", "assets/models/forecast_model.npz")
+        atomic_write(model_path, model.save)
+        logger.success(
+            f"Forecaster trained on {len(values)} intervals and saved to {model_path}"
+        )
+        return metrics
+    except Exception as e:
+        logger.error(f"Forecaster training failed: {e}")
+        raise
+
+
+class LoadForecaster:
+    """Live congestion forecast from the flows a server scores.
+
+    Each scored flow is added to an ``IntervalSeries`` with its predicted
+    probability, which stands in for the congestion label the model was
+    trained on. The forecast is recomputed only when an interval closes,
+    from the last ``lags`` ring slots, so a request for it does no work
+    proportional to the history.
+
+    Flows are placed by their ``timestamp`` when they carry one, and the
+    series then follows those times. Otherwise the wall clock is used, and a
+    forecast request also closes intervals that passed without traffic.
+    """
+
+    def __init__(
+        self,
+        model: LagForecaster,
+        capacity: int = 1440,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.model = model
+        self.series = IntervalSeries(model.interval_seconds, max(capacity, model.lags))
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._forecast: Optional[Dict[str, Any]] = None
+        self._live = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.series.reset()
+            self._forecast = None
+            self._live = True
+
+    def _refresh(self) -> None:
+        """Recompute the forecast after intervals closed (caller holds the lock)."""
+        if self.series.closed < self.model.lags:
+            self._forecast = None
+            return
+        window, starts = self.series.window(self.model.lags)
+        forecast = self.model.predict(window, starts[-1])
+        step = self.model.interval_seconds
+        self._forecast = {
+            "interval_seconds": step,
+            "based_on": float(starts[-1]),
+            "forecast": [
+                {"start": float(starts[-1] + step * (h + 1)), "congestion": float(p)}
+                for h, p in enumerate(forecast)
+            ],
+        }
+
+    def observe(self, record: Dict[str, Any], probability: float) -> None:
+        """Count a scored flow, at its ``timestamp`` or the current time."""
+        timestamp = record.get("timestamp")
+        now = self.clock() if timestamp is None else float(timestamp)
+        volume = float(record["src_bytes"]) + float(record["dst_bytes"])
+        with self._lock:
+            self._live = timestamp is None
+            if self.series.add(now, volume, float(record["packet_count"]), probability):
+                self._refresh()
+
+    def forecast(self) -> Dict[str, Any]:
+        """The current forecast, or how many more intervals it needs."""
+        with self._lock:
+            if self._live and self.series.advance(self.clock()):
+                self._refresh()
+            if self._forecast is None:
+                return {
+                    "ready": False,
+                    "intervals_needed": self.model.lags - self.series.closed,
+                    "interval_seconds": self.model.interval_seconds,
+                }
+            return {"ready": True, **self._forecast}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["LoadForecaster"]:
+        """Load the forecaster from the ``forecast`` config section, if enabled."""
+        settings = config.get("forecast") or {}
+        if not settings.get("enabled", False):
+            return None
+        model_path = settings.get("model_path", "assets/models/forecast_model.npz")
+        try:
+            model = LagForecaster.load(model_path)
+        except FileNotFoundError:
+            logger.warning(f"Forecasting disabled: no forecast model at {model_path}")
+            return None
+        return cls(model, capacity=int(settings.get("capacity", 1440)))
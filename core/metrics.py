@@ -0,0 +1,268 @@
+import os
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from 10 µs (compiled scoring) to 2.5 s
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+Sample = Tuple[Dict[str, str], float]
+
+
+class _ThreadToken:
+    """Kept in a thread's local storage; collected when the thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class Histogram:
+    """Latency histogram whose hot path never takes a lock.
+
+    Each thread records into its own shard, a list of per-bucket counts
+    followed by the running sum, so ``observe`` is a bisect and two list
+    updates. Readers add the shards together; a shard being written during a
+    scrape can at worst lag by the observation in progress. When a thread
+    exits its shard is folded into a retired total, so servers that start a
+    thread per request do not accumulate shards.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.reset()
+
+    def reset(self) -> None:
+        # A fresh lock: after a fork the old one may be held by a lost thread.
+        # Reentrant, since a shard may be retired by a collection while held.
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._retired = [0] * (len(self.buckets) + 1) + [0.0]
+
+    def _shard(self) -> List[float]:
+        shard = [0] * (len(self.buckets) + 1) + [0.0]
+        token = _ThreadToken()
+        with self._lock:
+            self._shards.append(shard)
+        weakref.finalize(token, self._retire, shard)
+        self._local.token = token
+        self._local.shard = shard
+        return shard
+
+    def _retire(self, shard: List[float]) -> None:
+        with self._lock:
+            # Shards from before a reset are no longer listed and are dropped
+            if _remove(self._shards, shard):
+                for i, value in enumerate(shard):
+                    self._retired[i] += value
+
+    def observe(self, value: float) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        # Bucket i counts values <= buckets[i]; the last slot before the sum is +Inf
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """Cumulative bucket counts (including +Inf), total count and sum."""
+        with self._lock:
+            totals = list(self._retired)
+            for shard in self._shards:
+                for i, value in enumerate(shard):
+                    totals[i] += value
+        cumulative, running = [], 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(int(running))
+        return cumulative, int(running), float(totals[-1])
+
+
+class Counter:
+    """Monotonic counter keyed by label values, sharded per thread.
+
+    Like ``Histogram``, an exited thread's shard is folded into a retired total.
+    """
+
+    def __init__(self, labelnames: Sequence[str] = ()):
+        self.labelnames = tuple(labelnames)
+        self.reset()
+
+    def reset(self) -> None:
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], float]] = []
+        self._retired: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def _shard(self) -> Dict[Tuple[str, ...], float]:
+        shard: Dict[Tuple[str, ...], float] = {}
+        token = _ThreadToken()
+        with self._lock:
+            self._shards.append(shard)
+        weakref.finalize(token, self._retire, shard)
+        self._local.token = token
+        self._local.shard = shard
+        return shard
+
+    def _retire(self, shard: Dict[Tuple[str, ...], float]) -> None:
+        with self._lock:
+            if _remove(self._shards, shard):
+                for labels, value in shard.items():
+                    self._retired[labels] = self._retired.get(labels, 0.0) + value
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            totals = dict(self._retired)
+            for shard in self._shards:
+                for labels, value in list(shard.items()):
+                    totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+
+class HistogramFamily:
+    """Histograms sharing a name, one per combination of label values."""
+
+    def __init__(self, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        """The child histogram for these label values; cache it on hot paths."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def reset(self) -> None:
+        for child in list(self._children.values()):
+            child.reset()
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format.
+
+    Metrics are per process. Under gunicorn each worker keeps its own and
+    ``/metrics`` reports the worker that served the scrape; counts recorded
+    in a preloading master are cleared in every forked child.
+    """
+
+    def __init__(self):
+        self._metrics: List[Tuple[str, str, str, object]] = []
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> HistogramFamily:
+        family = HistogramFamily(labelnames, buckets)
+        self._metrics.append((name, help, "histogram", family))
+        return family
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        counter = Counter(labelnames)
+        self._metrics.append((name, help, "counter", counter))
+        return counter
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], Iterable[Sample]],
+        kind: str = "gauge",
+    ) -> None:
+        """Register a metric whose samples are computed at scrape time."""
+        self._metrics.append((name, help, kind, collect))
+
+    def reset(self) -> None:
+        for _, _, _, metric in self._metrics:
+            if isinstance(metric, (HistogramFamily, Counter)):
+                metric.reset()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, help, kind, metric in self._metrics:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            if isinstance(metric, HistogramFamily):
+                for values, child in sorted(metric._children.items()):
+                    labels = dict(zip(metric.labelnames, values))
+                    cumulative, count, total = child.snapshot()
+                    bounds = [_format_value(b) for b in child.buckets] + ["+Inf"]
+                    for bound, bucket_count in zip(bounds, cumulative):
+                        bucket_labels = _format_labels({**labels, "le": bound})
+                        lines.append(f"{name}_bucket{bucket_labels} {bucket_count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {total!r}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {count}")
+            elif isinstance(metric, Counter):
+                for values, value in sorted(metric.values().items()):
+                    labels = _format_labels(dict(zip(metric.labelnames, values)))
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+            else:
+                for labels, value in metric():
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+def _remove(shards: List[Any], shard: Any) -> bool:
+    """Remove ``shard`` by identity; equal-valued shards of other threads stay."""
+    for i, candidate in enumerate(shards):
+        if candidate is shard:
+            del shards[i]
+            return True
+    return False
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=REGISTRY.reset)
@@ -0,0 +1,157 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+
+class PredictionCache:
+    """Bounded LRU cache of prediction results with a per-entry TTL.
+
+    Keys are canonical feature tuples built by ``make_key``: numerical values
+    are normalized to float, so ``8`` and ``8.0`` share an entry, and a feature
+    listed in ``quantize`` is first snapped to a multiple of its step so that
+    near-identical flows also share one. Quantizing trades exactness for hit
+    rate and is off unless configured.
+
+    When bound to a model file, the cache checks the file's size and mtime at
+    most every ``check_interval`` seconds and clears itself when they change.
+    ``bind`` moves it to another file when the served model is loaded from a
+    different path, e.g. a new registry version or the pickle instead of its
+    export.
+    """
+
+    def __init__(
+        self,
+        numerical: Sequence[str],
+        categorical: Sequence[str],
+        max_size: int = 10000,
+        ttl_seconds: float = 60.0,
+        quantize: Optional[Dict[str, float]] = None,
+        source_path: Optional[Union[str, Path]] = None,
+        check_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_size <= 0:
+            raise ValueError("Cache max_size must be positive")
+        quantize = quantize or {}
+        unknown = set(quantize) - set(numerical)
+        if unknown:
+            raise ValueError(
+                f"Cannot quantize non-numerical features: {sorted(unknown)}"
+            )
+        if any(step <= 0 for step in quantize.values()):
+            raise ValueError("Quantization steps must be positive")
+
+        self.numerical = list(numerical)
+        self.categorical = list(categorical)
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.quantize = {name: float(step) for name, step in quantize.items()}
+        self.source_path = Path(source_path) if source_path else None
+        self.check_interval = check_interval
+        self.clock = clock
+
+        self._steps = [self.quantize.get(name) for name in self.numerical]
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._source_stamp = self._stat_source()
+        self._next_check = clock() + check_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, record: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Canonical, optionally quantized, feature tuple for a valid record."""
+        key = []
+        for name, step in zip(self.numerical, self._steps):
+            value = float(record[name])
+            if step is not None:
+                value = math.floor(value / step + 0.5) * step
+            key.append(value)
+        key.extend(record[name] for name in self.categorical)
+        return tuple(key)
+
+    def _stat_source(self) -> Optional[Tuple[int, int]]:
+        if self.source_path is None:
+            return None
+        try:
+            stat = os.stat(self.source_path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _check_source(self, now: float) -> None:
+        """Clear the cache if the bound model file changed (caller holds the lock)."""
+        if self.source_path is None or now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        stamp = self._stat_source()
+        if stamp != self._source_stamp:
+            self._source_stamp = stamp
+            self._entries.clear()
+            self.invalidations += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        now = self.clock()
+        with self._lock:
+            self._check_source(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if now >= expires:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries beyond max_size."""
+        now = self.clock()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def bind(self, source_path: Optional[Union[str, Path]]) -> None:
+        """Watch another model file from now on; entries are kept."""
+        with self._lock:
+            self.source_path = Path(source_path) if source_path else None
+            self._source_stamp = self._stat_source()
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after the model changed."""
+        with self._lock:
+            self._entries.clear()
+            self._source_stamp = self._stat_source()
+            self.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -1,23 +1,119 @@
+import hashlib
+import io
+import math
 import os
+import random
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-import joblib
 import numpy as np
-import pandas as pd
 import yaml
 from dotenv import load_dotenv
 from loguru import logger
 
+from core.backends import build_backend, predict_encoded
+from core.compiled import CompiledPipeline
+from core.forecaster import LoadForecaster
+from core.metrics import REGISTRY
+from core.prediction_cache import PredictionCache
+from core.registry import ModelRegistry
+from core.schema import (
+    DEFAULT_SCHEMA,
+    FeatureSchema,
+    FeatureSpec,
+    SchemaError,
+    summarize,
+)
+from core.tree_ensemble import FlatTreeEnsemble
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 load_dotenv(dotenv_path=PROJECT_ROOT / ".env")
 
+NUMERICAL_FEATURES = DEFAULT_SCHEMA.numerical
+CATEGORICAL_FEATURES = DEFAULT_SCHEMA.categorical
+# Columns in the same order as during training
+FEATURE_ORDER = DEFAULT_SCHEMA.features
+# Records predict_batch accepts at once unless the config sets max_batch_size
+MAX_BATCH_SIZE = 10000
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "predictor_stage_seconds",
+    "Time spent in each prediction stage, per single-record or batch call.",
+    ("stage",),
+)
+# Children are looked up once so the hot path only calls observe()
+_VALIDATION = STAGE_SECONDS.labels("validation")
+_CACHE = STAGE_SECONDS.labels("cache")
+_FEATURES = STAGE_SECONDS.labels("features")
+_DATAFRAME = STAGE_SECONDS.labels("dataframe")
+_PREPROCESS = STAGE_SECONDS.labels("preprocess")
+_MODEL = STAGE_SECONDS.labels("model")
+_SHADOW = STAGE_SECONDS.labels("shadow")
+
+SHADOW_PREDICTIONS = REGISTRY.counter(
+    "predictor_shadow_predictions_total",
+    "Records scored by shadow models, by whether they agreed with the served label.",
+    ("model", "outcome"),
+)
+SHADOW_ABS_DIFF = REGISTRY.histogram(
+    "predictor_shadow_abs_diff",
+    "Absolute difference between shadow and served probabilities.",
+    ("model",),
+    buckets=(0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0),
+)
+
+# Representative record scored once before a server starts taking traffic
+WARM_UP_RECORD = {
+    "duration": 10.0,
+    "src_bytes": 5000,
+    "dst_bytes": 3000,
+    "packet_count": 60,
+    "hour": 8,
+    "protocol": "TCP",
+    "service": "http",
+}
+
+
+class ModelState(NamedTuple):
+    """Everything derived from one version of the model file.
+
+    Requests read ``TrafficPredictor._state`` once and use that snapshot
+    throughout, so a reload that swaps in a new state never mixes versions
+    within a request.
+    """
+
+    pipeline: Any
+    compiled: Optional[CompiledPipeline]
+    ensemble: Optional[FlatTreeEnsemble]
+    preprocessor: Any
+    spec: FeatureSpec  # the column layout saved with the model
+    path: str  # the pickled pipeline or the exported compiled model
+    stamp: Tuple[int, int]  # (size, mtime_ns) of the file when it was read
+    sha256: str  # of the pickle; an export carries it as source_sha256
+    load_seconds: float
+    version: str = ""  # the registry version, when loaded from the registry
+
 
 class TrafficPredictor:
-    """Handles congestion predictions using a trained pipeline"""
+    """Handles congestion predictions using a trained pipeline
+
+    With the ``compiled`` engine and a ``compiled_model_path`` exported by the
+    trainer, the predictor loads that NumPy archive instead of unpickling the
+    pipeline, so neither sklearn nor pandas is imported on the scoring path.
+    pandas and joblib are only imported when a pipeline has to be used.
+
+    With the ``registry`` enabled, ``registry.serve`` (or ``model_ref``)
+    names the version or alias to serve, and the watcher follows the alias
+    when it moves. Other registry versions can be loaded side by side:
+    ``shadow`` models score every valid record next to the served one and
+    are only compared with it, while ``ab`` models each serve a fraction of
+    the records instead of it.
+    """
 
-    def __init__(self, config_path: str = ""):
+    def __init__(self, config_path: str = "", model_ref: Optional[str] = None):
         if not config_path:
             config_path = os.getenv(
                 "MODEL_CONFIG", str(PROJECT_ROOT / "core" / "config.yaml")
@@ -31,44 +127,733 @@ class TrafficPredictor:
                 "MODEL_PATH", str(PROJECT_ROOT / "assets" / "models" / "gb_model.pkl")
             ),
         )
-        self.pipeline = self._load_pipeline()
+        self.compiled_model_path = config.get("compiled_model_path")
+        self.max_batch_size = int(config.get("max_batch_size", MAX_BATCH_SIZE))
+        self.inference_engine = config.get("inference_engine", "sklearn")
+        reload_config = config.get("model_reload") or {}
+        self.reload_enabled = bool(reload_config.get("enabled", False))
+        self.reload_interval = float(reload_config.get("interval", 5.0))
+        self.export_grace = float(reload_config.get("export_grace", 30.0))
+        self.ready = False
+        self.reloads = 0
+        self.schema = FeatureSchema.from_config(config)
+        # Layout for models saved before feature specs were embedded
+        self._config_spec = FeatureSpec.from_config(config)
+        self.registry = ModelRegistry.from_config(config, PROJECT_ROOT)
+        registry_config = config.get("registry") or {}
+        self.model_ref = model_ref or registry_config.get("serve")
+        if self.model_ref and self.registry is None:
+            raise ValueError(f"Serving model {self.model_ref!r} needs the registry")
+        # Per export path: (pickle and export stamps, whether they match)
+        self._export_checks: Dict[str, Tuple[Any, bool]] = {}
+        # (pickle stamp, monotonic time) of a pickle whose export lags
+        self._export_lag: Optional[Tuple[Tuple[int, int], float]] = None
+        self._state = self._load_state()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_pid: Optional[int] = None
+        self._stop_watching = threading.Event()
+        self.features = self._build_feature_store(
+            self._state.spec, config.get("online_features") or {}
+        )
+        self.cache = self._build_cache(config.get("prediction_cache") or {})
+        self.forecaster = LoadForecaster.from_config(config)
+        self.backend = build_backend(
+            config.get("executor") or {}, config_path, self.model_ref
+        )
+        self._build_experiments(registry_config if self.registry else {})
+
+    @property
+    def pipeline(self):
+        return self._state.pipeline
 
-    def _load_pipeline(self):
-        """Load the trained pipeline from disk"""
+    @property
+    def compiled(self) -> Optional[CompiledPipeline]:
+        return self._state.compiled
+
+    @property
+    def ensemble(self) -> Optional[FlatTreeEnsemble]:
+        return self._state.ensemble
+
+    @property
+    def model_version(self) -> str:
+        """Content hash of the served model's pickle, also when served from its export."""
+        return self._state.sha256
+
+    def metric_samples(self) -> Dict[str, List[Tuple[Dict[str, str], float]]]:
+        """Model load time, version and reload count for a metrics endpoint."""
+        state = self._state
+        return {
+            "model_load_seconds": [({}, state.load_seconds)],
+            "model_info": [
+                (
+                    {
+                        "version": state.sha256[:12],
+                        "path": state.path,
+                        "engine": (
+                            "compiled"
+                            if state.compiled is not None
+                            else "flat" if state.ensemble is not None else "sklearn"
+                        ),
+                    },
+                    1.0,
+                )
+            ],
+            "model_reloads_total": [({}, float(self.reloads))],
+        }
+
+    def _paths(self, ref: Optional[str]) -> Tuple[str, Optional[str], str]:
+        """(pickle, compiled export, registry version) for a ref, or the config's."""
+        if ref is None:
+            return self.model_path, self.compiled_model_path, ""
+        entry = self.registry.get(ref)
+        return entry["model_path"], entry["compiled_model_path"], entry["version"]
+
+    def _artifact_path(self, ref: Optional[str] = None) -> str:
+        """The file to serve from: the exported compiled model when usable."""
+        model_path, compiled_model_path, _ = self._paths(ref or self.model_ref)
+        return self._choose_artifact(model_path, compiled_model_path)
+
+    def _export_current(
+        self, model_path: str, compiled_model_path: str
+    ) -> Optional[bool]:
+        """Whether the export was compiled from the pickle; None without an export.
+
+        Decided by the pickle hash the trainer stores in the export, as mtimes
+        cannot tell an export from a pickle replaced after it. The result is
+        kept per pair of file stamps, so polling does not rehash the pickle.
+        """
+        exported = self._file_stamp(compiled_model_path)
+        if exported is None:
+            return None
+        pickled = self._file_stamp(model_path)
+        if pickled is None:
+            return True
+        stamps = (pickled, exported)
+        checked = self._export_checks.get(compiled_model_path)
+        if checked is not None and checked[0] == stamps:
+            return checked[1]
         try:
-            if not Path(self.model_path).exists():
-                raise FileNotFoundError(f"Pipeline file not found at {self.model_path}")
-            return joblib.load(self.model_path)
+            source_sha256 = CompiledPipeline.read_meta(compiled_model_path).get(
+                "source_sha256"
+            )
+            if source_sha256:
+                current = source_sha256 == self._read_artifact(model_path)[2]
+            else:
+                # Exported before the pickle hash was stored
+                current = exported[1] >= pickled[1]
+        except Exception as e:
+            logger.warning(f"Cannot read compiled model {compiled_model_path}: {e}")
+            current = False
+        self._export_checks[compiled_model_path] = (stamps, current)
+        return current
+
+    def _export_pending(
+        self, model_path: str, compiled_model_path: Optional[str]
+    ) -> bool:
+        """Whether to wait for the export of a pickle that has been replaced.
+
+        The trainer writes the pickle before the export, so a reload in between
+        would serve the pickle, importing sklearn, and then reload again. An
+        export still lagging after ``export_grace`` seconds is given up on and
+        the pickle is served instead.
+        """
+        if self.inference_engine != "compiled" or not compiled_model_path:
+            return False
+        if self._export_current(model_path, compiled_model_path) is not False:
+            self._export_lag = None
+            return False
+        pickled = self._file_stamp(model_path)
+        now = time.monotonic()
+        if self._export_lag is None or self._export_lag[0] != pickled:
+            self._export_lag = (pickled, now)
+            logger.warning(
+                f"{compiled_model_path} was not exported from {model_path}; "
+                f"waiting up to {self.export_grace:g}s for its export"
+            )
+        if now - self._export_lag[1] < self.export_grace:
+            return True
+        logger.warning(
+            f"{compiled_model_path} is still stale after {self.export_grace:g}s; "
+            f"serving {model_path} instead"
+        )
+        return False
+
+    def _choose_artifact(
+        self, model_path: str, compiled_model_path: Optional[str]
+    ) -> str:
+        if self.inference_engine == "compiled" and compiled_model_path:
+            # An export of another pickle belongs to a previous model
+            if self._export_current(model_path, compiled_model_path):
+                return compiled_model_path
+        return model_path
+
+    @staticmethod
+    def _read_artifact(path: str) -> Tuple[bytes, Tuple[int, int], str]:
+        """Read a model file's bytes with its stamp and content hash.
+
+        Hashing and parsing the same bytes keeps the version matched to the
+        model, even if the file is replaced while being read.
+        """
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            payload = f.read()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        return payload, stamp, hashlib.sha256(payload).hexdigest()
+
+    def _load_pipeline(self, model_path: str) -> Tuple[Any, Tuple[int, int], str]:
+        """Load the trained pipeline from disk with its file stamp and hash"""
+        try:
+            if not Path(model_path).exists():
+                raise FileNotFoundError(f"Pipeline file not found at {model_path}")
+            import joblib
+
+            payload, stamp, sha256 = self._read_artifact(model_path)
+            return joblib.load(io.BytesIO(payload)), stamp, sha256
         except Exception as e:
             logger.error(f"Failed to load pipeline: {e}")
             raise
 
-    def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Make a congestion prediction from raw input data."""
+    def _load_state(self, ref: Optional[str] = None) -> ModelState:
+        """Load the served model, or the registry version or alias ``ref``."""
+        start = time.perf_counter()
+        ref = ref or self.model_ref
+        model_path, compiled_model_path, version = self._paths(ref)
+        path = self._choose_artifact(model_path, compiled_model_path)
+        if path != model_path:
+            payload, stamp, sha256 = self._read_artifact(path)
+            compiled, meta = CompiledPipeline.load(payload)
+            # Identify the model by its pickle, whichever artifact is served
+            sha256 = meta.get("source_sha256") or sha256
+            logger.info(f"Loaded compiled model from {path}")
+            pipeline, ensemble, preprocessor = None, compiled.ensemble, None
+            saved_spec = meta.get("feature_spec")
+        else:
+            pipeline, stamp, sha256 = self._load_pipeline(model_path)
+            compiled, ensemble, preprocessor = self._build_engine(pipeline)
+            saved_spec = getattr(pipeline, "feature_spec_", None)
+
+        if isinstance(saved_spec, dict):
+            spec = FeatureSpec.from_dict(saved_spec)
+        else:
+            spec = self._config_spec
+        spec.check_schema(self.schema)
+        return ModelState(
+            pipeline,
+            compiled,
+            ensemble,
+            preprocessor,
+            spec,
+            path,
+            stamp,
+            sha256,
+            time.perf_counter() - start,
+            version,
+        )
+
+    def _build_engine(
+        self, pipeline
+    ) -> Tuple[Optional[CompiledPipeline], Optional[FlatTreeEnsemble], Any]:
+        """Prepare the array-backed scorers for the configured engine.
+
+        ``flat`` keeps sklearn preprocessing but evaluates the trees with a
+        ``FlatTreeEnsemble``; ``compiled`` also replaces preprocessing with a
+        pandas-free encoder. Models that cannot be converted fall back to the
+        sklearn pipeline.
+        """
         try:
-            df = pd.DataFrame([input_data])
-
-            # Ensure columns are in the same order as during training
-            feature_order = [
-                "duration",
-                "src_bytes",
-                "dst_bytes",
-                "packet_count",
-                "hour",
-                "protocol",
-                "service",
-            ]
-            df = df[feature_order]
+            if self.inference_engine == "compiled":
+                compiled = CompiledPipeline.from_pipeline(pipeline)
+                return compiled, compiled.ensemble, None
+            elif self.inference_engine == "flat":
+                ensemble = FlatTreeEnsemble.from_model(pipeline.named_steps["model"])
+                return None, ensemble, pipeline[:-1]
+            elif self.inference_engine != "sklearn":
+                raise ValueError(f"Unknown inference engine '{self.inference_engine}'")
+        except Exception as e:
+            logger.warning(
+                f"{self.inference_engine} inference unavailable, "
+                f"falling back to sklearn: {e}"
+            )
+        return None, None, None
+
+    @staticmethod
+    def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def reload_if_changed(self) -> bool:
+        """Load and swap in the model file if it changed; returns True on swap.
+
+        A changed size or mtime triggers a load; the new state is built
+        completely before it replaces the old one in a single assignment, so
+        in-flight requests finish on the model they started with. A file whose
+        content hash is unchanged is not swapped, and a model that fails to
+        load or to score the warm-up record keeps the current one serving.
+        Shadow and A/B models are checked the same way after the served one.
+        """
+        with self._reload_lock:
+            swapped = self._reload_served()
+            self._reload_variants()
+            return swapped
+
+    def _reload_served(self) -> bool:
+        current = self._state
+        try:
+            model_path, compiled_model_path, _ = self._paths(self.model_ref)
+        except KeyError as e:
+            logger.error(f"Model reload failed, keeping current model: {e}")
+            return False
+        path = self._choose_artifact(model_path, compiled_model_path)
+        stamp = self._file_stamp(path)
+        if stamp is None or (path == current.path and stamp == current.stamp):
+            return False
+        if self._export_pending(model_path, compiled_model_path):
+            return False
+        try:
+            state = self._load_state()
+            # The feature store was built for the current model's aggregates
+            if state.spec.online != current.spec.online:
+                raise RuntimeError(
+                    "its online features differ; restart the server to serve it"
+                )
+            # Score the warm-up record so a broken model is never swapped in
+            record = WARM_UP_RECORD
+            if self.features is not None:
+                record = {**record, **self.features.peek(record)}
+            probability = self._predict_proba([record], state)[0]
+            if not 0.0 <= probability <= 1.0:
+                raise RuntimeError(f"warm-up probability {probability}")
+        except Exception as e:
+            logger.error(f"Model reload failed, keeping current model: {e}")
+            return False
+
+        if state.sha256 == current.sha256:
+            self._state = current._replace(
+                path=state.path, stamp=state.stamp, version=state.version
+            )
+            if self.cache is not None:
+                self.cache.bind(state.path)
+            return False
+
+        self._state = state
+        self.reloads += 1
+        if self.cache is not None:
+            self.cache.bind(state.path)
+            self.cache.clear()
+        logger.info(
+            f"Reloaded model {state.sha256[:12]} from {state.path} "
+            f"(was {current.sha256[:12]})"
+        )
+        return True
 
-            # The pipeline handles all preprocessing and prediction
-            prediction = self.pipeline.predict(df)[0]
-            probability = self.pipeline.predict_proba(df)[0][1]
+    def _reload_variants(self) -> None:
+        """Follow shadow and A/B refs whose alias or files changed."""
+        for ref, current in self.variants.items():
+            try:
+                path = self._artifact_path(ref)
+                stamp = self._file_stamp(path)
+                if stamp is None or (path == current.path and stamp == current.stamp):
+                    continue
+                state = self._load_variant(ref)
+            except Exception as e:
+                logger.error(f"Reload of model {ref} failed, keeping it as is: {e}")
+                continue
+            # Replaced, not mutated, so requests iterating it are unaffected
+            self.variants = {**self.variants, ref: state}
+            logger.info(f"Reloaded model {ref} as {state.version}")
 
+    def start_watcher(self) -> None:
+        """Poll the model file in a background thread, once per process.
+
+        Safe to call on every request: threads do not survive ``fork``, so a
+        gunicorn worker forked from a preloaded master starts its own.
+        """
+        if not self.reload_enabled or self._watcher_pid == os.getpid():
+            return
+        with self._reload_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            self._stop_watching.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, name="model-watcher", daemon=True
+            )
+            self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None and self._watcher_pid == os.getpid():
+            self._watcher.join()
+        self._watcher = None
+        self._watcher_pid = None
+
+    def _watch(self) -> None:
+        while not self._stop_watching.wait(self.reload_interval):
+            self.reload_if_changed()
+
+    @staticmethod
+    def _build_feature_store(spec: FeatureSpec, settings: Dict[str, Any]):
+        """Online aggregate features, when the model was trained with them.
+
+        Windows and keys come from the model's feature spec, not the config,
+        so served aggregates always match the trained ones.
+        """
+        if spec.online is None:
+            return None
+        # Imported only when needed; it brings in pandas
+        from core.feature_engineer import OnlineFeatureStore
+
+        return OnlineFeatureStore(
+            windows=spec.online["windows"],
+            keys=spec.online["keys"],
+            replay_rate=spec.online["replay_rate"],
+            max_keys=int(settings.get("max_keys", 10000)),
+        )
+
+    def _build_cache(self, cache_config: Dict[str, Any]) -> Optional[PredictionCache]:
+        """Optional LRU+TTL cache for ``predict``, cleared when the model file changes."""
+        if not cache_config.get("enabled", False):
+            return None
+        if self.features is not None:
+            logger.warning(
+                "Prediction cache disabled: online features change with every flow"
+            )
+            return None
+        return PredictionCache(
+            self._state.spec.numerical,
+            self._state.spec.categorical,
+            max_size=int(cache_config.get("max_size", 10000)),
+            ttl_seconds=float(cache_config.get("ttl_seconds", 60)),
+            quantize=cache_config.get("quantize"),
+            source_path=self._state.path,
+            check_interval=float(cache_config.get("check_interval", 1.0)),
+        )
+
+    def _build_experiments(self, settings: Dict[str, Any]) -> None:
+        """Load the ``shadow`` and ``ab`` registry models next to the served one."""
+        self.shadow_refs: List[str] = list(settings.get("shadow") or [])
+        self.ab: Dict[str, float] = {
+            ref: float(fraction) for ref, fraction in (settings.get("ab") or {}).items()
+        }
+        if any(fraction < 0 for fraction in self.ab.values()) or (
+            sum(self.ab.values()) > 1.0
+        ):
+            raise ValueError("registry.ab fractions must be positive and sum to <= 1")
+        self.variants: Dict[str, ModelState] = {
+            ref: self._load_variant(ref) for ref in [*self.shadow_refs, *self.ab]
+        }
+        self._random = random.Random(settings.get("seed"))
+        self._shadow_lock = threading.Lock()
+        self._shadow_stats = {
+            ref: {"records": 0, "disagreements": 0, "abs_diff_sum": 0.0, "errors": 0}
+            for ref in self.shadow_refs
+        }
+
+    def _load_variant(self, ref: str) -> ModelState:
+        state = self._load_state(ref)
+        # Records carry the online features of the served model only
+        if state.spec.online != self._state.spec.online:
+            raise ValueError(
+                f"Model {ref} was trained with other online features than the "
+                "served model"
+            )
+        return state
+
+    def _assign(self) -> Optional[str]:
+        """The A/B ref that serves the next record, or None for the served model."""
+        draw = self._random.random()
+        for ref, fraction in self.ab.items():
+            if draw < fraction:
+                return ref
+            draw -= fraction
+        return None
+
+    def _shadow_score(self, records: List[Dict[str, Any]], served: np.ndarray) -> None:
+        """Score records with every shadow model and record how it compares.
+
+        Shadow results are never returned, and a failing shadow model only
+        counts an error.
+        """
+        start = time.perf_counter()
+        variants = self.variants
+        for ref in self.shadow_refs:
+            try:
+                probabilities = self._predict_proba(records, variants[ref])
+            except Exception as e:
+                logger.warning(f"Shadow model {ref} failed: {e}")
+                SHADOW_PREDICTIONS.inc(ref, "error", amount=len(records))
+                with self._shadow_lock:
+                    self._shadow_stats[ref]["errors"] += len(records)
+                continue
+
+            diff = np.abs(probabilities - served)
+            disagreements = int(((probabilities > 0.5) != (served > 0.5)).sum())
+            observe = SHADOW_ABS_DIFF.labels(ref).observe
+            for value in diff.tolist():
+                observe(value)
+            SHADOW_PREDICTIONS.inc(ref, "agree", amount=len(records) - disagreements)
+            SHADOW_PREDICTIONS.inc(ref, "disagree", amount=disagreements)
+            with self._shadow_lock:
+                stats = self._shadow_stats[ref]
+                stats["records"] += len(records)
+                stats["disagreements"] += disagreements
+                stats["abs_diff_sum"] += float(diff.sum())
+        _SHADOW.observe(time.perf_counter() - start)
+
+    def model_stats(self) -> Dict[str, Any]:
+        """The served model and any shadow/A-B models, with shadow agreement."""
+
+        def describe(state: ModelState) -> Dict[str, Any]:
             return {
-                "congestion": bool(prediction),
+                "version": state.version,
+                "sha256": state.sha256,
+                "path": state.path,
+            }
+
+        served = self._state
+        models: Dict[str, Any] = {
+            "served": {
+                "ref": self.model_ref,
+                "fraction": 1.0 - sum(self.ab.values()),
+                **describe(served),
+            },
+            "ab": {
+                ref: {"fraction": fraction, **describe(self.variants[ref])}
+                for ref, fraction in self.ab.items()
+            },
+            "shadow": {},
+        }
+        with self._shadow_lock:
+            for ref in self.shadow_refs:
+                stats = dict(self._shadow_stats[ref])
+                records = stats["records"]
+                stats["mean_abs_diff"] = (
+                    stats.pop("abs_diff_sum") / records if records else 0.0
+                )
+                stats["agreement"] = (
+                    1.0 - stats["disagreements"] / records if records else None
+                )
+                models["shadow"][ref] = {**describe(self.variants[ref]), **stats}
+        if self.registry is not None:
+            models["aliases"] = self.registry.aliases()
+        return models
+
+    def warm_up(self) -> None:
+        """Score a known record through both the single and batch paths.
+
+        Raises if the loaded model cannot produce a valid probability; on
+        success the predictor is marked ready to serve traffic. The warm-up
+        flows are not counted in the online features or the forecast.
+        """
+        probability = self.predict(WARM_UP_RECORD)["probability"]
+        batch = self.predict_batch([WARM_UP_RECORD])[0]
+        if self.features is not None:
+            self.features.reset()
+        if self.forecaster is not None:
+            self.forecaster.reset()
+        if not 0.0 <= probability <= 1.0 or "error" in batch:
+            raise RuntimeError(f"Warm-up prediction is invalid: {probability}")
+        self.ready = True
+        logger.info(f"Predictor warmed up ({self.inference_engine} engine)")
+
+    def _predict_proba(
+        self, records: List[Dict[str, Any]], state: Optional[ModelState] = None
+    ) -> np.ndarray:
+        """Score validated records in one vectorized pass, returning P(congestion).
+
+        Records are encoded on the calling thread and the encoded matrix is
+        scored on the configured ``executor`` backend. With the inline backend
+        the sklearn engine's ``model`` stage includes the pipeline's own
+        preprocessing.
+        """
+        state = state or self._state
+        start = time.perf_counter()
+        if state.compiled is not None:
+            X = state.compiled.transform(records)
+            _PREPROCESS.observe(time.perf_counter() - start)
+            return self._score_encoded(X, state)
+
+        import pandas as pd
+
+        # Columns are built straight from the spec's layout, not reindexed
+        df = pd.DataFrame(
+            {name: [record[name] for record in records] for name in state.spec.columns}
+        )
+        built = time.perf_counter()
+        _DATAFRAME.observe(built - start)
+        if state.ensemble is not None or self.backend.name != "inline":
+            preprocessor = state.preprocessor
+            if preprocessor is None:
+                preprocessor = state.pipeline[:-1]
+            X = preprocessor.transform(df)
+            if hasattr(X, "toarray"):
+                X = X.toarray()
+            _PREPROCESS.observe(time.perf_counter() - built)
+            return self._score_encoded(X, state)
+
+        probabilities = state.pipeline.predict_proba(df)
+        _MODEL.observe(time.perf_counter() - built)
+        return np.asarray(probabilities, dtype=np.float64)[:, 1]
+
+    def _predict_proba_ab(
+        self, records: List[Dict[str, Any]]
+    ) -> Tuple[np.ndarray, List[str]]:
+        """Score records split across the served and A/B models, one pass each.
+
+        Returns the probabilities and the version that scored each record.
+        """
+        served = self._state
+        variants = self.variants
+        groups: Dict[Optional[str], List[int]] = {}
+        for position in range(len(records)):
+            groups.setdefault(self._assign(), []).append(position)
+
+        probabilities = np.empty(len(records), dtype=np.float64)
+        versions = [""] * len(records)
+        for ref, positions in groups.items():
+            state = served if ref is None else variants[ref]
+            probabilities[positions] = self._predict_proba(
+                [records[position] for position in positions], state
+            )
+            for position in positions:
+                versions[position] = state.version
+        return probabilities, versions
+
+    def _score_encoded(self, X: np.ndarray, state: ModelState) -> np.ndarray:
+        start = time.perf_counter()
+        if state.sha256 == self._state.sha256:
+            probabilities = self.backend.predict_proba(X, state)
+        else:
+            # Pool workers only hold the served model
+            probabilities = predict_encoded(state, X)
+        _MODEL.observe(time.perf_counter() - start)
+        return probabilities
+
+    def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Make a congestion prediction from raw input data.
+
+        Input that does not match the schema raises ``SchemaError`` with
+        per-field errors before any scoring work, without logging an error.
+        """
+        start = time.perf_counter()
+        input_data, errors = self.schema.coerce(input_data)
+        validated = time.perf_counter()
+        _VALIDATION.observe(validated - start)
+        if errors:
+            raise SchemaError(errors)
+
+        try:
+            if self.features is not None:
+                input_data = {**input_data, **self.features.observe(input_data)}
+                _FEATURES.observe(time.perf_counter() - validated)
+
+            # Only records the served model scores go through the cache
+            variant = self._assign() if self.ab else None
+            if self.cache is not None and variant is None:
+                key = self.cache.make_key(input_data)
+                cached = self.cache.get(key)
+                _CACHE.observe(time.perf_counter() - validated)
+                if cached is not None:
+                    if self.forecaster is not None:
+                        self.forecaster.observe(input_data, cached["probability"])
+                    return dict(cached)
+
+            # The label is derived from the probability instead of a second
+            # predict() pass through the pipeline.
+            state = self._state if variant is None else self.variants[variant]
+            if state.compiled is not None:
+                start = time.perf_counter()
+                row = state.compiled.transform_one(input_data)
+                encoded = time.perf_counter()
+                probability = state.compiled.predict_proba_row(row)
+                _PREPROCESS.observe(encoded - start)
+                _MODEL.observe(time.perf_counter() - encoded)
+            else:
+                probability = self._predict_proba([input_data], state)[0]
+
+            result = {
+                "congestion": bool(probability > 0.5),
                 "probability": float(probability),
             }
+            if self.ab:
+                result["model"] = state.version
+            if self.shadow_refs:
+                self._shadow_score([input_data], np.array([result["probability"]]))
+            if self.forecaster is not None:
+                self.forecaster.observe(input_data, result["probability"])
+            if self.cache is not None and variant is None:
+                self.cache.put(key, result)
+                return dict(result)
+            return result
 
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             raise
+
+    def predict_batch(self, records: List[Any]) -> List[Dict[str, Any]]:
+        """Validate and score many raw records in a single vectorized pass.
+
+        Returns one result per input record, in order. Records that fail
+        validation get an ``error`` summary and per-field ``errors`` instead
+        of a prediction so that a single bad row does not reject the whole
+        batch.
+        """
+        if len(records) > self.max_batch_size:
+            raise ValueError(
+                f"Batch of {len(records)} records exceeds the limit of "
+                f"{self.max_batch_size}"
+            )
+
+        results: List[Dict[str, Any]] = [{} for _ in records]
+        valid_index: List[int] = []
+        valid_records: List[Dict[str, Any]] = []
+
+        start = time.perf_counter()
+        coerce = self.schema.coerce
+        for i, record in enumerate(records):
+            row, errors = coerce(record)
+            if errors:
+                results[i] = {"index": i, "error": summarize(errors), "errors": errors}
+            else:
+                valid_index.append(i)
+                valid_records.append(row)
+        validated = time.perf_counter()
+        _VALIDATION.observe(validated - start)
+
+        if self.features is not None and valid_records:
+            # Observed in input order, so later records see the earlier ones
+            valid_records = [
+                {**record, **self.features.observe(record)} for record in valid_records
+            ]
+            _FEATURES.observe(time.perf_counter() - validated)
+
+        if valid_records:
+            try:
+                if self.ab:
+                    probabilities, versions = self._predict_proba_ab(valid_records)
+                else:
+                    probabilities = self._predict_proba(valid_records)
+            except Exception as e:
+                logger.error(f"Batch prediction failed: {e}")
+                raise
+
+            for i, probability in zip(valid_index, probabilities):
+                results[i] = {
+                    "index": i,
+                    "congestion": bool(probability > 0.5),
+                    "probability": float(probability),
+                }
+            if self.ab:
+                for i, version in zip(valid_index, versions):
+                    results[i]["model"] = version
+            if self.shadow_refs:
+                self._shadow_score(valid_records, probabilities)
+            if self.forecaster is not None:
+                for record, probability in zip(valid_records, probabilities):
+                    self.forecaster.observe(record, float(probability))
+
+        return results
@@ -0,0 +1,194 @@
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from loguru import logger
+
+INDEX_FORMAT_VERSION = 1
+# Moved to every new version; "production" and pins only move when asked
+LATEST = "latest"
+PRODUCTION = "production"
+
+
+class ModelRegistry:
+    """Versioned copies of trained models with their metadata and aliases.
+
+    Every registered model gets a directory ``v<n>/`` holding the pickled
+    pipeline, the compiled export when there is one, and ``meta.json`` with
+    its metrics, feature spec and provenance. ``index.json`` maps aliases
+    such as ``latest``, ``production`` or any pinned name to versions and
+    keeps each version's metadata, so resolving a reference is two dict
+    lookups. The parsed index is kept in memory and only re-read when the
+    file's size or mtime changes, which makes polling an alias one ``stat``.
+
+    Writers serialize on an ``flock`` of ``.lock`` in the registry directory
+    and replace the index atomically, so readers never see a partial one.
+    Artifacts are hard-linked from the trainer's output where possible,
+    since the trainer replaces its files by rename instead of rewriting them.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        self._cached: Tuple[Optional[Tuple[int, int]], Dict[str, Any]] = (None, {})
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], project_root: Path
+    ) -> Optional["ModelRegistry"]:
+        """The registry of the ``registry`` config section, when enabled."""
+        settings = config.get("registry") or {}
+        if not settings.get("enabled", False):
+            return None
+        return cls(project_root / settings.get("dir", "assets/models/registry"))
+
+    @staticmethod
+    def _empty_index() -> Dict[str, Any]:
+        return {
+            "format_version": INDEX_FORMAT_VERSION,
+            "next_version": 1,
+            "aliases": {},
+            "versions": {},
+        }
+
+    def _index(self) -> Dict[str, Any]:
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return self._empty_index()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        cached_stamp, index = self._cached
+        if stamp != cached_stamp:
+            index = self._read_index()
+            self._cached = (stamp, index)
+        return index
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return self._empty_index()
+        if index.get("format_version") != INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported registry index version {index.get('format_version')}"
+            )
+        return index
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    @contextmanager
+    def _locked(self) -> Iterator[Dict[str, Any]]:
+        """The current index, for a read-modify-write under the registry lock."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # A fresh copy: another writer may have changed the file, and
+            # readers of the cached index must not see it half updated
+            yield self._read_index()
+
+    def resolve(self, ref: str) -> str:
+        """The version an alias points at, or ``ref`` itself if it is a version."""
+        index = self._index()
+        version = index["aliases"].get(ref, ref)
+        if version not in index["versions"]:
+            raise KeyError(f"Unknown model version or alias {ref!r} in {self.root}")
+        return version
+
+    def get(self, ref: str) -> Dict[str, Any]:
+        """Metadata of a version or alias, with absolute artifact paths."""
+        index = self._index()
+        version = self.resolve(ref)
+        entry = dict(index["versions"][version])
+        entry["version"] = version
+        entry["model_path"] = str(self.root / entry["model_path"])
+        if entry.get("compiled_model_path"):
+            entry["compiled_model_path"] = str(self.root / entry["compiled_model_path"])
+        return entry
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Every version's metadata, oldest first."""
+        return [self.get(version) for version in self._index()["versions"]]
+
+    def aliases(self) -> Dict[str, str]:
+        return dict(self._index()["aliases"])
+
+    def register(
+        self,
+        model_path: Union[str, Path],
+        compiled_model_path: Optional[Union[str, Path]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        aliases: Sequence[str] = (),
+    ) -> str:
+        """Store a trained model as a new version and return its name.
+
+        ``latest`` always moves to the new version, as does ``production``
+        when the registry has none yet; ``aliases`` names any others to move.
+        """
+        with self._locked() as index:
+            version = f"v{index['next_version']}"
+            entry = {
+                **(metadata or {}),
+                "created_at": time.time(),
+                "model_path": f"{version}/model.pkl",
+                "compiled_model_path": None,
+            }
+
+            tmp_dir = Path(tempfile.mkdtemp(dir=self.root, prefix=".register-"))
+            try:
+                _link_or_copy(model_path, tmp_dir / "model.pkl")
+                if compiled_model_path and Path(compiled_model_path).exists():
+                    _link_or_copy(compiled_model_path, tmp_dir / "model.npz")
+                    entry["compiled_model_path"] = f"{version}/model.npz"
+                with open(tmp_dir / "meta.json", "w") as f:
+                    json.dump({"version": version, **entry}, f, indent=2)
+                os.replace(tmp_dir, self.root / version)
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+            index["next_version"] += 1
+            index["versions"][version] = entry
+            moved = [LATEST, *aliases]
+            if PRODUCTION not in index["aliases"]:
+                moved.append(PRODUCTION)
+            for alias in moved:
+                index["aliases"][alias] = version
+            self._write_index(index)
+
+        logger.info(f"Registered model {version} as {', '.join(sorted(set(moved)))}")
+        return version
+
+    def set_alias(self, alias: str, ref: str) -> str:
+        """Point ``alias`` at a version (or at what another alias points at)."""
+        with self._locked() as index:
+            version = index["aliases"].get(ref, ref)
+            if version not in index["versions"]:
+                raise KeyError(f"Unknown model version or alias {ref!r} in {self.root}")
+            index["aliases"][alias] = version
+            self._write_index(index)
+        logger.info(f"Alias {alias} now points at model {version}")
+        return version
+
+    def remove_alias(self, alias: str) -> None:
+        with self._locked() as index:
+            if index["aliases"].pop(alias, None) is None:
+                raise KeyError(f"Unknown alias {alias!r} in {self.root}")
+            self._write_index(index)
+
+
+def _link_or_copy(source: Union[str, Path], target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        # Another filesystem, or one without hard links
+        shutil.copy2(source, target)
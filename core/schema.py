@@ -0,0 +1,316 @@
+import math
+import numbers
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+FIELD_TYPES = ("int", "float", "category")
+# Bump when the layout of FeatureSpec.to_dict changes
+FEATURE_SPEC_VERSION = 1
+
+# The flow record as generated and served; see the ``schema`` config section
+DEFAULT_FIELDS: Dict[str, Dict[str, Any]] = {
+    "duration": {"type": "float", "min": 0},
+    "src_bytes": {"type": "int", "min": 0},
+    "dst_bytes": {"type": "int", "min": 0},
+    "packet_count": {"type": "int", "min": 0},
+    "hour": {"type": "int", "min": 0, "max": 23},
+    "protocol": {"type": "category", "values": ["TCP", "UDP", "ICMP"]},
+    "service": {
+        "type": "category",
+        "values": ["http", "ftp", "ssh", "smtp", "dns", "ntp", "other", "none"],
+    },
+    # Event time for the online features and the forecaster, not a model input
+    "timestamp": {"type": "float", "required": False},
+}
+
+FieldError = Dict[str, str]
+# value -> (coerced value, (code, message) or None)
+Check = Callable[[Any], Tuple[Any, Optional[Tuple[str, str]]]]
+
+
+class SchemaError(ValueError):
+    """A record that does not match the feature schema.
+
+    ``errors`` lists one ``{"field", "code", "message"}`` entry per problem;
+    the exception message summarizes them in one line.
+    """
+
+    def __init__(self, errors: List[FieldError]):
+        self.errors = errors
+        super().__init__(summarize(errors))
+
+
+def summarize(errors: List[FieldError]) -> str:
+    """One line for a list of field errors, with missing fields grouped."""
+    missing = [error["field"] for error in errors if error["code"] == "missing"]
+    messages = [f"missing fields: {', '.join(missing)}"] if missing else []
+    messages += [error["message"] for error in errors if error["code"] != "missing"]
+    return "; ".join(messages)
+
+
+def _range_message(name: str, low: Optional[float], high: Optional[float]) -> str:
+    if low is not None and high is not None:
+        return f"field '{name}' must be between {low:g} and {high:g}"
+    if low is not None:
+        return f"field '{name}' must be at least {low:g}"
+    return f"field '{name}' must be at most {high:g}"
+
+
+def _numeric_check(name: str, spec: Dict[str, Any]) -> Check:
+    integer = spec["type"] == "int"
+    low = None if spec.get("min") is None else float(spec["min"])
+    high = None if spec.get("max") is None else float(spec["max"])
+    kind = "an integer" if integer else "a number"
+    type_error = ("type", f"field '{name}' must be {kind}")
+    finite_error = ("type", f"field '{name}' must be finite")
+    range_error = None
+    if low is not None or high is not None:
+        range_error = ("range", _range_message(name, low, high))
+
+    def check(value):
+        if type(value) is not int:
+            if type(value) is not float:
+                # bool is an int subclass but never a valid measurement
+                if isinstance(value, bool) or not isinstance(value, numbers.Real):
+                    return None, type_error
+                value = float(value)
+            if not math.isfinite(value):
+                return None, finite_error
+            if integer:
+                if not value.is_integer():
+                    return None, type_error
+                value = int(value)
+        if (low is not None and value < low) or (high is not None and value > high):
+            return None, range_error
+        return value if integer else float(value), None
+
+    return check
+
+
+def _category_check(name: str, spec: Dict[str, Any]) -> Check:
+    values = spec.get("values")
+    allowed = None if values is None else frozenset(str(v) for v in values)
+    type_error = ("type", f"field '{name}' must be a string")
+    if allowed is not None:
+        listed = ", ".join(str(v) for v in values)
+        vocabulary_error = ("vocabulary", f"field '{name}' must be one of: {listed}")
+
+    def check(value):
+        if type(value) is not str:
+            return None, type_error
+        if allowed is not None and value not in allowed:
+            return None, vocabulary_error
+        return value, None
+
+    return check
+
+
+class FeatureSchema:
+    """Names, types, ranges and vocabularies of the fields of a flow record.
+
+    The declarative ``fields`` mapping is compiled once into one check per
+    field. ``coerce`` turns a decoded JSON object into a typed row holding
+    only the declared fields, ``int`` values as ``int`` and ``float`` values
+    as ``float``, or returns per-field errors; nothing reaches pandas or the
+    model before it passes. ``check_frame`` applies the same rules to a
+    training frame column by column. Required ``int``/``float`` fields, then
+    required ``category`` fields, in declaration order, are the model inputs.
+    """
+
+    def __init__(self, fields: Dict[str, Dict[str, Any]]):
+        for name, spec in fields.items():
+            if spec.get("type") not in FIELD_TYPES:
+                raise ValueError(
+                    f"Field '{name}' has type {spec.get('type')!r}; "
+                    f"expected one of {FIELD_TYPES}"
+                )
+        self.fields = fields
+        required = [name for name, spec in fields.items() if spec.get("required", True)]
+        self.numerical = [n for n in required if fields[n]["type"] != "category"]
+        self.categorical = [n for n in required if fields[n]["type"] == "category"]
+        self.features = self.numerical + self.categorical
+        self._checks: List[Tuple[str, bool, Check]] = [
+            (
+                name,
+                spec.get("required", True),
+                (
+                    _category_check(name, spec)
+                    if spec["type"] == "category"
+                    else _numeric_check(name, spec)
+                ),
+            )
+            for name, spec in fields.items()
+        ]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FeatureSchema":
+        """The schema from the ``schema`` config section, or the default one."""
+        return cls(config.get("schema") or DEFAULT_FIELDS)
+
+    def coerce(self, record: Any) -> Tuple[Optional[Dict[str, Any]], List[FieldError]]:
+        """Return ``(typed row, [])`` for a valid record, else ``(None, errors)``."""
+        if not isinstance(record, dict):
+            return None, [
+                {
+                    "field": "",
+                    "code": "type",
+                    "message": "record must be a JSON object",
+                }
+            ]
+
+        row: Dict[str, Any] = {}
+        errors: List[FieldError] = []
+        for name, required, check in self._checks:
+            value = record.get(name)
+            if value is None:
+                if required:
+                    errors.append(
+                        {
+                            "field": name,
+                            "code": "missing",
+                            "message": f"field '{name}' is required",
+                        }
+                    )
+                continue
+            value, error = check(value)
+            if error is None:
+                row[name] = value
+            else:
+                errors.append({"field": name, "code": error[0], "message": error[1]})
+        if errors:
+            return None, errors
+        return row, errors
+
+    def validate(self, record: Any) -> Dict[str, Any]:
+        """The typed row for a record; raises ``SchemaError`` if it is invalid."""
+        row, errors = self.coerce(record)
+        if errors:
+            raise SchemaError(errors)
+        return row
+
+    def check_frame(self, df) -> Tuple[np.ndarray, Dict[str, int]]:
+        """Rows of a frame that satisfy the schema, and invalid counts per field.
+
+        Raises ``SchemaError`` if a required column is absent altogether.
+        """
+        missing = [
+            {"field": name, "code": "missing", "message": f"column '{name}' is absent"}
+            for name in self.features
+            if name not in df.columns
+        ]
+        if missing:
+            raise SchemaError(missing)
+
+        valid = np.ones(len(df), dtype=bool)
+        invalid: Dict[str, int] = {}
+        for name, spec in self.fields.items():
+            if name not in df.columns:
+                continue
+            column = df[name]
+            present = column.notna().to_numpy()
+            if spec["type"] == "category":
+                ok = present
+                if spec.get("values") is not None:
+                    ok = ok & column.astype(str).isin(spec["values"]).to_numpy()
+            else:
+                values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+                ok = np.isfinite(values)
+                if spec["type"] == "int":
+                    ok &= np.floor(values) == values
+                if spec.get("min") is not None:
+                    ok &= values >= spec["min"]
+                if spec.get("max") is not None:
+                    ok &= values <= spec["max"]
+            if not spec.get("required", True):
+                ok = ok | ~present
+            if not ok.all():
+                invalid[name] = int((~ok).sum())
+                valid &= ok
+        return valid, invalid
+
+
+DEFAULT_SCHEMA = FeatureSchema(DEFAULT_FIELDS)
+
+
+class FeatureSpec:
+    """The column layout a model was trained on, saved inside its artifact.
+
+    Lists the raw numeric and categorical inputs, the category vocabularies
+    and the online aggregate features, if any. The trainer selects exactly
+    these columns, and the predictor reads them back from the model it loads
+    instead of from the config, so training and serving cannot disagree on
+    the columns. ``version`` guards the serialized layout.
+    """
+
+    def __init__(
+        self,
+        numerical: List[str],
+        categorical: List[str],
+        categories: Optional[Dict[str, Optional[List[str]]]] = None,
+        online: Optional[Dict[str, Any]] = None,
+    ):
+        self.numerical = list(numerical)
+        self.categorical = list(categorical)
+        self.categories = categories or {name: None for name in categorical}
+        self.online = online
+        self.online_names: List[str] = list(online["names"]) if online else []
+        # Model input columns: numerics, then online aggregates, then categories
+        self.numeric_columns = self.numerical + self.online_names
+        self.columns = self.numeric_columns + self.categorical
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "FeatureSpec":
+        """The layout the ``schema`` and ``online_features`` sections describe."""
+        schema = FeatureSchema.from_config(config)
+        online = None
+        if (config.get("online_features") or {}).get("enabled", False):
+            # Imported only when enabled; it brings in pandas
+            from core.feature_engineer import OnlineFeatureStore
+
+            store = OnlineFeatureStore.from_config(config)
+            online = {
+                "windows": list(store.windows),
+                "keys": list(store.keys),
+                "replay_rate": store.replay_rate,
+                "names": store.feature_names,
+            }
+        return cls(
+            schema.numerical,
+            schema.categorical,
+            {name: schema.fields[name].get("values") for name in schema.categorical},
+            online,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": FEATURE_SPEC_VERSION,
+            "numerical": self.numerical,
+            "categorical": self.categorical,
+            "categories": self.categories,
+            "online": self.online,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureSpec":
+        if data.get("version") != FEATURE_SPEC_VERSION:
+            raise ValueError(f"Unsupported feature spec version {data.get('version')}")
+        return cls(
+            data["numerical"], data["categorical"], data["categories"], data["online"]
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, FeatureSpec) and self.to_dict() == other.to_dict()
+
+    def check_schema(self, schema: FeatureSchema) -> None:
+        """Raise if the schema does not require every input the model reads."""
+        missing = [name for name in self.raw_inputs if name not in schema.features]
+        if missing:
+            raise ValueError(
+                f"Model inputs {missing} are not required fields of the schema"
+            )
+
+    @property
+    def raw_inputs(self) -> List[str]:
+        """Fields read from a request; online aggregates are derived from them."""
+        return self.numerical + self.categorical
@@ -0,0 +1,228 @@
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import yaml
+from loguru import logger
+
+from core.predictor import MAX_BATCH_SIZE, PROJECT_ROOT, TrafficPredictor
+from core.schema import DEFAULT_SCHEMA, FeatureSchema
+
+FORMATS = ("csv", "jsonl")
+# "model" is only filled in when registry.ab splits records between models
+OUTPUT_FIELDS = ["index", "congestion", "probability", "model", "error", "errors"]
+
+# Set in each pool worker by _init_worker
+_worker_predictor: Optional[TrafficPredictor] = None
+
+
+def infer_format(path: str, default: str = "jsonl") -> str:
+    """Pick csv or jsonl from a file extension; stdin/stdout use ``default``."""
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return default
+
+
+def _parse_number(value: str) -> Any:
+    """CSV cells are text; leave anything unparsable for validation to reject."""
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def load_config(config_path: str = "") -> Dict[str, Any]:
+    """The model config a predictor built from ``config_path`` reads."""
+    if not config_path:
+        config_path = os.getenv(
+            "MODEL_CONFIG", str(PROJECT_ROOT / "core" / "config.yaml")
+        )
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def load_schema(config_path: str = "") -> FeatureSchema:
+    """The schema of the model config a predictor built from ``config_path`` uses."""
+    return FeatureSchema.from_config(load_config(config_path))
+
+
+def check_batch_size(batch_size: int, max_batch_size: int) -> None:
+    """Reject a batch size the predictor would refuse on every batch."""
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+    if batch_size > max_batch_size:
+        raise ValueError(
+            f"batch_size {batch_size} exceeds the model's max_batch_size "
+            f"of {max_batch_size}"
+        )
+
+
+def read_records(
+    source: TextIO, fmt: str, schema: FeatureSchema = DEFAULT_SCHEMA
+) -> Iterator[Any]:
+    """Lazily parse raw records from a CSV or JSON Lines stream.
+
+    CSV cells of the schema's ``int``/``float`` fields are parsed as numbers.
+    Malformed JSON lines are passed through as text, so they fail validation
+    for that row only instead of aborting the whole stream.
+    """
+    if fmt == "csv":
+        numeric = [
+            name for name, spec in schema.fields.items() if spec["type"] != "category"
+        ]
+        for row in csv.DictReader(source):
+            for name in numeric:
+                if name in row:
+                    row[name] = _parse_number(row[name])
+            yield row
+    elif fmt == "jsonl":
+        for line in source:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+    else:
+        raise ValueError(f"Unknown input format {fmt!r}; expected one of {FORMATS}")
+
+
+def iter_batches(records: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Group a stream into lists of at most ``batch_size`` records."""
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _init_worker(config_path: str) -> None:
+    global _worker_predictor
+    _worker_predictor = TrafficPredictor(config_path=config_path)
+
+
+def _score_batch(batch: List[Any]) -> List[Dict[str, Any]]:
+    return _worker_predictor.predict_batch(batch)
+
+
+def score_batches(
+    batches: Iterable[List[Any]],
+    config_path: str = "",
+    workers: int = 1,
+    predictor: Optional[TrafficPredictor] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Score batches in input order, numbering results across the stream.
+
+    With ``workers > 1`` each pool process loads its own predictor and at most
+    two batches per worker are in flight, so memory stays bounded however
+    long the input is.
+    """
+
+    def renumber(offset: int, results: List[Dict[str, Any]]):
+        for result in results:
+            result["index"] += offset
+        return results
+
+    offset = 0
+    if workers <= 1:
+        predictor = predictor or TrafficPredictor(config_path=config_path)
+        for batch in batches:
+            yield renumber(offset, predictor.predict_batch(batch))
+            offset += len(batch)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(config_path,)
+    ) as pool:
+        pending: "deque[Tuple[int, Any]]" = deque()
+        for batch in batches:
+            pending.append((offset, pool.submit(_score_batch, batch)))
+            offset += len(batch)
+            if len(pending) >= 2 * workers:
+                start, future = pending.popleft()
+                yield renumber(start, future.result())
+        while pending:
+            start, future = pending.popleft()
+            yield renumber(start, future.result())
+
+
+class ResultWriter:
+    """Write prediction results incrementally as CSV or JSON Lines."""
+
+    def __init__(self, target: TextIO, fmt: str):
+        if fmt not in FORMATS:
+            raise ValueError(
+                f"Unknown output format {fmt!r}; expected one of {FORMATS}"
+            )
+        self.target = target
+        self.fmt = fmt
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(target, fieldnames=OUTPUT_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        if self._csv is not None:
+            # Per-field errors are a list; CSV gets them as one JSON cell
+            self._csv.writerows(
+                (
+                    {**result, "errors": json.dumps(result["errors"])}
+                    if "errors" in result
+                    else result
+                )
+                for result in results
+            )
+        else:
+            self.target.writelines(json.dumps(result) + "\n" for result in results)
+        self.target.flush()
+
+
+def score_stream(
+    source: TextIO,
+    target: TextIO,
+    input_format: str = "jsonl",
+    output_format: str = "jsonl",
+    batch_size: int = 1000,
+    workers: int = 1,
+    config_path: str = "",
+    predictor: Optional[TrafficPredictor] = None,
+) -> Dict[str, int]:
+    """Score every record of ``source`` and write one result per record to ``target``.
+
+    Returns counts of rows read, rows that failed validation and rows
+    predicted congested.
+    """
+    if predictor is not None:
+        schema, max_batch_size = predictor.schema, predictor.max_batch_size
+    else:
+        config = load_config(config_path)
+        schema = FeatureSchema.from_config(config)
+        max_batch_size = int(config.get("max_batch_size", MAX_BATCH_SIZE))
+    check_batch_size(batch_size, max_batch_size)
+
+    summary = {"rows": 0, "errors": 0, "congested": 0}
+    writer = ResultWriter(target, output_format)
+    batches = iter_batches(read_records(source, input_format, schema), batch_size)
+    try:
+        for results in score_batches(batches, config_path, workers, predictor):
+            writer.write(results)
+            summary["rows"] += len(results)
+            for result in results:
+                if "error" in result:
+                    summary["errors"] += 1
+                elif result["congestion"]:
+                    summary["congested"] += 1
+    except Exception as e:
+        logger.error(f"Scoring failed after {summary['rows']} rows: {e}")
+        raise
+    return summary
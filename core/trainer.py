@@ -1,15 +1,31 @@
 import os
+import tempfile
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import joblib
-import numpy as np
 import pandas as pd
 import yaml
 from dotenv import load_dotenv
 from loguru import logger
 from sklearn.compose import ColumnTransformer
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+)
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
 from sklearn.feature_selection import SelectKBest, f_classif
 from sklearn.metrics import (
     accuracy_score,
@@ -18,9 +34,20 @@ from sklearn.metrics import (
     recall_score,
     roc_auc_score,
 )
-from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    train_test_split,
+)
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from core.compiled import CompiledPipeline
+from core.data_loader import concat_chunks, iter_chunks, stream_train_test_split
+from core.dataset_cache import DatasetCache, file_sha256
+from core.feature_engineer import OnlineFeatureStore
+from core.registry import LATEST, PRODUCTION, ModelRegistry
+from core.schema import FeatureSchema, FeatureSpec
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
@@ -44,34 +71,136 @@ class TrafficModelTrainer:
                 "MODEL_PATH", str(PROJECT_ROOT / "assets" / "models" / "gb_model.pkl")
             ),
         )
+        self.compiled_model_path = config.get("compiled_model_path")
+        self.model_type = config.get("model_type", "gradient_boosting")
+        self.data_loading = config.get("data_loading") or {}
+        cache_config = config.get("dataset_cache") or {}
+        self.dataset_cache = (
+            DatasetCache(PROJECT_ROOT / cache_config.get("dir", "assets/cache"))
+            if cache_config.get("enabled")
+            else None
+        )
+        self.schema = FeatureSchema.from_config(config)
+        self.spec = FeatureSpec.from_config(config)
+        self.registry = ModelRegistry.from_config(config, PROJECT_ROOT)
         self.pipeline = None
+        # Registry version of the last model this trainer saved
+        self.version: Optional[str] = None
 
     def load_data(self, data_path: str) -> pd.DataFrame:
-        """Load training data"""
+        """Load training data, from the columnar cache when enabled"""
         try:
             full_data_path = PROJECT_ROOT / data_path
-            df = pd.read_csv(full_data_path)
-            return df
+            chunksize = self.data_loading.get("chunksize", 100_000)
+            if self.dataset_cache is not None:
+                return self.dataset_cache.load(full_data_path, chunksize=chunksize)
+            return concat_chunks(iter_chunks(full_data_path, chunksize=chunksize))
         except Exception as e:
             logger.error(f"Failed to load data: {e}")
             raise
 
+    def _iter_data(self, data_path: str) -> Iterator[pd.DataFrame]:
+        """Stream training data in chunks, from the columnar cache when enabled"""
+        full_data_path = PROJECT_ROOT / data_path
+        chunksize = self.data_loading.get("chunksize", 100_000)
+        if self.dataset_cache is not None:
+            return self.dataset_cache.iter_chunks(full_data_path, chunksize=chunksize)
+        return iter_chunks(full_data_path, chunksize=chunksize)
+
+    def _conform(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Drop rows the serving schema would reject, so the model never learns them"""
+        for chunk in chunks:
+            valid, invalid = self.schema.check_frame(chunk)
+            if invalid:
+                logger.warning(
+                    f"Dropping {int((~valid).sum())} of {len(chunk)} rows outside "
+                    f"the feature schema: {invalid}"
+                )
+                chunk = chunk[valid]
+            yield chunk
+
+    def _add_online_features(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        """Replay chunks in file order through a fresh online feature store.
+
+        The rows are taken to be in time order. ``timestamp`` is only used to
+        age the aggregates and is dropped rather than learned from.
+        """
+        store = OnlineFeatureStore.from_config(self.config)
+        for chunk in chunks:
+            if store is not None:
+                chunk = store.transform(chunk).drop(
+                    columns=["timestamp"], errors="ignore"
+                )
+            yield chunk
+
+    def _split_data(self, data_path: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Return (train, test) frames, streaming the CSV when configured"""
+        if self.data_loading.get("split"):
+            chunks = self._conform(self._iter_data(data_path))
+            return stream_train_test_split(
+                self._add_online_features(chunks),
+                test_size=0.2,
+                method=self.data_loading["split"],
+                max_rows=self.data_loading.get("max_rows"),
+                seed=42,
+            )
+
+        chunks = self._conform([self.load_data(data_path)])
+        df = next(self._add_online_features(chunks))
+        return train_test_split(
+            df, test_size=0.2, random_state=42, stratify=df["congestion"]
+        )
+
+    def _features_and_label(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
+        """The spec's columns, in its order, and the label; other columns are unused"""
+        return df[self.spec.columns], df["congestion"]
+
     def train(self, data_path: str) -> Dict[str, Any]:
         try:
-            df = self.load_data(data_path)
+            start = time.perf_counter()
+            train_df, test_df = self._split_data(data_path)
+            X_train, y_train = self._features_and_label(train_df)
+            X_test, y_test = self._features_and_label(test_df)
 
-            X = df.drop("congestion", axis=1)
-            y = df["congestion"]
+            self.pipeline = self._build_pipeline(
+                self.spec.numeric_columns, self.spec.categorical
+            )
 
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
+            # Hyperparameter tuning
+            grid_params = self.config.get(
+                "hist_grid_search_params"
+                if self.model_type == "hist_gradient_boosting"
+                else "grid_search_params"
             )
+            if grid_params:
+                self.pipeline = self._search(grid_params, X_train, y_train)
+            else:
+                self.pipeline.fit(X_train, y_train)
+
+            # Serving reads its column layout back from the artifact
+            self.pipeline.feature_spec_ = self.spec.to_dict()
+            metrics = self._evaluate(X_test, y_test)
+
+            logger.success("Model training completed successfully")
+            for metric, value in metrics.items():
+                logger.info(f"{metric}: {value:.3f}")
+
+            self._save_pipeline()
+            self._register(data_path, metrics, time.perf_counter() - start, "full")
+            return metrics
 
-            # Identify categorical and numerical features
-            categorical_features = ["protocol", "service"]
-            numerical_features = X.select_dtypes(include=np.number).columns.tolist()
+        except Exception as e:
+            logger.error(f"Training failed: {e}")
+            raise
 
-            # Create the preprocessing pipelines for both numeric and categorical data
+    def _build_pipeline(
+        self, numerical_features: List[str], categorical_features: List[str]
+    ) -> Pipeline:
+        """Create the unfitted pipeline for the configured model backend"""
+        if self.model_type == "gradient_boosting":
+            # Scale numerics, one-hot encode categoricals, then select features
             preprocessor = ColumnTransformer(
                 transformers=[
                     ("num", StandardScaler(), numerical_features),
@@ -82,9 +211,7 @@ class TrafficModelTrainer:
                     ),
                 ]
             )
-
-            # Create the full pipeline
-            self.pipeline = Pipeline(
+            return Pipeline(
                 steps=[
                     ("preprocessor", preprocessor),
                     (
@@ -100,55 +227,334 @@ class TrafficModelTrainer:
                 ]
             )
 
-            # Hyperparameter tuning
-            if self.config.get("grid_search_params"):
-                grid = GridSearchCV(
+        if self.model_type == "hist_gradient_boosting":
+            # Trees need no scaling, and categoricals are split natively on
+            # ordinal codes instead of being one-hot encoded. Unknown values
+            # map to -1, which the model treats as missing.
+            preprocessor = ColumnTransformer(
+                transformers=[
+                    ("num", "passthrough", numerical_features),
+                    (
+                        "cat",
+                        OrdinalEncoder(
+                            handle_unknown="use_encoded_value", unknown_value=-1
+                        ),
+                        categorical_features,
+                    ),
+                ]
+            )
+            n_numerical = len(numerical_features)
+            categorical_mask = [False] * n_numerical + [True] * len(
+                categorical_features
+            )
+            return Pipeline(
+                steps=[
+                    ("preprocessor", preprocessor),
+                    (
+                        "model",
+                        HistGradientBoostingClassifier(
+                            categorical_features=categorical_mask,
+                            **self.config.get("hist_model_params", {}),
+                        ),
+                    ),
+                ]
+            )
+
+        raise ValueError(f"Unknown model_type '{self.model_type}'")
+
+    def _search(
+        self, grid_params: Dict[str, List[Any]], X: pd.DataFrame, y: pd.Series
+    ) -> Pipeline:
+        """Tune hyperparameters and return the refitted best pipeline.
+
+        ``search.strategy: grid`` evaluates every candidate on every fold.
+        ``halving`` uses successive halving: all candidates start on a small
+        budget of ``search.resource`` (training rows, or boosting rounds) and
+        only the best 1/``factor`` advance to the next, larger budget. With
+        ``search.early_stopping`` each candidate also stops adding trees once
+        an internal validation split stops improving.
+
+        Preprocessing and feature selection only depend on the fold, not on
+        the model parameters being searched, so their fitted outputs are
+        cached on disk through the pipeline's ``memory`` and shared between
+        candidates.
+        """
+        settings = self.config.get("search") or {}
+        strategy = settings.get("strategy", "grid")
+        grid_params = dict(grid_params)
+        model_step = self.pipeline.named_steps["model"]
+        is_hist = isinstance(model_step, HistGradientBoostingClassifier)
+
+        if settings.get("early_stopping"):
+            if is_hist:
+                model_step.set_params(early_stopping=True)
+            else:
+                model_step.set_params(n_iter_no_change=10, validation_fraction=0.1)
+
+        cache_dir = settings.get("cache_dir")
+        with tempfile.TemporaryDirectory(prefix="pipeline-cache-") as tmp_dir:
+            self.pipeline.set_params(
+                memory=joblib.Memory(
+                    str(PROJECT_ROOT / cache_dir) if cache_dir else tmp_dir,
+                    verbose=0,
+                )
+            )
+            common = dict(
+                cv=settings.get("cv", 3),  # Reduced CV for speed
+                scoring="roc_auc",
+                n_jobs=-1,
+            )
+
+            if strategy == "grid":
+                search = GridSearchCV(self.pipeline, grid_params, **common)
+            elif strategy == "halving":
+                resource = settings.get("resource", "n_samples")
+                max_resources: Any = "auto"
+                if resource != "n_samples":
+                    # The budget parameter is driven by the search itself
+                    values = grid_params.pop(resource, None)
+                    max_resources = (
+                        max(values)
+                        if values
+                        else model_step.get_params()[resource.split("__", 1)[1]]
+                    )
+                search = HalvingGridSearchCV(
                     self.pipeline,
-                    self.config["grid_search_params"],
-                    cv=3,  # Reduced CV for speed
-                    scoring="roc_auc",
-                    n_jobs=-1,
+                    grid_params,
+                    factor=settings.get("factor", 3),
+                    resource=resource,
+                    max_resources=max_resources,
+                    random_state=42,
+                    **common,
                 )
-                grid.fit(X_train, y_train)
-                self.pipeline = grid.best_estimator_
-                logger.info(f"Best params: {grid.best_params_}")
             else:
-                self.pipeline.fit(X_train, y_train)
+                raise ValueError(f"Unknown search strategy '{strategy}'")
 
-            y_pred = self.pipeline.predict(X_test)
-            y_prob = self.pipeline.predict_proba(X_test)[:, 1]
+            search.fit(X, y)
 
-            metrics = {
-                "accuracy": float(accuracy_score(y_test, y_pred)),
-                "precision": float(precision_score(y_test, y_pred)),
-                "recall": float(recall_score(y_test, y_pred)),
-                "f1": float(f1_score(y_test, y_pred)),
-                "roc_auc": float(roc_auc_score(y_test, y_prob)),
-            }
+        best = search.best_estimator_
+        # Don't ship a reference to the (possibly deleted) cache directory
+        best.set_params(memory=None)
+        logger.info(f"Best params: {search.best_params_}")
+        return best
 
-            logger.success("Model training completed successfully")
+    def train_incremental(self, data_path: str) -> Dict[str, Any]:
+        """Grow the saved model with trees fitted on new data only.
+
+        The fitted preprocessor and feature selector are reused as-is, so the
+        scaling statistics and category vocabulary stay stable, and the
+        boosting model continues from its existing trees via ``warm_start``.
+        Cost scales with the new window instead of the full history. Once the
+        ensemble would exceed ``incremental.max_estimators`` a full refit on
+        the given data is run instead.
+        """
+        try:
+            start = time.perf_counter()
+            if self.pipeline is None:
+                self.pipeline = self._load_pipeline()
+            self._check_spec(self.pipeline)
+
+            settings = self.config.get("incremental") or {}
+            n_new = int(settings.get("n_estimators", 20))
+            max_estimators = int(settings.get("max_estimators", 1000))
+
+            model = self.pipeline.named_steps["model"]
+            # Boosting rounds are n_estimators for GB and max_iter for HistGB
+            if isinstance(model, HistGradientBoostingClassifier):
+                size_param, n_current = "max_iter", model.n_iter_
+            else:
+                size_param, n_current = "n_estimators", model.n_estimators_
+            n_total = n_current + n_new
+            if n_total > max_estimators:
+                logger.warning(
+                    f"Incremental model would reach {n_total} trees "
+                    f"(max {max_estimators}); running a full refit instead"
+                )
+                return self.train(data_path)
+
+            train_df, test_df = self._split_data(data_path)
+            X_train, y_train = self._features_and_label(train_df)
+            X_test, y_test = self._features_and_label(test_df)
+
+            self._log_unseen_categories(X_train)
+
+            # Only the model is refitted; earlier steps just transform
+            X_transformed = self.pipeline[:-1].transform(X_train)
+            model.set_params(warm_start=True, **{size_param: n_total})
+            model.fit(X_transformed, y_train)
+
+            metrics = self._evaluate(X_test, y_test)
+            metrics["n_estimators"] = int(
+                model.n_iter_ if size_param == "max_iter" else model.n_estimators_
+            )
+
+            logger.success(
+                f"Incremental training added {n_new} trees ({n_total} total)"
+            )
             for metric, value in metrics.items():
                 logger.info(f"{metric}: {value:.3f}")
 
             self._save_pipeline()
+            self._register(
+                data_path, metrics, time.perf_counter() - start, "incremental"
+            )
             return metrics
 
         except Exception as e:
-            logger.error(f"Training failed: {e}")
+            logger.error(f"Incremental training failed: {e}")
             raise
 
+    def _log_unseen_categories(self, X: pd.DataFrame) -> None:
+        """Warn about categories the frozen encoder will ignore"""
+        encoder = self.pipeline.named_steps["preprocessor"].named_transformers_["cat"]
+        for feature, known in zip(encoder.feature_names_in_, encoder.categories_):
+            unseen = set(X[feature].astype(str).unique()) - set(known)
+            if unseen:
+                logger.warning(
+                    f"Unseen {feature} values {sorted(unseen)} are ignored until "
+                    "the next full refit"
+                )
+
+    def _evaluate(self, X_test: pd.DataFrame, y_test: pd.Series) -> Dict[str, Any]:
+        """Score the current pipeline on held-out data"""
+        y_pred = self.pipeline.predict(X_test)
+        y_prob = self.pipeline.predict_proba(X_test)[:, 1]
+
+        return {
+            "accuracy": float(accuracy_score(y_test, y_pred)),
+            "precision": float(precision_score(y_test, y_pred)),
+            "recall": float(recall_score(y_test, y_pred)),
+            "f1": float(f1_score(y_test, y_pred)),
+            "roc_auc": float(roc_auc_score(y_test, y_prob)),
+        }
+
+    def _check_spec(self, pipeline: Pipeline) -> None:
+        """Refuse to grow a model whose column layout the config no longer describes"""
+        saved = getattr(pipeline, "feature_spec_", None)
+        if saved is None:
+            # Saved before feature specs; adopt the configured layout
+            pipeline.feature_spec_ = self.spec.to_dict()
+        elif FeatureSpec.from_dict(saved) != self.spec:
+            raise ValueError(
+                "The saved model's feature spec differs from the config; "
+                "run a full retrain"
+            )
+
+    def _load_pipeline(self):
+        """Load the previously saved pipeline from disk"""
+        if not Path(self.model_path).exists():
+            raise FileNotFoundError(f"Pipeline file not found at {self.model_path}")
+        return joblib.load(self.model_path)
+
     def _save_pipeline(self) -> None:
-        """Save the entire pipeline to disk"""
+        """Save the entire pipeline to disk atomically.
+
+        The pickle is written to a temporary file in the same directory and
+        renamed over the old one, so a predictor reloading the model never
+        reads a partially written file. The compiled export, if configured,
+        follows the pickle.
+        """
         if self.pipeline is None:
             logger.warning("Attempted to save a pipeline that has not been trained.")
             return
 
         try:
-            model_dir = Path(self.model_path).parent
-            model_dir.mkdir(parents=True, exist_ok=True)
-            joblib.dump(self.pipeline, self.model_path)
+            atomic_write(self.model_path, lambda f: joblib.dump(self.pipeline, f))
             logger.info(f"Pipeline saved to {self.model_path}")
 
         except Exception as e:
             logger.error(f"Failed to save pipeline: {e}")
             raise
+
+        if self.compiled_model_path:
+            self._export_compiled()
+
+    def _register(
+        self,
+        data_path: str,
+        metrics: Dict[str, Any],
+        train_seconds: float,
+        kind: str,
+    ) -> None:
+        """Add the saved model to the registry, when enabled, with its provenance.
+
+        ``production`` only moves with ``registry.promote``, apart from the
+        registry's first version; ``latest`` always moves.
+        """
+        if self.registry is None:
+            return
+        full_data_path = PROJECT_ROOT / data_path
+        data_sha256 = (
+            self.dataset_cache.source_hash(full_data_path)
+            if self.dataset_cache is not None
+            else file_sha256(full_data_path)
+        )
+        aliases = self.registry.aliases()
+        metadata = {
+            "kind": kind,
+            # Incremental runs grow the model the trainer last saved
+            "parent": aliases.get(LATEST) if kind == "incremental" else None,
+            "model_type": self.model_type,
+            "metrics": metrics,
+            "feature_spec": self.pipeline.feature_spec_,
+            "data_path": str(data_path),
+            "data_sha256": data_sha256,
+            "model_sha256": file_sha256(self.model_path),
+            "train_seconds": train_seconds,
+        }
+        promote = (self.config.get("registry") or {}).get("promote", False)
+        self.version = self.registry.register(
+            self.model_path,
+            self.compiled_model_path,
+            metadata,
+            aliases=[PRODUCTION] if promote else [],
+        )
+
+    def _export_compiled(self) -> None:
+        """Write the NumPy-only model archive the predictor starts up from.
+
+        Pipelines the compiled engine cannot represent remove any previous
+        export instead, so a server never starts from an outdated model.
+        """
+        try:
+            compiled = CompiledPipeline.from_pipeline(self.pipeline)
+        except (TypeError, ValueError) as e:
+            logger.info(f"Skipping compiled model export: {e}")
+            Path(self.compiled_model_path).unlink(missing_ok=True)
+            return
+
+        try:
+            source_sha256 = file_sha256(self.model_path)
+            atomic_write(
+                self.compiled_model_path,
+                lambda f: compiled.save(
+                    f,
+                    source_sha256=source_sha256,
+                    feature_spec=getattr(self.pipeline, "feature_spec_", None),
+                ),
+            )
+            logger.info(f"Compiled model exported to {self.compiled_model_path}")
+        except Exception as e:
+            logger.error(f"Failed to export compiled model: {e}")
+            raise
+
+
+def atomic_write(path: Union[str, Path], write: Callable[[BinaryIO], Any]) -> None:
+    """Write a file through a temp file in its directory and rename it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates owner-only files; keep the usual model permissions
+        mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
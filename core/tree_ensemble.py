@@ -0,0 +1,189 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Rows evaluated per block; keeps the (rows x trees) working arrays cache-sized
+BLOCK_SIZE = 256
+
+
+class FlatTreeEnsemble:
+    """Array-backed evaluator for a fitted binary GradientBoostingClassifier.
+
+    Every tree is packed back to back into contiguous ``feature``,
+    ``threshold``, ``left``, ``right`` and ``value`` arrays, with ``roots``
+    holding the offset of each tree's first node. Leaves point back to
+    themselves with an infinite threshold, so a batch is evaluated by advancing
+    all (row, tree) cursors one level at a time with vectorized gathers, with
+    no sklearn objects involved at scoring time.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+        init_raw: float,
+        learning_rate: float,
+    ):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.init_raw = float(init_raw)
+        self.learning_rate = float(learning_rate)
+
+        # Interleaved (left, right) pairs: next = children[2 * node + go_right]
+        self._children = np.stack([self.left, self.right], axis=1).ravel()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def from_model(cls, model: Any) -> "FlatTreeEnsemble":
+        """Pack the fitted trees of a GradientBoostingClassifier."""
+        if type(model).__name__ != "GradientBoostingClassifier":
+            raise TypeError(
+                f"Cannot flatten {type(model).__name__}; only "
+                "GradientBoostingClassifier is supported"
+            )
+        if len(model.classes_) != 2:
+            raise TypeError("Only binary congestion models can be flattened")
+
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+
+        # The init estimator is a constant prior, so one dummy row gives it
+        init_raw = model._raw_predict_init(
+            np.zeros((1, model.n_features_in_), dtype=np.float32)
+        )[0, 0]
+
+        return cls(
+            **_pack_trees(trees),
+            n_features=model.n_features_in_,
+            init_raw=init_raw,
+            learning_rate=model.learning_rate,
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Constructor arguments as arrays, e.g. for ``np.savez``."""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": np.array(self.max_depth),
+            "n_features": np.array(self.n_features),
+            "init_raw": np.array(self.init_raw),
+            "learning_rate": np.array(self.learning_rate),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "FlatTreeEnsemble":
+        """Inverse of ``to_arrays``."""
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            left=arrays["left"],
+            right=arrays["right"],
+            value=arrays["value"],
+            roots=arrays["roots"],
+            max_depth=int(arrays["max_depth"]),
+            n_features=int(arrays["n_features"]),
+            init_raw=float(arrays["init_raw"]),
+            learning_rate=float(arrays["learning_rate"]),
+        )
+
+    def raw_predict_one(self, x: np.ndarray) -> float:
+        """Raw log-odds for a single float32 feature row."""
+        node = self.roots
+        for _ in range(self.max_depth):
+            go_left = x[self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.init_raw + self.learning_rate * self.value[node].sum()
+
+    def raw_predict(self, X: np.ndarray) -> np.ndarray:
+        """Raw log-odds for a 2D feature matrix."""
+        # Trees split on float32 features, exactly as sklearn casts them
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Expected a 2D array with {self.n_features} features, "
+                f"got shape {X.shape}"
+            )
+
+        raw = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_SIZE):
+            block = X[start : start + BLOCK_SIZE]
+            raw[start : start + block.shape[0]] = self._sum_leaf_values(block)
+
+        return self.init_raw + self.learning_rate * raw
+
+    def _sum_leaf_values(self, block: np.ndarray) -> np.ndarray:
+        """Walk one block of rows through every tree, level by level."""
+        n_rows = block.shape[0]
+        flat = block.ravel()
+        # Offset of each row's first feature in the raveled block
+        row_offset = (np.arange(n_rows, dtype=np.intp) * self.n_features)[:, None]
+
+        shape = (n_rows, self.n_trees)
+        node = np.empty(shape, dtype=np.intp)
+        node[:] = self.roots
+        index = np.empty(shape, dtype=np.intp)
+        x = np.empty(shape, dtype=np.float32)
+        threshold = np.empty(shape, dtype=np.float64)
+        go_right = np.empty(shape, dtype=bool)
+
+        # Gathers write into preallocated buffers to avoid per-level temporaries
+        for _ in range(self.max_depth):
+            np.take(self.feature, node, out=index)
+            index += row_offset
+            np.take(flat, index, out=x)
+            np.take(self.threshold, node, out=threshold)
+            np.greater(x, threshold, out=go_right)
+            node *= 2
+            node += go_right
+            np.take(self._children, node, out=node)
+
+        return np.take(self.value, node).sum(axis=1)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities, matching ``GradientBoostingClassifier``."""
+        positive = 1.0 / (1.0 + np.exp(-self.raw_predict(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _pack_trees(trees: List[Any]) -> dict:
+    """Concatenate sklearn tree structures into flat node arrays."""
+    sizes = np.array([tree.node_count for tree in trees], dtype=np.intp)
+    roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+
+    feature, threshold, left, right, value = [], [], [], [], []
+    for root, tree in zip(roots, trees):
+        nodes = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append(root + np.where(is_leaf, nodes, tree.children_left))
+        right.append(root + np.where(is_leaf, nodes, tree.children_right))
+        value.append(tree.value[:, 0, 0])
+
+    return {
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        "left": np.concatenate(left),
+        "right": np.concatenate(right),
+        "value": np.concatenate(value),
+        "roots": roots,
+        "max_depth": max(tree.max_depth for tree in trees),
+    }
@@ -1,84 +1,133 @@
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Union
 
 import numpy as np
 import pandas as pd
 
-
-def generate_synthetic_traffic(n=50000, seed=42):
-    """Generate synthetic network traffic data with realistic patterns."""
-    np.random.seed(seed)
-
-    peak_hours = [7, 8, 9, 17, 18, 19]
-    protocols = ["TCP", "UDP", "ICMP"]
-
-    # Services are often tied to specific protocols
-    service_protocol_map = {
-        "http": "TCP",
-        "ftp": "TCP",
-        "ssh": "TCP",
-        "smtp": "TCP",
-        "dns": "UDP",
-        "ntp": "UDP",
-        "other": "UDP",
-    }
-    services = list(service_protocol_map.keys())
-
-    data = []
-
-    for _ in range(n):
-        hour = np.random.randint(0, 24)
-        is_peak = hour in peak_hours
-
-        # Select service and determine its protocol
-        service = np.random.choice(services, p=[0.4, 0.05, 0.05, 0.1, 0.2, 0.1, 0.1])
-        protocol = service_protocol_map[service]
-
-        # Add a small chance of ICMP traffic, which has no service
-        if np.random.random() < 0.05:
-            protocol = "ICMP"
-            service = "none"
-
-        duration = np.random.exponential(scale=8 if is_peak else 4)
-        src_bytes = int(np.random.normal(loc=5000 if is_peak else 1000, scale=800))
-        dst_bytes = int(np.random.normal(loc=3000 if is_peak else 700, scale=500))
-        packet_count = np.random.poisson(lam=60 if is_peak else 20)
-
-        # More sophisticated congestion determination
-        load_factor = (packet_count / 100) * (duration / 10)
-        congestion = 1 if (load_factor > 1.0 or (is_peak and packet_count > 80)) else 0
-
-        data.append(
-            [
-                duration,
-                max(0, src_bytes),
-                max(0, dst_bytes),
-                packet_count,
-                hour,
-                protocol,
-                service,
-                congestion,
-            ]
-        )
+PEAK_HOURS = [7, 8, 9, 17, 18, 19]
+
+# Services are often tied to specific protocols
+SERVICE_PROTOCOL_MAP = {
+    "http": "TCP",
+    "ftp": "TCP",
+    "ssh": "TCP",
+    "smtp": "TCP",
+    "dns": "UDP",
+    "ntp": "UDP",
+    "other": "UDP",
+}
+SERVICE_PROBS = [0.4, 0.05, 0.05, 0.1, 0.2, 0.1, 0.1]
+
+COLUMNS = [
+    "duration",
+    "src_bytes",
+    "dst_bytes",
+    "packet_count",
+    "hour",
+    "protocol",
+    "service",
+    "congestion",
+]
+
+
+def generate_synthetic_traffic(
+    n=50000, seed: Union[int, np.random.SeedSequence, None] = 42
+):
+    """Generate synthetic network traffic data with realistic patterns.
+
+    Every column is drawn as a whole array from a ``numpy.random.Generator``
+    rather than row by row, with the same per-row distributions.
+    """
+    rng = np.random.default_rng(seed)
+
+    hour = rng.integers(0, 24, size=n)
+    is_peak = np.isin(hour, PEAK_HOURS)
+
+    # Select service and determine its protocol
+    services = np.array(list(SERVICE_PROTOCOL_MAP) + ["none"], dtype=object)
+    protocols = np.array(list(SERVICE_PROTOCOL_MAP.values()) + ["ICMP"], dtype=object)
+    service_idx = rng.choice(len(SERVICE_PROBS), size=n, p=SERVICE_PROBS)
+
+    # Add a small chance of ICMP traffic, which has no service
+    service_idx[rng.random(n) < 0.05] = len(services) - 1
+
+    duration = rng.exponential(scale=np.where(is_peak, 8, 4))
+    src_bytes = rng.normal(loc=np.where(is_peak, 5000, 1000), scale=800).astype(int)
+    dst_bytes = rng.normal(loc=np.where(is_peak, 3000, 700), scale=500).astype(int)
+    packet_count = rng.poisson(lam=np.where(is_peak, 60, 20))
+
+    # More sophisticated congestion determination
+    load_factor = (packet_count / 100) * (duration / 10)
+    congestion = ((load_factor > 1.0) | (is_peak & (packet_count > 80))).astype(int)
 
     df = pd.DataFrame(
-        data,
-        columns=pd.Index(
-            [
-                "duration",
-                "src_bytes",
-                "dst_bytes",
-                "packet_count",
-                "hour",
-                "protocol",
-                "service",
-                "congestion",
-            ]
-        ),
+        {
+            "duration": duration,
+            "src_bytes": np.maximum(0, src_bytes),
+            "dst_bytes": np.maximum(0, dst_bytes),
+            "packet_count": packet_count,
+            "hour": hour,
+            "protocol": protocols[service_idx],
+            "service": services[service_idx],
+            "congestion": congestion,
+        },
+        columns=pd.Index(COLUMNS),
     )
     return df
 
 
+def shard_paths(output: Path, shards: int, fmt: str) -> List[Path]:
+    """Output path of every shard, e.g. ``data-00001-of-00004.csv``."""
+    suffix = ".csv" if fmt == "csv" else ""
+    if shards == 1:
+        return [output.with_suffix(suffix)]
+    return [
+        output.with_name(f"{output.stem}-{i:05d}-of-{shards:05d}{suffix}")
+        for i in range(shards)
+    ]
+
+
+def write_shard(
+    n: int, seed: Union[int, np.random.SeedSequence], path: Path, fmt: str
+) -> Path:
+    """Generate one shard and write it as CSV or a columnar directory."""
+    df = generate_synthetic_traffic(n=n, seed=seed)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        from core.dataset_cache import write_columnar
+
+        categorical = {"protocol": "category", "service": "category"}
+        write_columnar(
+            [df.astype(categorical)], path, source="generate_data.py", overwrite=True
+        )
+    return path
+
+
+def generate_sharded(
+    n: int,
+    output: Path,
+    seed: int = 42,
+    shards: int = 1,
+    workers: Optional[int] = None,
+    fmt: str = "csv",
+) -> List[Path]:
+    """Write ``n`` rows as independently seeded shards in parallel processes."""
+    paths = shard_paths(output, shards, fmt)
+    # A single shard keeps the plain seed; shards get independent child streams
+    seeds = [seed] if shards == 1 else np.random.SeedSequence(seed).spawn(shards)
+    sizes = [n // shards + (i < n % shards) for i in range(shards)]
+
+    workers = min(workers or os.cpu_count() or 1, shards)
+    if workers == 1:
+        return [write_shard(*args, fmt) for args in zip(sizes, seeds, paths)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(write_shard, sizes, seeds, paths, [fmt] * shards))
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Generate synthetic network traffic data."
@@ -95,16 +144,47 @@ if __name__ == "__main__":
     parser.add_argument(
         "--seed", type=int, default=42, help="Random seed for reproducibility."
     )
+    parser.add_argument(
+        "--shards", type=int, default=1, help="Number of independent output shards."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parallel processes for sharded output (default: all cores).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "columnar"],
+        default="csv",
+        help="Write CSV files or memory-mappable columnar directories.",
+    )
     args = parser.parse_args()
 
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     print(f"🔄 Generating {args.n} samples of synthetic data...")
-    df = generate_synthetic_traffic(n=args.n, seed=args.seed)
-    df.to_csv(output_path, index=False)
+    paths = generate_sharded(
+        args.n,
+        output_path,
+        seed=args.seed,
+        shards=args.shards,
+        workers=args.workers,
+        fmt=args.format,
+    )
+
+    if len(paths) > 1:
+        print(f"✅ Dataset created as {len(paths)} shards: '{paths[0]}' ...")
+        raise SystemExit(0)
+    print(f"✅ Dataset created and saved to '{paths[0]}'")
+
+    if args.format == "csv":
+        df = pd.read_csv(paths[0])
+    else:
+        from core.dataset_cache import open_columnar
 
-    print(f"✅ Dataset created and saved to '{output_path}'")
+        df = open_columnar(paths[0])
     print("\nSample data:")
     print(df.head())
     print(
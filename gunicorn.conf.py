@@ -0,0 +1,95 @@
+"""Gunicorn settings for serving the prediction app in production.
+
+Worker and thread counts come from the ``server`` section of the model config.
+With ``asgi`` set, gunicorn's ASGI worker serves ``web.asgi:app``, which
+micro-batches concurrent predictions on one event loop per worker; otherwise
+the Flask ``web.app:app`` runs on sync or gthread workers.
+With ``preload`` the app, and with it the joblib model, is imported once in
+the master before forking, so workers share the model's pages copy-on-write
+instead of each loading their own copy. The model scores a warm-up record
+before any listening socket is opened.
+
+Run with ``gunicorn -c gunicorn.conf.py`` or ``python run.py serve``.
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def load_server_config() -> dict:
+    """Read the ``server`` section of the model config."""
+    config_path = os.getenv("MODEL_CONFIG", str(PROJECT_ROOT / "core" / "config.yaml"))
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    return config.get("server") or {}
+
+
+server_config = load_server_config()
+
+bind = server_config.get("bind", "0.0.0.0:5000")
+workers = int(server_config.get("workers") or multiprocessing.cpu_count())
+threads = int(server_config.get("threads", 1))
+if server_config.get("asgi", False):
+    wsgi_app = "web.asgi:app"
+    # One event loop per worker; predict_batch runs on its executor threads
+    worker_class = "asgi"
+    threads = 1
+else:
+    wsgi_app = "web.app:app"
+    # Threads > 1 switches gunicorn to the gthread worker
+    worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(server_config.get("timeout", 30))
+graceful_timeout = int(server_config.get("graceful_timeout", 30))
+keepalive = int(server_config.get("keepalive", 5))
+max_requests = int(server_config.get("max_requests", 0))
+max_requests_jitter = int(server_config.get("max_requests_jitter", 0))
+preload_app = bool(server_config.get("preload", True))
+accesslog = server_config.get("accesslog", "-")
+
+
+def _warm_up(log) -> None:
+    from web.app import predictor
+
+    predictor.warm_up()
+    log.info(f"Model ready from {predictor.model_path}")
+
+
+def on_starting(server):
+    """Readiness check in the master, before sockets are bound."""
+    if not server.cfg.preload_app:
+        return
+    try:
+        _warm_up(server.log)
+    except Exception as e:
+        server.log.error(f"Model warm-up failed, not starting: {e}")
+        sys.exit(1)
+
+
+def when_ready(server):
+    """Freeze the preloaded heap so the collector never writes to shared pages."""
+    if server.cfg.preload_app:
+        gc.freeze()
+    server.log.info(
+        f"Serving on {', '.join(server.cfg.bind)} with {server.cfg.workers} "
+        f"workers x {server.cfg.threads} threads (preload={server.cfg.preload_app})"
+    )
+
+
+def post_worker_init(worker):
+    """Without preload every worker loads its own model; check it before serving."""
+    if worker.cfg.preload_app:
+        return
+    try:
+        _warm_up(worker.log)
+    except Exception as e:
+        worker.log.error(f"Model warm-up failed in worker {worker.pid}: {e}")
+        # WORKER_BOOT_ERROR: the master shuts down instead of respawning
+        sys.exit(3)
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+from datetime import datetime
+
+import yaml
+
+from core.predictor import PROJECT_ROOT
+from core.registry import ModelRegistry
+
+
+def open_registry(config_path: str = "") -> ModelRegistry:
+    """The registry of the model config; exits if it is not enabled."""
+    config_path = config_path or os.getenv(
+        "MODEL_CONFIG", str(PROJECT_ROOT / "core" / "config.yaml")
+    )
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    registry = ModelRegistry.from_config(config, PROJECT_ROOT)
+    if registry is None:
+        raise SystemExit("The model registry is disabled; set registry.enabled")
+    return registry
+
+
+def list_models(registry: ModelRegistry):
+    """Print every version with its aliases and headline metrics."""
+    aliases = {}
+    for alias, version in sorted(registry.aliases().items()):
+        aliases.setdefault(version, []).append(alias)
+    for entry in registry.versions():
+        created = datetime.fromtimestamp(entry["created_at"]).isoformat(" ", "seconds")
+        metrics = entry.get("metrics") or {}
+        print(
+            f"{entry['version']:>6}  {created}  {entry.get('kind', ''):<11} "
+            f"roc_auc={metrics.get('roc_auc', float('nan')):.3f}  "
+            f"f1={metrics.get('f1', float('nan')):.3f}  "
+            f"{', '.join(aliases.get(entry['version'], []))}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect and label trained models.")
+    parser.add_argument("--config", default="", help="Model config (default: core).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List versions with their aliases.")
+    show = commands.add_parser("show", help="Print a version's metadata.")
+    show.add_argument("ref", help="Version or alias.")
+    alias = commands.add_parser(
+        "alias", help="Point an alias (e.g. production) at a version."
+    )
+    alias.add_argument("alias")
+    alias.add_argument("ref", help="Version or alias.")
+    unalias = commands.add_parser("unalias", help="Remove an alias.")
+    unalias.add_argument("alias")
+    args = parser.parse_args()
+
+    registry = open_registry(args.config)
+    if args.command == "list":
+        list_models(registry)
+    elif args.command == "show":
+        print(json.dumps(registry.get(args.ref), indent=2))
+    elif args.command == "alias":
+        version = registry.set_alias(args.alias, args.ref)
+        print(f"✅ {args.alias} -> {version}")
+    elif args.command == "unalias":
+        registry.remove_alias(args.alias)
+        print(f"✅ Removed {args.alias}")
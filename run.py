@@ -36,6 +36,45 @@ def run_training():
         sys.exit(1)
 
 
+def run_retraining(data_file: str):
+    """Runs incremental retraining of the saved model on new data."""
+    logger.info(f"▶️ Starting incremental retraining on {data_file}...")
+    try:
+        subprocess.run(
+            [sys.executable, "train.py", "--incremental", "--data", data_file],
+            check=True,
+        )
+        logger.success("✅ Incremental retraining complete.")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Incremental retraining failed with exit code {e.returncode}.")
+        sys.exit(1)
+
+
+def run_scoring(args: argparse.Namespace):
+    """Runs the streaming batch scorer over a file or stdin."""
+    logger.info(f"▶️ Scoring {'stdin' if args.input == '-' else args.input}...")
+    command = [
+        sys.executable,
+        "score.py",
+        "--input",
+        args.input,
+        "--output",
+        args.output,
+        "--batch-size",
+        str(args.batch_size),
+        "--workers",
+        str(args.workers),
+    ]
+    if args.format:
+        command += ["--format", args.format]
+    try:
+        subprocess.run(command, check=True)
+        logger.success("✅ Scoring complete.")
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Scoring failed with exit code {e.returncode}.")
+        sys.exit(1)
+
+
 def run_web_app():
     """Runs the Flask web application."""
     logger.info("▶️ Starting Flask web server...")
@@ -57,6 +96,27 @@ def run_web_app():
         logger.info("Web server stopped.")
 
 
+def run_server():
+    """Runs the production gunicorn server configured by gunicorn.conf.py."""
+    logger.info("▶️ Starting gunicorn server...")
+    try:
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "gunicorn",
+                "-c",
+                "gunicorn.conf.py",
+            ],
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Server exited with code {e.returncode}.")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        logger.info("Server stopped.")
+
+
 def main():
     """Main execution function with command-line parsing."""
     parser = argparse.ArgumentParser(
@@ -67,15 +127,42 @@ def main():
         "step",
         nargs="?",
         default="all",
-        choices=["data", "train", "web", "all"],
+        choices=["data", "train", "retrain", "score", "web", "serve", "all"],
         help=(
             "Choose which part of the pipeline to run:\n"
-            "  data  - Generate synthetic data\n"
-            "  train - Train the prediction model\n"
-            "  web   - Run the Flask web application\n"
-            "  all   - (Default) Run all steps in order: data -> train -> web"
+            "  data    - Generate synthetic data\n"
+            "  train   - Train the prediction model\n"
+            "  retrain - Add trees to the saved model using --data only\n"
+            "  score   - Stream --input (CSV/JSONL file or stdin) through the model\n"
+            "  web     - Run the Flask web application (development server)\n"
+            "  serve   - Run the production gunicorn server\n"
+            "  all     - (Default) Run all steps in order: data -> train -> web"
         ),
     )
+    parser.add_argument(
+        "--data",
+        default="assets/datasets/synthetic_network_data.csv",
+        help="Training data for the retrain step.",
+    )
+    parser.add_argument(
+        "--input", default="-", help="Records for the score step ('-' for stdin)."
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Predictions from the score step ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        help="Input format for the score step (default: from the file extension).",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Records per scoring batch."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes for the score step."
+    )
     args = parser.parse_args()
 
     if args.step == "all":
@@ -86,8 +173,14 @@ def main():
         run_data_generation()
     elif args.step == "train":
         run_training()
+    elif args.step == "retrain":
+        run_retraining(args.data)
+    elif args.step == "score":
+        run_scoring(args)
     elif args.step == "web":
         run_web_app()
+    elif args.step == "serve":
+        run_server()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+import argparse
+import sys
+from contextlib import ExitStack
+
+from core.predictor import MAX_BATCH_SIZE
+from core.scoring import (
+    FORMATS,
+    check_batch_size,
+    infer_format,
+    load_config,
+    score_stream,
+)
+
+
+def score(
+    input_path: str = "-",
+    output_path: str = "-",
+    input_format: str = "",
+    output_format: str = "",
+    batch_size: int = 1000,
+    workers: int = 1,
+):
+    """Script to score a flow log file or stdin in streaming batches."""
+    input_format = input_format or infer_format(input_path)
+    output_format = output_format or infer_format(output_path)
+
+    with ExitStack() as stack:
+        source = (
+            sys.stdin
+            if input_path == "-"
+            else stack.enter_context(open(input_path, "r", newline=""))
+        )
+        target = (
+            sys.stdout
+            if output_path == "-"
+            else stack.enter_context(open(output_path, "w", newline=""))
+        )
+        summary = score_stream(
+            source,
+            target,
+            input_format=input_format,
+            output_format=output_format,
+            batch_size=batch_size,
+            workers=workers,
+        )
+
+    # Results may be going to stdout, so report on stderr
+    print(
+        f"✅ Scored {summary['rows']} rows: {summary['congested']} congested, "
+        f"{summary['errors']} invalid",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score flow records in batches.")
+    parser.add_argument(
+        "--input", default="-", help="CSV or JSONL file to score ('-' for stdin)."
+    )
+    parser.add_argument(
+        "--output", default="-", help="Where to write predictions ('-' for stdout)."
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="",
+        help="Input format (default: from the extension, jsonl for stdin).",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=FORMATS,
+        default="",
+        help="Output format (default: from the extension, jsonl for stdout).",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="Records scored per batch."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes scoring batches in parallel."
+    )
+    args = parser.parse_args()
+    # Fail before reading any input rather than on every batch
+    try:
+        max_batch_size = int(load_config().get("max_batch_size", MAX_BATCH_SIZE))
+        check_batch_size(args.batch_size, max_batch_size)
+    except ValueError as e:
+        parser.error(f"--batch-size: {e}")
+
+    score(
+        args.input,
+        args.output,
+        args.format,
+        args.output_format,
+        args.batch_size,
+        args.workers,
+    )
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import yaml
+
+from core.trainer import PROJECT_ROOT, TrafficModelTrainer
+
+DATA_PATH = "assets/datasets/synthetic_network_data.csv"
+
+
+@pytest.fixture(scope="session")
+def network_data() -> pd.DataFrame:
+    return pd.read_csv(PROJECT_ROOT / DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def model_config(tmp_path_factory) -> Path:
+    """A small, fast-to-train config writing its model to a temp directory."""
+    model_dir = tmp_path_factory.mktemp("models")
+    config = {
+        "model_path": str(model_dir / "gb_model.pkl"),
+        "feature_selection_k": 8,
+        "model_params": {
+            "n_estimators": 30,
+            "learning_rate": 0.1,
+            "max_depth": 4,
+            "min_samples_leaf": 20,
+            "subsample": 0.8,
+            "random_state": 42,
+        },
+    }
+    config_path = model_dir / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return config_path
+
+
+@pytest.fixture(scope="session")
+def trained_pipeline(model_config):
+    """Train the small config once and share the fitted pipeline."""
+    trainer = TrafficModelTrainer(config_path=str(model_config))
+    trainer.train(DATA_PATH)
+    return trainer.pipeline
@@ -0,0 +1,185 @@
+import smtplib
+import threading
+
+import pytest
+
+from web.alert_queue import AlertDispatcher
+from web.email_service import EmailService
+
+PREDICTION = {
+    "probability": 0.95,
+    "congestion": True,
+    "protocol": "TCP",
+    "service": "http",
+}
+
+
+class FakeSMTP:
+    """Stand-in for smtplib.SMTP that records sessions and messages."""
+
+    connections = []
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.messages = []
+        self.closed = False
+        self.fail_next_send = None
+        self.gate = None
+        self.sending = threading.Event()
+        FakeSMTP.connections.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        return (250, b"OK")
+
+    def send_message(self, msg):
+        if self.gate is not None:
+            self.sending.set()
+            self.gate.wait()
+        if self.fail_next_send is not None:
+            error, self.fail_next_send = self.fail_next_send, None
+            raise error
+        self.messages.append(msg)
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.connections = []
+    monkeypatch.setattr(smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setenv("SMTP_SERVER", "localhost")
+    monkeypatch.setenv("SMTP_USER", "alerts@example.com")
+    monkeypatch.setenv("SMTP_PASSWORD", "secret")
+    return FakeSMTP
+
+
+def test_email_service_reuses_connection(fake_smtp):
+    service = EmailService()
+    assert service.send_alert("ops@example.com", PREDICTION)
+    assert service.send_alert("ops@example.com", PREDICTION)
+    assert len(fake_smtp.connections) == 1
+    assert len(fake_smtp.connections[0].messages) == 2
+
+
+def test_email_service_reconnects_after_disconnect(fake_smtp):
+    service = EmailService()
+    assert service.send_alert("ops@example.com", PREDICTION)
+    fake_smtp.connections[0].fail_next_send = smtplib.SMTPServerDisconnected(
+        "connection dropped"
+    )
+
+    assert service.send_alert("ops@example.com", PREDICTION)
+    assert len(fake_smtp.connections) == 2
+    assert fake_smtp.connections[0].closed
+    assert len(fake_smtp.connections[1].messages) == 1
+
+
+def test_email_service_does_not_retry_refused_messages(fake_smtp):
+    service = EmailService()
+    assert service.send_alert("ops@example.com", PREDICTION)
+    fake_smtp.connections[0].fail_next_send = smtplib.SMTPRecipientsRefused(
+        {"ops@example.com": (550, b"No such user")}
+    )
+
+    assert not service.send_alert("ops@example.com", PREDICTION)
+    assert len(fake_smtp.connections) == 1
+    assert len(fake_smtp.connections[0].messages) == 1
+
+
+def test_email_service_disabled_without_credentials(monkeypatch):
+    monkeypatch.delenv("SMTP_SERVER", raising=False)
+    assert not EmailService().send_alert("ops@example.com", PREDICTION)
+
+
+def test_dispatcher_delivers_in_background(fake_smtp):
+    dispatcher = AlertDispatcher(EmailService(), max_queue=10)
+    for _ in range(3):
+        assert dispatcher.submit("ops@example.com", PREDICTION)
+    assert dispatcher.join(timeout=5)
+
+    stats = dispatcher.stats()
+    assert stats["submitted"] == 3
+    assert stats["sent"] == 1
+    assert stats["digested"] == 2
+    assert stats["dropped"] == 0
+
+    # Pending digests go out on shutdown
+    dispatcher.stop()
+    assert dispatcher.stats()["digests_sent"] == 1
+    assert len(fake_smtp.connections) == 1
+    assert len(fake_smtp.connections[0].messages) == 2
+
+
+def test_dispatcher_drops_when_full(fake_smtp):
+    gate = threading.Event()
+    service = EmailService()
+    dispatcher = AlertDispatcher(service, max_queue=2)
+
+    # Open the connection, then hold the worker inside the next send
+    assert service.send_alert("ops@example.com", PREDICTION)
+    fake_smtp.connections[0].gate = gate
+    dispatcher.submit("ops@example.com", PREDICTION)
+    assert fake_smtp.connections[0].sending.wait(timeout=5)
+
+    accepted = [dispatcher.submit("ops@example.com", PREDICTION) for _ in range(4)]
+    assert accepted == [True, True, False, False]
+    assert dispatcher.stats()["dropped"] == 2
+
+    gate.set()
+    assert dispatcher.join(timeout=5)
+    stats = dispatcher.stats()
+    assert stats["sent"] + stats["digested"] == 3
+    dispatcher.stop()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_notify_deduplicates_into_digest(fake_smtp):
+    clock = FakeClock()
+    service = EmailService(window_seconds=60, burst=10, clock=clock)
+
+    outcomes = [service.notify("ops@example.com", PREDICTION) for _ in range(50)]
+    assert outcomes.count("sent") == 1
+    assert outcomes.count("digested") == 49
+    assert service.flush_due() == 0
+
+    clock.now += 60
+    assert service.flush_due() == 1
+    messages = fake_smtp.connections[0].messages
+    assert len(messages) == 2
+    assert "49 alerts" in messages[1]["Subject"]
+
+    # A new window sends the next alert for the key straight away
+    assert service.notify("ops@example.com", PREDICTION) == "sent"
+
+
+def test_notify_rate_limits_distinct_keys(fake_smtp):
+    clock = FakeClock()
+    service = EmailService(window_seconds=60, burst=2, rate_per_minute=1, clock=clock)
+
+    outcomes = [
+        service.notify("ops@example.com", {**PREDICTION, "hour": hour})
+        for hour in range(5)
+    ]
+    assert outcomes == ["sent", "sent", "digested", "digested", "digested"]
+
+    # One token refills per minute
+    clock.now += 60
+    assert service.notify("ops@example.com", {**PREDICTION, "hour": 20}) == "sent"
+    assert service.flush_due() == 1
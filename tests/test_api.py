@@ -36,3 +36,161 @@ def test_api_predict():
     data_udp = response_udp.get_json()
     assert "congestion" in data_udp
     assert "probability" in data_udp
+
+
+def test_api_predict_batch():
+    client = app.test_client()
+    payload = [
+        {
+            "duration": 10,
+            "src_bytes": 5000,
+            "dst_bytes": 3000,
+            "packet_count": 60,
+            "hour": 8,
+            "protocol": "TCP",
+            "service": "http",
+        },
+        {"duration": 2, "protocol": "UDP"},
+    ]
+    response = client.post("/api/predict/batch", json={"records": payload})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["n_valid"] == 1
+    assert data["n_invalid"] == 1
+    assert "probability" in data["results"][0]
+    assert data["results"][1]["index"] == 1
+    assert "missing fields" in data["results"][1]["error"]
+
+    single = client.post("/api/predict", json=payload[0]).get_json()
+    assert data["results"][0]["probability"] == pytest.approx(single["probability"])
+
+    response = client.post("/api/predict/batch", json={"records": "nope"})
+    assert response.status_code == 400
+
+
+def test_health_and_readiness():
+    client = app.test_client()
+    assert client.get("/healthz").status_code == 200
+
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "ready"
+
+
+def test_predict_queues_alert_without_sending(monkeypatch):
+    from web import app as app_module
+
+    submitted = []
+    monkeypatch.setenv("ALERT_EMAIL", "ops@example.com")
+    monkeypatch.setattr(
+        app_module.alert_dispatcher,
+        "submit",
+        lambda recipient, prediction_data: submitted.append(prediction_data) or True,
+    )
+    payload = {
+        "duration": 10,
+        "src_bytes": 5000,
+        "dst_bytes": 3000,
+        "packet_count": 60,
+        "hour": 8,
+        "protocol": "TCP",
+        "service": "http",
+    }
+    response = app.test_client().post("/predict", json=payload)
+    assert response.status_code == 200
+    assert len(submitted) == 1
+    assert submitted[0]["packet_count"] == 60
+    assert submitted[0]["probability"] > 0.9
+
+    stats = app.test_client().get("/api/alerts/stats").get_json()
+    assert stats["max_queue"] >= 1
+
+
+def test_metrics_endpoint():
+    client = app.test_client()
+    payload = {
+        "duration": 2,
+        "src_bytes": 100,
+        "dst_bytes": 100,
+        "packet_count": 5,
+        "hour": 14,
+        "protocol": "UDP",
+        "service": "dns",
+    }
+    client.post("/api/predict", json=payload)
+    client.post("/api/predict", json={})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.get_data(as_text=True)
+    assert 'predictor_stage_seconds_count{stage="validation"}' in text
+    assert 'predictor_stage_seconds_count{stage="model"}' in text
+    assert 'http_request_errors_total{endpoint="/api/predict"}' in text
+    assert "model_load_seconds " in text
+    assert "model_info{version=" in text
+
+
+def test_forecast_endpoint(monkeypatch):
+    import numpy as np
+
+    from core.forecaster import LagForecaster, LoadForecaster
+    from web.app import predictor
+
+    client = app.test_client()
+    monkeypatch.setattr(predictor, "forecaster", None)
+    assert client.get("/api/forecast").status_code == 404
+
+    model = LagForecaster(
+        lags=1,
+        horizon=2,
+        interval_seconds=60,
+        mean=np.zeros(4),
+        scale=np.ones(4),
+        coef=np.zeros((2, 6)),
+        intercept=np.array([0.25, 0.5]),
+    )
+    monkeypatch.setattr(predictor, "forecaster", LoadForecaster(model))
+    payload = {
+        "duration": 2,
+        "src_bytes": 100,
+        "dst_bytes": 100,
+        "packet_count": 5,
+        "hour": 14,
+        "protocol": "UDP",
+        "service": "dns",
+    }
+    client.post("/api/predict", json={**payload, "timestamp": 0})
+    assert client.get("/api/forecast").get_json()["ready"] is False
+
+    client.post("/api/predict", json={**payload, "timestamp": 60})
+    body = client.get("/api/forecast").get_json()
+    assert body["ready"] is True
+    assert [step["congestion"] for step in body["forecast"]] == [0.25, 0.5]
+
+
+def test_api_predict_reports_field_errors():
+    client = app.test_client()
+    response = client.post(
+        "/api/predict",
+        json={
+            "duration": 2,
+            "src_bytes": -5,
+            "dst_bytes": 100,
+            "packet_count": 5,
+            "hour": 14,
+            "protocol": "UDP",
+        },
+    )
+    assert response.status_code == 400
+    data = response.get_json()
+    assert data["error"].startswith("missing fields: service")
+    assert [(e["field"], e["code"]) for e in data["errors"]] == [
+        ("src_bytes", "range"),
+        ("service", "missing"),
+    ]
+
+
+def test_models_endpoint():
+    body = app.test_client().get("/api/models").get_json()
+    assert body["served"]["fraction"] == 1.0
+    assert body["shadow"] == {} and body["ab"] == {}
@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+from web.asgi import app, batcher
+from web.micro_batcher import MicroBatcher
+
+RECORD = {
+    "duration": 10,
+    "src_bytes": 5000,
+    "dst_bytes": 3000,
+    "packet_count": 60,
+    "hour": 8,
+    "protocol": "TCP",
+    "service": "http",
+}
+
+
+async def call(method, path, payload=None):
+    """Run one request through the ASGI app; returns (status, decoded body)."""
+    body = b"" if payload is None else json.dumps(payload).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path}
+    await app(scope, receive, send)
+    status = sent[0]["status"]
+    headers = dict(sent[0]["headers"])
+    content = sent[1]["body"]
+    if headers[b"content-type"] == b"application/json":
+        return status, json.loads(content)
+    return status, content.decode()
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    calls = []
+
+    def predict_batch(records):
+        calls.append(len(records))
+        return [{"index": i, "value": record} for i, record in enumerate(records)]
+
+    async def scenario():
+        batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(20)))
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+    # Every caller gets its own record's result back
+    assert [result["value"] for result in results] == list(range(20))
+    assert calls == [8, 8, 4]
+    assert batcher.stats()["batches"] == 3
+
+
+def test_micro_batcher_wait_budget_and_errors():
+    def failing(records):
+        raise RuntimeError("model unavailable")
+
+    async def scenario():
+        lone = MicroBatcher(lambda records: [{"ok": True}], max_wait_ms=5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        assert await lone.submit({}) == {"ok": True}
+        elapsed = loop.time() - start
+        await lone.stop()
+
+        broken = MicroBatcher(failing, max_wait_ms=1)
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            await broken.submit({})
+        await broken.stop()
+        return elapsed
+
+    # A single request is released once the wait budget runs out
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_asgi_predict_routes():
+    async def scenario():
+        before = batcher.stats()["batches"]
+        responses = await asyncio.gather(
+            *(call("POST", "/api/predict", RECORD) for _ in range(16))
+        )
+        batches = batcher.stats()["batches"] - before
+
+        invalid = await call("POST", "/api/predict", {"duration": 2})
+        batch = await call("POST", "/api/predict/batch", {"records": [RECORD, {}]})
+        await batcher.stop()
+        return responses, batches, invalid, batch
+
+    responses, batches, invalid, batch = asyncio.run(scenario())
+    assert all(status == 200 for status, _ in responses)
+    assert {"congestion", "probability"} == set(responses[0][1])
+    assert batches < len(responses)
+
+    assert invalid[0] == 400
+    assert "error" in invalid[1]
+    assert batch[0] == 200
+    assert batch[1]["n_valid"] == 1
+    assert batch[1]["n_invalid"] == 1
+
+
+def test_asgi_errors_and_metrics():
+    async def scenario():
+        return (
+            await call("GET", "/missing"),
+            await call("GET", "/api/predict"),
+            await call("GET", "/healthz"),
+            await call("GET", "/metrics"),
+            await call("GET", "/api/models"),
+        )
+
+    missing, wrong_method, health, metrics, models = asyncio.run(scenario())
+    assert missing[0] == 404
+    assert wrong_method[0] == 405
+    assert health == (200, {"status": "ok"})
+    assert metrics[0] == 200
+    assert 'endpoint="/api/predict"' in metrics[1]
+    assert "predictor_microbatch_size" in metrics[1]
+    assert models[0] == 200
+    assert models[1]["served"]["sha256"]
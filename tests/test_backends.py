@@ -0,0 +1,129 @@
+import copy
+
+import joblib
+import numpy as np
+import pytest
+import yaml
+
+from core import backends
+from core.backends import ProcessPoolBackend, ThreadPoolBackend, build_backend
+from core.predictor import TrafficPredictor
+from core.registry import ModelRegistry
+
+
+@pytest.fixture
+def make_predictor(tmp_path, trained_pipeline):
+    model_path = tmp_path / "gb_model.pkl"
+    joblib.dump(trained_pipeline, model_path)
+
+    def make(engine, **executor):
+        config_path = tmp_path / f"{engine}-{executor.get('backend', 'inline')}.yaml"
+        config_path.write_text(
+            yaml.safe_dump(
+                {
+                    "model_path": str(model_path),
+                    "inference_engine": engine,
+                    "executor": executor,
+                }
+            )
+        )
+        return TrafficPredictor(config_path=str(config_path))
+
+    return make
+
+
+def test_chunks_and_config():
+    backend = ThreadPoolBackend(workers=4, min_rows=100)
+    assert backend._chunks(250) == [(0, 125), (125, 250)]
+    assert backend._chunks(1000) == [(0, 250), (250, 500), (500, 750), (750, 1000)]
+    assert build_backend({}, "").name == "inline"
+    with pytest.raises(ValueError):
+        build_backend({"backend": "gpu"}, "")
+
+
+@pytest.mark.parametrize("engine", ["compiled", "sklearn"])
+@pytest.mark.parametrize("backend", ["thread", "process"])
+def test_pool_backends_match_inline(make_predictor, network_data, engine, backend):
+    records = network_data.head(300).to_dict("records")
+    records[5] = {"duration": 1}
+    expected = make_predictor(engine).predict_batch(records)
+
+    predictor = make_predictor(engine, backend=backend, workers=2, min_rows=64)
+    try:
+        results = predictor.predict_batch(records)
+        # Single records stay on the calling thread
+        assert predictor.predict(records[0])["probability"] == pytest.approx(
+            expected[0]["probability"]
+        )
+    finally:
+        predictor.backend.close()
+
+    assert [r.get("error") for r in results] == [r.get("error") for r in expected]
+    np.testing.assert_allclose(
+        [r.get("probability", -1.0) for r in results],
+        [r.get("probability", -1.0) for r in expected],
+    )
+
+
+def test_process_backend_scores_inline_on_model_mismatch(make_predictor, network_data):
+    predictor = make_predictor("compiled", backend="process", workers=1, min_rows=8)
+    records = network_data.head(50).to_dict("records")
+    try:
+        before = predictor.predict_batch(records)
+        assert isinstance(predictor.backend, ProcessPoolBackend)
+
+        # Workers cannot load a model version the file does not hold
+        stale = predictor._state._replace(sha256="0" * 64)
+        X = stale.compiled.transform(records)
+        probabilities = predictor.backend.predict_proba(X, stale)
+    finally:
+        predictor.backend.close()
+    np.testing.assert_allclose(probabilities, [r["probability"] for r in before])
+
+
+def worker_model_version() -> str:
+    return backends._worker_predictor.model_version
+
+
+def test_process_workers_serve_the_callers_model_ref(
+    tmp_path, trained_pipeline, network_data
+):
+    registry = ModelRegistry(tmp_path / "registry")
+    for learning_rate in (0.1, 0.01):
+        pipeline = copy.deepcopy(trained_pipeline)
+        pipeline.named_steps["model"].learning_rate = learning_rate
+        # Registered files are hard links, so write a new file each time
+        (tmp_path / "gb_model.pkl").unlink(missing_ok=True)
+        joblib.dump(pipeline, tmp_path / "gb_model.pkl")
+        registry.register(tmp_path / "gb_model.pkl")
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        yaml.safe_dump(
+            {
+                "model_path": str(tmp_path / "gb_model.pkl"),
+                "registry": {
+                    "enabled": True,
+                    "dir": str(registry.root),
+                    "serve": "production",
+                },
+                "executor": {"backend": "process", "workers": 1, "min_rows": 8},
+            }
+        )
+    )
+
+    predictor = TrafficPredictor(config_path=str(config_path), model_ref="v2")
+    try:
+        predictor.predict_batch(network_data.head(20).to_dict("records"))
+        pool = predictor.backend._get_pool()
+        assert pool.submit(worker_model_version).result() == predictor.model_version
+    finally:
+        predictor.backend.close()
+    assert predictor._state.version == "v2"
+
+
+def test_pool_backend_requires_make_pool():
+    class Incomplete(backends._PoolBackend):
+        pass
+
+    with pytest.raises(TypeError, match="_make_pool"):
+        Incomplete()
@@ -0,0 +1,123 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import yaml
+
+from core.compiled import CompiledPipeline
+from core.predictor import WARM_UP_RECORD, TrafficPredictor
+from core.trainer import PROJECT_ROOT
+
+
+def test_compiled_matches_pipeline(trained_pipeline, network_data):
+    compiled = CompiledPipeline.from_pipeline(trained_pipeline)
+    X = network_data.drop("congestion", axis=1).sample(500, random_state=0)
+
+    expected = trained_pipeline.predict_proba(X)[:, 1]
+    actual = np.array([compiled.predict_proba_one(r) for r in X.to_dict("records")])
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_compiled_ignores_unknown_categories(trained_pipeline, network_data):
+    compiled = CompiledPipeline.from_pipeline(trained_pipeline)
+    X = network_data.drop("congestion", axis=1).head(1)
+    X["service"] = "gopher"
+
+    expected = trained_pipeline.predict_proba(X)[0, 1]
+    assert compiled.predict_proba_one(X.iloc[0].to_dict()) == pytest.approx(expected)
+
+
+def test_compiled_rejects_unsupported_pipeline():
+    with pytest.raises(TypeError):
+        CompiledPipeline.from_pipeline(object())
+
+
+def test_compiled_batch_matches_pipeline(trained_pipeline, network_data):
+    compiled = CompiledPipeline.from_pipeline(trained_pipeline)
+    X = network_data.drop("congestion", axis=1)
+
+    expected = trained_pipeline.predict_proba(X)[:, 1]
+    actual = compiled.predict_proba(X.to_dict("records"))
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("engine", ["flat", "compiled"])
+def test_predictor_engines_match_sklearn(
+    engine, trained_pipeline, model_config, network_data, tmp_path
+):
+    config = yaml.safe_load(model_config.read_text())
+    records = network_data.drop("congestion", axis=1).head(200).to_dict("records")
+
+    results = {}
+    for name in ("sklearn", engine):
+        config_path = tmp_path / f"{name}.yaml"
+        config_path.write_text(yaml.safe_dump({**config, "inference_engine": name}))
+        predictor = TrafficPredictor(config_path=str(config_path))
+        assert (predictor.ensemble is not None) == (name != "sklearn")
+        results[name] = (
+            [predictor.predict(r) for r in records[:50]],
+            predictor.predict_batch(records),
+        )
+
+    for fast, slow in zip(results[engine][0], results["sklearn"][0]):
+        assert fast["congestion"] == slow["congestion"]
+        assert fast["probability"] == pytest.approx(slow["probability"])
+    for fast, slow in zip(results[engine][1], results["sklearn"][1]):
+        assert fast["congestion"] == slow["congestion"]
+        assert fast["probability"] == pytest.approx(slow["probability"])
+
+
+def test_compiled_export_round_trip(trained_pipeline, network_data, tmp_path):
+    compiled = CompiledPipeline.from_pipeline(trained_pipeline)
+    path = tmp_path / "model.npz"
+    compiled.save(path, source_sha256="abc")
+
+    loaded, meta = CompiledPipeline.load(path)
+    assert meta["source_sha256"] == "abc"
+    records = network_data.drop("congestion", axis=1).head(300).to_dict("records")
+    np.testing.assert_array_equal(
+        loaded.predict_proba(records), compiled.predict_proba(records)
+    )
+    assert loaded.predict_proba_one(records[0]) == compiled.predict_proba_one(
+        records[0]
+    )
+
+
+def test_predictor_starts_from_export_without_sklearn(
+    trained_pipeline, model_config, tmp_path
+):
+    config = yaml.safe_load(model_config.read_text())
+    export_path = tmp_path / "model.npz"
+    CompiledPipeline.from_pipeline(trained_pipeline).save(export_path)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        yaml.safe_dump(
+            {
+                **config,
+                "inference_engine": "compiled",
+                "compiled_model_path": str(export_path),
+            }
+        )
+    )
+
+    script = (
+        "import sys; from core.predictor import TrafficPredictor, WARM_UP_RECORD; "
+        f"p = TrafficPredictor(config_path={str(config_path)!r}); "
+        "print(p.predict(WARM_UP_RECORD)['probability']); "
+        "print(any(m.split('.')[0] in ('sklearn', 'pandas') for m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    predictor = TrafficPredictor(config_path=str(model_config))
+    expected = predictor.predict(WARM_UP_RECORD)["probability"]
+    assert float(output[0]) == pytest.approx(expected, abs=1e-12)
+    assert output[1] == "False"
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data_loader import (
+    StratifiedReservoir,
+    concat_chunks,
+    hash_test_mask,
+    iter_chunks,
+    stream_train_test_split,
+)
+from core.trainer import PROJECT_ROOT
+
+DATA_PATH = PROJECT_ROOT / "assets" / "datasets" / "synthetic_network_data.csv"
+
+
+def test_iter_chunks_uses_compact_dtypes():
+    chunk = next(iter_chunks(DATA_PATH, chunksize=1000))
+    assert len(chunk) == 1000
+    assert chunk["duration"].dtype == np.float32
+    assert chunk["packet_count"].dtype == np.int32
+    assert isinstance(chunk["protocol"].dtype, pd.CategoricalDtype)
+
+
+def test_iter_chunks_keeps_large_byte_counts(tmp_path, network_data):
+    path = tmp_path / "flows.csv"
+    df = network_data.head(3).copy()
+    df["src_bytes"] = [2**31, 5 * 2**32, 10]
+    df.to_csv(path, index=False)
+
+    chunk = next(iter_chunks(path, chunksize=1000))
+    assert chunk["src_bytes"].tolist() == [2**31, 5 * 2**32, 10]
+
+
+def test_concat_chunks_keeps_categoricals(network_data):
+    df = concat_chunks(iter_chunks(DATA_PATH, chunksize=7000))
+    assert len(df) == len(network_data)
+    assert isinstance(df["service"].dtype, pd.CategoricalDtype)
+    assert set(df["service"].cat.categories) == set(network_data["service"])
+    assert (df["service"].astype(str) == network_data["service"]).all()
+
+
+def test_hash_split_is_independent_of_chunking():
+    small = np.concatenate(
+        [hash_test_mask(c, 0.2) for c in iter_chunks(DATA_PATH, chunksize=3000)]
+    )
+    large = np.concatenate(
+        [hash_test_mask(c, 0.2) for c in iter_chunks(DATA_PATH, chunksize=50000)]
+    )
+    assert (small == large).all()
+    assert small.mean() == pytest.approx(0.2, abs=0.01)
+
+
+def test_stratified_reservoir_is_bounded_and_stratified(network_data):
+    reservoir = StratifiedReservoir(capacity=2000, seed=0)
+    for chunk in iter_chunks(DATA_PATH, chunksize=5000):
+        reservoir.add(chunk)
+
+    sample = reservoir.sample()
+    assert abs(len(sample) - 2000) <= 1
+    assert sample["congestion"].mean() == pytest.approx(
+        network_data["congestion"].mean(), abs=0.005
+    )
+
+
+@pytest.mark.parametrize("method", ["hash", "reservoir"])
+def test_stream_train_test_split(method):
+    train, test = stream_train_test_split(
+        iter_chunks(DATA_PATH, chunksize=4000),
+        test_size=0.25,
+        method=method,
+        max_rows=8000,
+    )
+    assert abs(len(train) - 6000) <= 2
+    assert abs(len(test) - 2000) <= 2
+
+
+def test_reservoir_split_requires_max_rows():
+    with pytest.raises(ValueError):
+        stream_train_test_split(iter_chunks(DATA_PATH), method="reservoir")
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data_loader import concat_chunks, iter_chunks
+from core.dataset_cache import DatasetCache, write_columnar
+
+
+def test_cache_roundtrip(tmp_path, network_data):
+    source = tmp_path / "flows.csv"
+    network_data.head(5000).to_csv(source, index=False)
+    cache = DatasetCache(tmp_path / "cache")
+
+    built = cache.load(source, chunksize=1200)
+    expected = concat_chunks(iter_chunks(source))
+
+    pd.testing.assert_frame_equal(
+        built, expected, check_categorical=False, check_dtype=True
+    )
+    assert isinstance(built["protocol"].dtype, pd.CategoricalDtype)
+
+    # Numeric columns are views onto the mapped file, not parsed copies
+    base = built["duration"].to_numpy()
+    while base.base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+
+
+def test_cache_roundtrip_with_string_column(tmp_path, network_data):
+    source = tmp_path / "flows.csv"
+    df = network_data.head(3000).copy()
+    df["site"] = np.where(df.index % 3 == 0, "edge", "core")
+    df.loc[5, "site"] = None
+    df.to_csv(source, index=False)
+
+    built = DatasetCache(tmp_path / "cache").load(source, chunksize=1000)
+    expected = concat_chunks(iter_chunks(source))
+    assert list(built["site"].astype(object).fillna("?")) == list(
+        expected["site"].fillna("?")
+    )
+    assert isinstance(built["site"].dtype, pd.CategoricalDtype)
+
+    mixed = pd.DataFrame({"site": ["edge", 3]})
+    with pytest.raises(ValueError, match="site"):
+        write_columnar([mixed], tmp_path / "mixed")
+
+
+def test_cache_reuses_and_invalidates_on_content(tmp_path, network_data):
+    source = tmp_path / "flows.csv"
+    network_data.head(1000).to_csv(source, index=False)
+    cache = DatasetCache(tmp_path / "cache")
+
+    first = cache.entry_dir(source)
+    cache.load(source)
+    assert (first / "meta.json").exists()
+    assert cache.entry_dir(source) == first
+
+    network_data.head(1500).to_csv(source, index=False)
+    second = cache.entry_dir(source)
+    assert second != first
+    assert len(cache.load(source)) == 1500
+
+
+def test_cache_iter_chunks(tmp_path, network_data):
+    source = tmp_path / "flows.csv"
+    network_data.head(2500).to_csv(source, index=False)
+    cache = DatasetCache(tmp_path / "cache")
+
+    chunks = list(cache.iter_chunks(source, chunksize=1000))
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
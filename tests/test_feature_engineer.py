@@ -1,6 +1,17 @@
+import math
+
 import pandas as pd
+import pytest
+
+from core.feature_engineer import OnlineFeatureStore, engineer_features
 
-from core.feature_engineer import engineer_features
+FLOW = {
+    "src_bytes": 100,
+    "dst_bytes": 50,
+    "packet_count": 10,
+    "protocol": "TCP",
+    "service": "http",
+}
 
 
 def test_engineer_features():
@@ -20,3 +31,54 @@ def test_engineer_features():
     assert "protocol_UDP" in out.columns
     assert "service_dns" in out.columns
     assert not out.isnull().values.any()
+
+
+def test_online_features_decay_per_key():
+    store = OnlineFeatureStore(windows=[60])
+
+    first = store.observe(FLOW, timestamp=0.0)
+    assert first["service_flows_60s"] == 1.0
+    assert first["service_bytes_60s"] == 150.0
+    assert first["service_packet_rate_60s"] == pytest.approx(10 / 60)
+
+    second = store.observe(FLOW, timestamp=60.0)
+    assert second["service_flows_60s"] == pytest.approx(1 + math.exp(-1))
+    assert second["protocol_flows_60s"] == pytest.approx(1 + math.exp(-1))
+
+    # Another service shares the protocol aggregates only
+    dns = store.observe({**FLOW, "service": "dns"}, timestamp=60.0)
+    assert dns["service_flows_60s"] == 1.0
+    assert dns["protocol_flows_60s"] == pytest.approx(2 + math.exp(-1))
+
+    # Peeking and out-of-order flows do not move the clock backwards
+    assert store.peek(FLOW, timestamp=60.0) == store.peek(FLOW, timestamp=0.0)
+    assert store.peek(FLOW, timestamp=60.0)["service_flows_60s"] == pytest.approx(
+        2 + math.exp(-1)
+    )
+
+
+def test_online_features_steady_rate_matches_window():
+    store = OnlineFeatureStore(windows=[10], keys=["service"], replay_rate=50)
+    df = pd.DataFrame([FLOW] * 2000)
+
+    out = store.transform(df)
+
+    # 50 flows/s over a 10 s window settles near 500 flows
+    assert list(out.columns[-3:]) == store.feature_names
+    assert out["service_flows_10s"].iloc[-1] == pytest.approx(500, rel=0.02)
+    assert out["service_packet_rate_10s"].iloc[-1] == pytest.approx(500, rel=0.02)
+
+    # Chunks continue the same replay
+    store.reset()
+    chunked = pd.concat(
+        [store.transform(df.iloc[:700]), store.transform(df.iloc[700:])]
+    )
+    pd.testing.assert_frame_equal(chunked, out)
+
+
+def test_online_features_bound_tracked_keys():
+    store = OnlineFeatureStore(windows=[60], keys=["service"], max_keys=2)
+    for service in ["a", "b", "c"]:
+        store.observe({**FLOW, "service": service}, timestamp=0.0)
+    assert store.peek({**FLOW, "service": "a"}, 0.0)["service_flows_60s"] == 1.0
+    assert store.peek({**FLOW, "service": "c"}, 0.0)["service_flows_60s"] == 2.0
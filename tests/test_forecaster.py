@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.forecaster import (
+    IntervalSeries,
+    LagForecaster,
+    LoadForecaster,
+    build_series,
+    evaluate_forecaster,
+    fit_forecaster,
+)
+
+FLOW = {"src_bytes": 100, "dst_bytes": 50, "packet_count": 10}
+
+
+def periodic_log(n_intervals=600, interval=60.0, seed=0) -> pd.DataFrame:
+    """Flows whose volume and congestion follow a 24-interval cycle."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n_intervals):
+        load = 0.5 + 0.5 * np.sin(2 * np.pi * i / 24)
+        flows = 5 + int(20 * load)
+        times = i * interval + np.sort(rng.uniform(0, interval, flows))
+        congestion = rng.random(flows) < 0.1 + 0.8 * load
+        for t, label in zip(times, congestion):
+            rows.append((t, 100, 50, 10, int(label)))
+    return pd.DataFrame(
+        rows,
+        columns=["timestamp", "src_bytes", "dst_bytes", "packet_count", "congestion"],
+    )
+
+
+def test_interval_series_ring_buffer():
+    series = IntervalSeries(interval_seconds=10, capacity=4)
+    series.add(0.0, 150, 10, 1.0)
+    series.add(5.0, 150, 10, 0.0)
+    assert series.closed == 0
+
+    # Moving into t=30 closes [0, 10) and records the idle [10, 20), [20, 30)
+    assert series.add(31.0, 150, 10, 1.0) == 3
+    values, starts = series.window(3)
+    assert list(starts) == [0, 10, 20]
+    assert list(values[0]) == [2, 300, 20, 0.5]
+    assert values[1:].sum() == 0
+
+    # The buffer wraps without growing
+    series.advance(100.0)
+    values, starts = series.window(4)
+    assert list(starts) == [60, 70, 80, 90]
+    assert series.values.shape == (4, 4)
+    with pytest.raises(ValueError):
+        series.window(5)
+
+
+def test_build_series_matches_incremental_series():
+    log = periodic_log(n_intervals=30)
+    starts, values = build_series([log.iloc[:200], log.iloc[200:]], 60.0)
+
+    series = IntervalSeries(60.0, capacity=64)
+    for row in log.itertuples():
+        series.add(row.timestamp, 150, row.packet_count, row.congestion)
+    series.advance(30 * 60.0)
+    ring_values, ring_starts = series.window(30)
+
+    np.testing.assert_array_equal(starts, ring_starts)
+    np.testing.assert_allclose(values, ring_values)
+
+
+def test_forecaster_learns_cycle_and_round_trips(tmp_path):
+    starts, values = build_series([periodic_log()], 60.0)
+    model = fit_forecaster(starts[:480], values[:480], lags=12, horizon=3)
+
+    metrics = evaluate_forecaster(model, starts[480:], values[480:])
+    assert metrics["mae"] < metrics["mae_persistence"]
+
+    model.save(tmp_path / "forecast.npz")
+    loaded = LagForecaster.load(tmp_path / "forecast.npz")
+    window = values[100:112]
+    np.testing.assert_allclose(
+        loaded.predict(window, starts[111]), model.predict(window, starts[111])
+    )
+
+
+def test_load_forecaster_updates_per_interval():
+    starts, values = build_series([periodic_log(n_intervals=200)], 60.0)
+    model = fit_forecaster(starts, values, lags=4, horizon=2)
+    now = [0.0]
+    forecaster = LoadForecaster(model, capacity=8, clock=lambda: now[0])
+
+    forecaster.observe({**FLOW, "timestamp": 0.0}, 0.9)
+    assert forecaster.forecast() == {
+        "ready": False,
+        "intervals_needed": 4,
+        "interval_seconds": 60.0,
+    }
+
+    for i in range(1, 5):
+        forecaster.observe({**FLOW, "timestamp": i * 60.0 + 1}, 0.9)
+    # Timestamped flows close intervals; the clock does not
+    now[0] = 10 * 60.0
+    result = forecaster.forecast()
+    assert result["ready"] is True
+    assert result["based_on"] == 180.0
+    assert [step["start"] for step in result["forecast"]] == [240.0, 300.0]
+    assert all(0.0 <= step["congestion"] <= 1.0 for step in result["forecast"])
+
+    # Without timestamps the clock places flows and moves past idle time
+    forecaster.observe(FLOW, 0.9)
+    now[0] = 10 * 60.0
+    assert forecaster.forecast()["based_on"] == 540.0
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from core.dataset_cache import open_columnar
+from generate_data import COLUMNS, generate_sharded, generate_synthetic_traffic
+
+
+def test_generate_synthetic_traffic():
+    df = generate_synthetic_traffic(n=20000, seed=1)
+
+    assert list(df.columns) == COLUMNS
+    assert len(df) == 20000
+    assert (df[["src_bytes", "dst_bytes"]] >= 0).all().all()
+    assert df["hour"].between(0, 23).all()
+    assert (df.loc[df["protocol"] == "ICMP", "service"] == "none").all()
+    assert df["protocol"].value_counts(normalize=True)["ICMP"] == pytest.approx(
+        0.05, abs=0.01
+    )
+    pd.testing.assert_frame_equal(df, generate_synthetic_traffic(n=20000, seed=1))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "columnar"])
+def test_generate_sharded(tmp_path, fmt):
+    paths = generate_sharded(
+        1001, tmp_path / "flows.csv", seed=3, shards=3, workers=2, fmt=fmt
+    )
+
+    assert [p.name.split("-of-")[0] for p in paths] == [
+        "flows-00000",
+        "flows-00001",
+        "flows-00002",
+    ]
+    if fmt == "csv":
+        shards = [pd.read_csv(p) for p in paths]
+    else:
+        shards = [open_columnar(p) for p in paths]
+    assert [len(s) for s in shards] == [334, 334, 333]
+    # Shards come from independent streams, not copies of one seed
+    assert not shards[0]["duration"].head(10).equals(shards[1]["duration"].head(10))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "columnar"])
+def test_generate_sharded_replaces_existing_output(tmp_path, fmt):
+    (path,) = generate_sharded(100, tmp_path / "flows.csv", seed=1, fmt=fmt)
+    generate_sharded(50, tmp_path / "flows.csv", seed=2, fmt=fmt)
+
+    expected = generate_synthetic_traffic(n=50, seed=2)
+    df = pd.read_csv(path) if fmt == "csv" else open_columnar(path)
+    assert len(df) == 50
+    assert df["duration"].tolist() == pytest.approx(expected["duration"].tolist())
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name]
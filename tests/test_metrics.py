@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from core.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=[0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    cumulative, count, total = histogram.snapshot()
+    assert cumulative == [2, 3, 4]
+    assert count == 4
+    assert total == 2.65
+
+
+def test_threads_record_into_separate_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events.", ("kind",))
+    histogram = registry.histogram("work_seconds", "Work.").labels()
+    recorded = threading.Barrier(5)
+    release = threading.Event()
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+            histogram.observe(0.001)
+        recorded.wait()
+        release.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    recorded.wait()
+    assert len(histogram._shards) == 4
+    assert counter.values() == {("a",): 4000.0}
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    # Exited threads' shards are folded into the totals
+    assert counter.values() == {("a",): 4000.0}
+    assert histogram.snapshot()[1] == 4000
+    assert histogram._shards == [] and counter._shards == []
+
+    registry.reset()
+    assert counter.values() == {}
+    assert histogram.snapshot()[1] == 0
+
+
+def test_short_lived_threads_do_not_accumulate_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.")
+    histogram = registry.histogram("request_seconds", "Latency.").labels()
+
+    def request():
+        counter.inc()
+        histogram.observe(0.002)
+
+    for _ in range(2000):
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+
+    assert len(histogram._shards) <= 1 and len(counter._shards) <= 1
+    assert counter.values() == {(): 2000.0}
+    cumulative, count, total = histogram.snapshot()
+    assert count == 2000
+    assert total == pytest.approx(4.0)
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.", ("endpoint",)).inc('/a"b')
+    registry.histogram("latency_seconds", "Latency.", ("stage",), [0.5]).labels(
+        "model"
+    ).observe(0.25)
+    registry.callback("model_info", "Model.", lambda: [({"version": "abc"}, 1)])
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{endpoint="/a\\"b"} 1' in text
+    assert 'latency_seconds_bucket{stage="model",le="0.5"} 1' in text
+    assert 'latency_seconds_bucket{stage="model",le="+Inf"} 1' in text
+    assert 'latency_seconds_count{stage="model"} 1' in text
+    assert 'model_info{version="abc"} 1' in text
@@ -0,0 +1,155 @@
+import copy
+import os
+import time
+
+import joblib
+import pytest
+import yaml
+
+from core.dataset_cache import file_sha256
+from core.predictor import WARM_UP_RECORD, TrafficPredictor
+from core.trainer import TrafficModelTrainer, atomic_write
+
+
+@pytest.fixture
+def reload_config(tmp_path, trained_pipeline):
+    model_path = tmp_path / "gb_model.pkl"
+    joblib.dump(trained_pipeline, model_path)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        yaml.safe_dump(
+            {
+                "model_path": str(model_path),
+                "inference_engine": "compiled",
+                "model_reload": {"enabled": True, "interval": 0.05},
+                "prediction_cache": {"enabled": True},
+            }
+        )
+    )
+    return config_path
+
+
+def save_variant(config_path, pipeline, learning_rate):
+    """Save a copy of pipeline whose scores differ, through the trainer."""
+    trainer = TrafficModelTrainer(config_path=str(config_path))
+    trainer.pipeline = copy.deepcopy(pipeline)
+    trainer.pipeline.named_steps["model"].learning_rate = learning_rate
+    trainer._save_pipeline()
+    # Make the change visible even on filesystems with coarse mtimes
+    stat = os.stat(trainer.model_path)
+    os.utime(trainer.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    return trainer.model_path
+
+
+def test_reload_swaps_changed_model(reload_config, trained_pipeline):
+    predictor = TrafficPredictor(config_path=str(reload_config))
+    old_state = predictor._state
+    before = predictor.predict(WARM_UP_RECORD)["probability"]
+    assert not predictor.reload_if_changed()
+
+    save_variant(reload_config, trained_pipeline, learning_rate=0.01)
+    assert predictor.reload_if_changed()
+    assert predictor.model_version != old_state.sha256
+    assert len(predictor.cache) == 0
+
+    after = predictor.predict(WARM_UP_RECORD)["probability"]
+    assert after != pytest.approx(before)
+    # A request holding the old snapshot still scores on the old model
+    assert predictor._predict_proba([WARM_UP_RECORD], old_state)[0] == pytest.approx(
+        before
+    )
+
+
+def test_reload_ignores_touch_and_keeps_model_on_bad_file(reload_config):
+    predictor = TrafficPredictor(config_path=str(reload_config))
+    version = predictor.model_version
+    model_path = predictor.model_path
+
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not predictor.reload_if_changed()
+    assert predictor.model_version == version
+
+    with open(model_path, "wb") as f:
+        f.write(b"not a pickle")
+    assert not predictor.reload_if_changed()
+    assert predictor.model_version == version
+    assert 0.0 <= predictor.predict(WARM_UP_RECORD)["probability"] <= 1.0
+
+
+def test_save_pipeline_is_atomic(reload_config, trained_pipeline):
+    model_path = save_variant(reload_config, trained_pipeline, learning_rate=0.05)
+    leftovers = [p for p in os.listdir(os.path.dirname(model_path)) if ".tmp" in p]
+    assert leftovers == []
+    loaded = joblib.load(model_path)
+    assert loaded.named_steps["model"].learning_rate == 0.05
+
+
+def test_watcher_picks_up_new_model(reload_config, trained_pipeline):
+    predictor = TrafficPredictor(config_path=str(reload_config))
+    version = predictor.model_version
+    predictor.start_watcher()
+    try:
+        save_variant(reload_config, trained_pipeline, learning_rate=0.02)
+        deadline = time.monotonic() + 5
+        while predictor.model_version == version and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert predictor.model_version != version
+    finally:
+        predictor.stop_watcher()
+
+
+def test_reload_waits_for_the_compiled_export(reload_config, trained_pipeline):
+    config = yaml.safe_load(reload_config.read_text())
+    config["compiled_model_path"] = str(reload_config.parent / "gb_model.npz")
+    reload_config.write_text(yaml.safe_dump(config))
+    save_variant(reload_config, trained_pipeline, learning_rate=0.1)
+
+    predictor = TrafficPredictor(config_path=str(reload_config))
+    assert predictor._state.path == config["compiled_model_path"]
+    # The same model has one identity, whichever artifact was loaded
+    assert predictor.model_version == file_sha256(config["model_path"])
+
+    # The trainer has written the new pickle but not yet its export
+    trainer = TrafficModelTrainer(config_path=str(reload_config))
+    trainer.pipeline = copy.deepcopy(trained_pipeline)
+    trainer.pipeline.named_steps["model"].learning_rate = 0.03
+    atomic_write(trainer.model_path, lambda f: joblib.dump(trainer.pipeline, f))
+    assert not predictor.reload_if_changed()
+    assert predictor._state.path == config["compiled_model_path"]
+
+    trainer._export_compiled()
+    assert predictor.reload_if_changed()
+    assert not predictor.reload_if_changed()
+    assert predictor.reloads == 1
+    assert predictor._state.path == config["compiled_model_path"]
+    assert predictor.model_version == file_sha256(trainer.model_path)
+
+
+def test_reload_serves_a_pickle_whose_export_never_comes(
+    reload_config, trained_pipeline
+):
+    config = yaml.safe_load(reload_config.read_text())
+    config["compiled_model_path"] = str(reload_config.parent / "gb_model.npz")
+    config["model_reload"]["export_grace"] = 0.2
+    reload_config.write_text(yaml.safe_dump(config))
+    save_variant(reload_config, trained_pipeline, learning_rate=0.1)
+    predictor = TrafficPredictor(config_path=str(reload_config))
+    before = predictor.predict(WARM_UP_RECORD)["probability"]
+
+    # Only the pickle is replaced, and its mtime says nothing about the export
+    exported = os.stat(config["compiled_model_path"]).st_mtime_ns
+    pipeline = copy.deepcopy(trained_pipeline)
+    pipeline.named_steps["model"].learning_rate = 0.01
+    atomic_write(config["model_path"], lambda f: joblib.dump(pipeline, f))
+    os.utime(config["model_path"], ns=(exported, exported - 10**9))
+    assert not predictor.reload_if_changed()
+
+    time.sleep(0.25)
+    assert predictor.reload_if_changed()
+    assert predictor._state.path == config["model_path"]
+    assert str(predictor.cache.source_path) == config["model_path"]
+    assert predictor.model_version == file_sha256(config["model_path"])
+    after = predictor.predict(WARM_UP_RECORD)["probability"]
+    assert after != pytest.approx(before)
+    assert not predictor.reload_if_changed()
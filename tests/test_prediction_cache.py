@@ -0,0 +1,116 @@
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+from core.prediction_cache import PredictionCache
+from core.predictor import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TrafficPredictor
+
+RECORD = {
+    "duration": 10.5,
+    "src_bytes": 1024,
+    "dst_bytes": 2048,
+    "packet_count": 5,
+    "hour": 9,
+    "protocol": "TCP",
+    "service": "http",
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    return PredictionCache(NUMERICAL_FEATURES, CATEGORICAL_FEATURES, **kwargs)
+
+
+def test_key_canonicalizes_and_quantizes():
+    cache = make_cache()
+    assert cache.make_key(RECORD) == cache.make_key({**RECORD, "hour": 9.0})
+    assert cache.make_key(RECORD) != cache.make_key({**RECORD, "src_bytes": 1025})
+
+    cache = make_cache(quantize={"src_bytes": 50})
+    assert cache.make_key(RECORD) == cache.make_key({**RECORD, "src_bytes": 1010})
+    assert cache.make_key(RECORD) != cache.make_key({**RECORD, "src_bytes": 1100})
+
+    with pytest.raises(ValueError):
+        make_cache(quantize={"protocol": 1})
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = make_cache(max_size=2, ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.stats()["evictions"] == 1
+
+    clock.now += 10
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_invalidated_when_source_changes(tmp_path):
+    model_file = tmp_path / "model.pkl"
+    model_file.write_bytes(b"v1")
+    clock = FakeClock()
+    cache = make_cache(source_path=model_file, check_interval=1.0, clock=clock)
+    cache.put("a", 1)
+
+    model_file.write_bytes(b"version 2")
+    os.utime(model_file, ns=(0, 0))
+    assert cache.get("a") == 1  # not checked again until check_interval passes
+
+    clock.now += 1.0
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+    # After the model moves to another file, only that file is watched
+    moved = tmp_path / "v2" / "model.pkl"
+    moved.parent.mkdir()
+    moved.write_bytes(b"version 2")
+    cache.bind(moved)
+    cache.put("a", 1)
+    model_file.write_bytes(b"version 3")
+    clock.now += 1.0
+    assert cache.get("a") == 1
+    moved.write_bytes(b"version 3, moved")
+    clock.now += 1.0
+    assert cache.get("a") is None
+
+
+def test_predictor_serves_repeats_from_cache(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        yaml.safe_dump(
+            {
+                "model_path": str(tmp_path / "model.pkl"),
+                "prediction_cache": {"enabled": True, "max_size": 10},
+            }
+        )
+    )
+    (tmp_path / "model.pkl").write_bytes(b"model")
+    with patch("joblib.load", return_value=MagicMock()):
+        predictor = TrafficPredictor(config_path=str(config_path))
+    predictor.pipeline.predict_proba.return_value = [[0.2, 0.8]]
+
+    first = predictor.predict(RECORD)
+    second = predictor.predict({**RECORD, "hour": 9.0})
+    assert first == second == {"congestion": True, "probability": 0.8}
+    predictor.pipeline.predict_proba.assert_called_once()
+    assert predictor.cache.stats()["hits"] == 1
+
+    # Callers cannot corrupt the cached entry
+    second["probability"] = 0.0
+    assert predictor.predict(RECORD)["probability"] == 0.8
@@ -1,22 +1,31 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+import yaml
 
-from core.predictor import TrafficPredictor
+from core.predictor import FEATURE_ORDER, TrafficPredictor
 
 
 class TestTrafficPredictor:
     @pytest.fixture
-    def predictor(self):
-        with patch("core.predictor.joblib.load") as mock_load:
+    def predictor(self, tmp_path):
+        # Score through the (mocked) pickled pipeline, not an exported model
+        model_path = tmp_path / "gb_model.pkl"
+        model_path.write_bytes(b"model")
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(
+            yaml.safe_dump(
+                {"model_path": str(model_path), "inference_engine": "sklearn"}
+            )
+        )
+        with patch("joblib.load") as mock_load:
             # Create a mock pipeline
             mock_pipeline = MagicMock()
             mock_load.return_value = mock_pipeline
-            return TrafficPredictor()
+            return TrafficPredictor(config_path=str(config_path))
 
     def test_predict(self, predictor):
-        # Mock the pipeline's predict and predict_proba methods
-        predictor.pipeline.predict.return_value = [1]
+        # Mock the pipeline's predict_proba method
         predictor.pipeline.predict_proba.return_value = [[0.2, 0.8]]
 
         input_data = {
@@ -34,6 +43,46 @@ class TestTrafficPredictor:
         assert result["congestion"] is True
         assert result["probability"] == 0.8  # Using exact match since we're mocking
 
-        # Verify the pipeline was called with correct feature order
-        predictor.pipeline.predict.assert_called_once()
+        # The label is derived from a single predict_proba pass
+        predictor.pipeline.predict.assert_not_called()
         predictor.pipeline.predict_proba.assert_called_once()
+        df = predictor.pipeline.predict_proba.call_args[0][0]
+        assert list(df.columns) == FEATURE_ORDER
+
+    def test_predict_rejects_missing_fields(self, predictor):
+        with pytest.raises(ValueError, match="missing fields: service"):
+            predictor.predict(
+                {
+                    "duration": 1.0,
+                    "src_bytes": 10,
+                    "dst_bytes": 10,
+                    "packet_count": 1,
+                    "hour": 3,
+                    "protocol": "UDP",
+                }
+            )
+
+    def test_predict_batch(self, predictor):
+        predictor.pipeline.predict_proba.return_value = [[0.9, 0.1], [0.3, 0.7]]
+        good = {
+            "duration": 1.0,
+            "src_bytes": 100,
+            "dst_bytes": 50,
+            "packet_count": 3,
+            "hour": 2,
+            "protocol": "UDP",
+            "service": "dns",
+        }
+        records = [good, {**good, "hour": "noon"}, dict(good, packet_count=90)]
+
+        results = predictor.predict_batch(records)
+
+        assert results[0] == {"index": 0, "congestion": False, "probability": 0.1}
+        assert results[1]["index"] == 1
+        assert "hour" in results[1]["error"]
+        assert results[2] == {"index": 2, "congestion": True, "probability": 0.7}
+
+        # Valid rows are scored together in one pass
+        predictor.pipeline.predict_proba.assert_called_once()
+        df = predictor.pipeline.predict_proba.call_args[0][0]
+        assert len(df) == 2
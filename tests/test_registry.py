@@ -0,0 +1,161 @@
+import os
+
+import pytest
+import yaml
+
+from core.dataset_cache import file_sha256
+from core.predictor import TrafficPredictor
+from core.registry import ModelRegistry
+from core.schema import FeatureSpec
+from core.trainer import TrafficModelTrainer
+
+RECORDS = [
+    {
+        "duration": 10,
+        "src_bytes": 5000,
+        "dst_bytes": 3000,
+        "packet_count": 60,
+        "hour": 8,
+        "protocol": "TCP",
+        "service": "http",
+    },
+    {
+        "duration": 2,
+        "src_bytes": 100,
+        "dst_bytes": 100,
+        "packet_count": 5,
+        "hour": 14,
+        "protocol": "UDP",
+        "service": "dns",
+    },
+]
+
+
+def write_config(model_config, tmp_path, **overrides) -> str:
+    config = yaml.safe_load(model_config.read_text())
+    config.update(overrides)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return str(config_path)
+
+
+def test_registry_versions_and_aliases(tmp_path):
+    source = tmp_path / "gb_model.pkl"
+    source.write_bytes(b"first")
+    registry = ModelRegistry(tmp_path / "registry")
+
+    assert registry.register(source, metadata={"metrics": {"f1": 0.5}}) == "v1"
+    # The trainer replaces its output by rename; the registered copy stays
+    os.remove(source)
+    source.write_bytes(b"second")
+    compiled = tmp_path / "gb_model.npz"
+    compiled.write_bytes(b"compiled")
+    assert registry.register(source, compiled) == "v2"
+
+    assert registry.aliases() == {"latest": "v2", "production": "v1"}
+    first = registry.get("production")
+    assert first["version"] == "v1"
+    assert first["metrics"] == {"f1": 0.5}
+    assert first["compiled_model_path"] is None
+    assert open(first["model_path"], "rb").read() == b"first"
+    assert open(registry.get("v2")["compiled_model_path"], "rb").read() == b"compiled"
+    assert (tmp_path / "registry" / "v2" / "meta.json").exists()
+
+    # Another process's registry sees the change on its next lookup
+    reader = ModelRegistry(tmp_path / "registry")
+    assert reader.resolve("production") == "v1"
+    registry.set_alias("production", "latest")
+    registry.set_alias("pinned", "v1")
+    assert reader.resolve("production") == "v2"
+    assert reader.resolve("pinned") == "v1"
+    assert [entry["version"] for entry in reader.versions()] == ["v1", "v2"]
+
+    registry.remove_alias("pinned")
+    with pytest.raises(KeyError, match="pinned"):
+        reader.get("pinned")
+    with pytest.raises(KeyError, match="v9"):
+        registry.set_alias("production", "v9")
+
+
+def test_training_runs_are_registered(model_config, tmp_path, network_data):
+    data_path = tmp_path / "flows.csv"
+    network_data.head(5000).to_csv(data_path, index=False)
+    registry_config = {"enabled": True, "dir": str(tmp_path / "registry")}
+    config_path = write_config(
+        model_config,
+        tmp_path,
+        model_path=str(tmp_path / "gb_model.pkl"),
+        compiled_model_path=str(tmp_path / "gb_model.npz"),
+        inference_engine="compiled",
+        registry=registry_config,
+    )
+    trainer = TrafficModelTrainer(config_path=config_path)
+    metrics = trainer.train(str(data_path))
+    assert trainer.version == "v1"
+
+    config = yaml.safe_load(open(config_path))
+    config["model_params"]["n_estimators"] = 10
+    config["incremental"] = {"n_estimators": 5}
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+    trainer = TrafficModelTrainer(config_path=config_path)
+    trainer.train(str(data_path))
+    trainer.train_incremental(str(data_path))
+
+    registry = trainer.registry
+    assert registry.aliases() == {"latest": "v3", "production": "v1"}
+    first = registry.get("v1")
+    assert first["kind"] == "full"
+    assert first["metrics"] == metrics
+    assert first["data_sha256"] == file_sha256(data_path)
+    assert first["model_sha256"] == file_sha256(first["model_path"])
+    assert first["train_seconds"] > 0
+    assert FeatureSpec.from_dict(first["feature_spec"]) == trainer.spec
+    assert first["compiled_model_path"].endswith("v1/model.npz")
+    assert registry.get("latest")["parent"] == "v2"
+    assert registry.get("latest")["metrics"]["n_estimators"] == 15
+
+    # Serve production, with latest scoring half the records and the middle
+    # version shadowing
+    config["registry"] = {
+        **registry_config,
+        "serve": "production",
+        "shadow": ["v2"],
+        "ab": {"latest": 0.5},
+        "seed": 0,
+    }
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+    predictor = TrafficPredictor(config_path=config_path)
+    assert predictor._state.version == "v1"
+    assert predictor._state.path == first["compiled_model_path"]
+
+    results = predictor.predict_batch(RECORDS * 20)
+    assert {result["model"] for result in results} == {"v1", "v3"}
+    assert predictor.predict(RECORDS[0])["model"] in ("v1", "v3")
+    stats = predictor.model_stats()
+    assert stats["served"]["fraction"] == 0.5
+    assert stats["ab"]["latest"]["version"] == "v3"
+    assert stats["shadow"]["v2"]["records"] == 41
+    assert 0.0 <= stats["shadow"]["v2"]["agreement"] <= 1.0
+
+    # Each version scores the same as when served on its own
+    alone = TrafficPredictor(config_path=config_path, model_ref="v3")
+    expected = {r["probability"] for r in alone.predict_batch(RECORDS)}
+    assert {r["probability"] for r in results if r["model"] == "v3"} <= expected
+
+    # Promoting a version is picked up like a retrained model file
+    registry.set_alias("production", "v3")
+    assert predictor.reload_if_changed()
+    assert predictor._state.version == "v3"
+    assert not predictor.reload_if_changed()
+
+
+def test_serving_an_unknown_alias_fails(model_config, tmp_path):
+    config_path = write_config(
+        model_config,
+        tmp_path,
+        registry={"enabled": True, "dir": str(tmp_path / "registry"), "serve": "x"},
+    )
+    with pytest.raises(KeyError, match="'x'"):
+        TrafficPredictor(config_path=config_path)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.schema import DEFAULT_SCHEMA, FeatureSchema, FeatureSpec, SchemaError
+
+RECORD = {
+    "duration": 2.5,
+    "src_bytes": 900,
+    "dst_bytes": 300.0,
+    "packet_count": 12,
+    "hour": 8,
+    "protocol": "TCP",
+    "service": "http",
+}
+
+
+def test_coerce_returns_typed_row():
+    row, errors = DEFAULT_SCHEMA.coerce({**RECORD, "duration": 3, "extra": "x"})
+    assert errors == []
+    assert row == {**RECORD, "duration": 3.0, "dst_bytes": 300}
+    assert type(row["duration"]) is float and type(row["dst_bytes"]) is int
+    assert DEFAULT_SCHEMA.features == list(RECORD)
+
+    row = DEFAULT_SCHEMA.validate({**RECORD, "timestamp": 1700000000})
+    assert row["timestamp"] == 1700000000.0
+
+
+def test_coerce_reports_every_field():
+    record = {
+        **RECORD,
+        "hour": 24,
+        "src_bytes": 1.5,
+        "packet_count": True,
+        "duration": float("nan"),
+        "service": "gopher",
+    }
+    del record["protocol"]
+    row, errors = DEFAULT_SCHEMA.coerce(record)
+
+    assert row is None
+    assert {error["field"]: error["code"] for error in errors} == {
+        "duration": "type",
+        "src_bytes": "type",
+        "packet_count": "type",
+        "hour": "range",
+        "protocol": "missing",
+        "service": "vocabulary",
+    }
+    with pytest.raises(SchemaError) as info:
+        DEFAULT_SCHEMA.validate(record)
+    assert str(info.value).startswith("missing fields: protocol; ")
+    assert "between 0 and 23" in str(info.value)
+    assert info.value.errors == errors
+
+    assert DEFAULT_SCHEMA.coerce([RECORD])[1][0]["message"] == (
+        "record must be a JSON object"
+    )
+
+
+def test_schema_from_config():
+    schema = FeatureSchema.from_config(
+        {
+            "schema": {
+                "size": {"type": "int", "max": 10},
+                "kind": {"type": "category"},
+                "seen_at": {"type": "float", "required": False},
+            }
+        }
+    )
+    assert (schema.numerical, schema.categorical) == (["size"], ["kind"])
+    assert schema.coerce({"size": 3, "kind": "anything"})[0] == {
+        "size": 3,
+        "kind": "anything",
+    }
+    with pytest.raises(ValueError):
+        FeatureSchema({"size": {"type": "complex"}})
+
+
+def test_check_frame():
+    df = pd.DataFrame([RECORD] * 4)
+    df.loc[1, "hour"] = 30
+    df.loc[2, "service"] = "gopher"
+    df["timestamp"] = [1.0, np.nan, 2.0, 3.0]
+
+    valid, invalid = DEFAULT_SCHEMA.check_frame(df)
+    assert list(valid) == [True, False, False, True]
+    assert invalid == {"hour": 1, "service": 1}
+
+    with pytest.raises(SchemaError, match="service"):
+        DEFAULT_SCHEMA.check_frame(df.drop(columns="service"))
+
+
+def test_feature_spec_round_trip():
+    spec = FeatureSpec.from_config({})
+    assert spec.columns == DEFAULT_SCHEMA.features
+    assert spec.categories["protocol"] == ["TCP", "UDP", "ICMP"]
+    assert FeatureSpec.from_dict(spec.to_dict()) == spec
+
+    online = FeatureSpec.from_config(
+        {"online_features": {"enabled": True, "windows": [60]}}
+    )
+    assert online != spec
+    assert online.raw_inputs == spec.raw_inputs
+    assert online.columns[len(spec.numerical)] == online.online_names[0]
+    assert FeatureSpec.from_dict(online.to_dict()).online == online.online
+
+    with pytest.raises(ValueError, match="version"):
+        FeatureSpec.from_dict({**spec.to_dict(), "version": 99})
+
+    # A model reading a field the serving schema does not require is refused
+    spec.check_schema(DEFAULT_SCHEMA)
+    narrow = FeatureSchema({"duration": {"type": "float"}})
+    with pytest.raises(ValueError, match="src_bytes"):
+        spec.check_schema(narrow)
@@ -0,0 +1,53 @@
+import runpy
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+from core.trainer import PROJECT_ROOT
+
+CONF_PATH = str(PROJECT_ROOT / "gunicorn.conf.py")
+
+
+def load_conf(monkeypatch, tmp_path, server):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"server": server}))
+    monkeypatch.setenv("MODEL_CONFIG", str(config_path))
+    return runpy.run_path(CONF_PATH)
+
+
+def test_server_settings_from_config(monkeypatch, tmp_path):
+    conf = load_conf(
+        monkeypatch,
+        tmp_path,
+        {"bind": "127.0.0.1:8000", "workers": 3, "threads": 4, "preload": True},
+    )
+    assert conf["bind"] == "127.0.0.1:8000"
+    assert conf["workers"] == 3
+    assert conf["threads"] == 4
+    assert conf["worker_class"] == "gthread"
+    assert conf["preload_app"] is True
+
+    conf = load_conf(monkeypatch, tmp_path, {"workers": None, "threads": 1})
+    assert conf["workers"] >= 1
+    assert conf["worker_class"] == "sync"
+
+
+def test_on_starting_warms_up_model(monkeypatch, tmp_path):
+    conf = load_conf(monkeypatch, tmp_path, {"preload": True})
+    server = SimpleNamespace(
+        cfg=SimpleNamespace(preload_app=True),
+        log=SimpleNamespace(info=lambda msg: None, error=lambda msg: None),
+    )
+
+    from web.app import predictor
+
+    conf["on_starting"](server)
+    assert predictor.ready
+
+    def broken():
+        raise RuntimeError("no model")
+
+    monkeypatch.setattr(predictor, "warm_up", broken)
+    with pytest.raises(SystemExit):
+        conf["on_starting"](server)
@@ -0,0 +1,255 @@
+import math
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from core.compiled import CompiledPipeline
+from core.predictor import TrafficPredictor
+from core.schema import DEFAULT_FIELDS, FeatureSpec
+from core.trainer import TrafficModelTrainer
+
+
+def make_trainer(model_config, tmp_path, **overrides) -> TrafficModelTrainer:
+    config = yaml.safe_load(model_config.read_text())
+    config.update(overrides)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return TrafficModelTrainer(config_path=str(config_path))
+
+
+def test_load_data_from_dataset_cache(model_config, tmp_path, network_data):
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        dataset_cache={"enabled": True, "dir": str(tmp_path / "cache")},
+    )
+    data_path = "assets/datasets/synthetic_network_data.csv"
+
+    first = trainer.load_data(data_path)
+    second = trainer.load_data(data_path)
+
+    assert len(list((tmp_path / "cache").glob("v*-*"))) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert (first["service"].astype(str) == network_data["service"]).all()
+
+
+def test_train_incremental_adds_trees(
+    trained_pipeline, model_config, tmp_path, network_data
+):
+    config = yaml.safe_load(model_config.read_text())
+    model_path = tmp_path / "gb_model.pkl"
+    shutil.copy(config["model_path"], model_path)
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(model_path),
+        incremental={"n_estimators": 5, "max_estimators": 100},
+    )
+
+    window = tmp_path / "window.csv"
+    network_data.sample(4000, random_state=1).to_csv(window, index=False)
+    metrics = trainer.train_incremental(str(window))
+
+    before = trained_pipeline.named_steps["model"]
+    after = joblib.load(model_path)
+    assert metrics["n_estimators"] == before.n_estimators_ + 5
+    assert after.named_steps["model"].n_estimators_ == before.n_estimators_ + 5
+    assert metrics["roc_auc"] > 0.9
+
+    # Preprocessing and the earlier trees are left untouched
+    before_encoder = trained_pipeline.named_steps["preprocessor"].named_transformers_[
+        "cat"
+    ]
+    after_encoder = after.named_steps["preprocessor"].named_transformers_["cat"]
+    for old, new in zip(before_encoder.categories_, after_encoder.categories_):
+        assert list(old) == list(new)
+    old_tree = before.estimators_[0, 0].tree_
+    new_tree = after.named_steps["model"].estimators_[0, 0].tree_
+    np.testing.assert_array_equal(old_tree.threshold, new_tree.threshold)
+
+
+def test_train_incremental_falls_back_to_full_refit(
+    trained_pipeline, model_config, tmp_path, network_data
+):
+    config = yaml.safe_load(model_config.read_text())
+    model_path = tmp_path / "gb_model.pkl"
+    shutil.copy(config["model_path"], model_path)
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(model_path),
+        incremental={"n_estimators": 5, "max_estimators": 10},
+    )
+
+    window = tmp_path / "window.csv"
+    network_data.sample(4000, random_state=2).to_csv(window, index=False)
+    trainer.train_incremental(str(window))
+
+    refit = joblib.load(model_path).named_steps["model"]
+    assert refit.n_estimators_ == config["model_params"]["n_estimators"]
+
+
+def test_save_pipeline_exports_compiled_model(
+    trained_pipeline, model_config, tmp_path, network_data
+):
+    export_path = tmp_path / "gb_model.npz"
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(tmp_path / "gb_model.pkl"),
+        compiled_model_path=str(export_path),
+        inference_engine="compiled",
+    )
+    trainer.pipeline = trained_pipeline
+    trainer._save_pipeline()
+    assert export_path.exists()
+
+    predictor = TrafficPredictor(config_path=str(tmp_path / "config.yaml"))
+    assert predictor._state.path == str(export_path)
+    assert predictor.pipeline is None
+    records = network_data.drop("congestion", axis=1).head(100).to_dict("records")
+    probabilities = [r["probability"] for r in predictor.predict_batch(records)]
+    expected = trained_pipeline.predict_proba(pd.DataFrame(records))[:, 1]
+    np.testing.assert_allclose(probabilities, expected, rtol=1e-12, atol=1e-12)
+
+
+def test_hist_gradient_boosting_backend(model_config, tmp_path, network_data):
+    model_path = tmp_path / "hgb_model.pkl"
+    stale_export = tmp_path / "hgb_model.npz"
+    stale_export.write_bytes(b"previous model")
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(model_path),
+        compiled_model_path=str(stale_export),
+        model_type="hist_gradient_boosting",
+        hist_model_params={"max_iter": 30, "max_depth": 4, "random_state": 42},
+        incremental={"n_estimators": 5},
+        # Any service name passes the schema, so the model sees unknown ones
+        schema={**DEFAULT_FIELDS, "service": {"type": "category"}},
+    )
+
+    metrics = trainer.train("assets/datasets/synthetic_network_data.csv")
+    assert metrics["roc_auc"] > 0.95
+    steps = trainer.pipeline.named_steps
+    assert "selector" not in steps
+    assert list(steps["model"].is_categorical_) == [False] * 5 + [True] * 2
+    assert not stale_export.exists()
+
+    # Serving falls back to the sklearn engine and handles unknown categories
+    predictor = TrafficPredictor(config_path=str(tmp_path / "config.yaml"))
+    assert predictor.ensemble is None
+    record = network_data.drop("congestion", axis=1).iloc[0].to_dict()
+    assert 0.0 <= predictor.predict({**record, "service": "gopher"})["probability"]
+
+    window = tmp_path / "window.csv"
+    network_data.sample(4000, random_state=3).to_csv(window, index=False)
+    metrics = trainer.train_incremental(str(window))
+    assert metrics["n_estimators"] == steps["model"].n_iter_ == 35
+
+
+def test_online_features_train_and_serve(model_config, tmp_path, network_data):
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(tmp_path / "gb_model.pkl"),
+        inference_engine="compiled",
+        feature_selection_k=12,
+        online_features={"enabled": True, "windows": [30], "replay_rate": 50},
+    )
+    trainer.train("assets/datasets/synthetic_network_data.csv")
+    preprocessor = trainer.pipeline.named_steps["preprocessor"]
+    assert "service_flows_30s" in list(preprocessor.transformers_[0][2])
+
+    predictor = TrafficPredictor(config_path=str(tmp_path / "config.yaml"))
+    predictor.warm_up()
+    assert predictor.compiled is not None
+    record = network_data.drop("congestion", axis=1).iloc[0].to_dict()
+    single = predictor.predict({**record, "timestamp": 0.0})
+    batch = predictor.predict_batch([{**record, "timestamp": 1.0}])
+    assert 0.0 <= single["probability"] <= 1.0
+    assert "error" not in batch[0]
+
+    # Each scored flow is counted once; warm-up flows are not
+    peek = predictor.features.peek({**record, "timestamp": 1.0})
+    assert peek["service_flows_30s"] == pytest.approx(2 + math.exp(-1 / 30))
+    assert (
+        "timestamp"
+        in predictor.predict_batch([{**record, "timestamp": "x"}])[0]["error"]
+    )
+
+    # The aggregates served come from the model's spec, not the config
+    make_trainer(model_config, tmp_path, model_path=str(tmp_path / "gb_model.pkl"))
+    predictor = TrafficPredictor(config_path=str(tmp_path / "config.yaml"))
+    assert predictor.features.feature_names == trainer.spec.online_names
+
+
+def test_feature_spec_is_saved_with_the_model(model_config, tmp_path, network_data):
+    data_path = tmp_path / "flows.csv"
+    network_data.assign(service_count=1).head(5000).to_csv(data_path, index=False)
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(tmp_path / "gb_model.pkl"),
+        compiled_model_path=str(tmp_path / "gb_model.npz"),
+        inference_engine="compiled",
+    )
+    trainer.train(str(data_path))
+
+    # Columns outside the spec, like service_count, are never learned
+    spec = FeatureSpec.from_dict(joblib.load(trainer.model_path).feature_spec_)
+    assert spec == trainer.spec
+    assert spec.columns == list(network_data.columns.drop("congestion"))
+    preprocessor = trainer.pipeline.named_steps["preprocessor"]
+    assert "service_count" not in list(preprocessor.transformers_[0][2])
+
+    _, meta = CompiledPipeline.load(trainer.compiled_model_path)
+    assert FeatureSpec.from_dict(meta["feature_spec"]) == spec
+    predictor = TrafficPredictor(config_path=str(tmp_path / "config.yaml"))
+    assert predictor._state.path == trainer.compiled_model_path
+    assert predictor._state.spec == spec
+
+    # Growing the model under a different layout would mismatch serving
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(tmp_path / "gb_model.pkl"),
+        online_features={"enabled": True, "windows": [30]},
+    )
+    with pytest.raises(ValueError, match="feature spec"):
+        trainer.train_incremental(str(data_path))
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        {"strategy": "halving", "resource": "n_samples", "factor": 2},
+        {"strategy": "halving", "resource": "model__n_estimators", "factor": 2},
+        {"strategy": "grid", "early_stopping": True},
+    ],
+)
+def test_search_strategies(model_config, tmp_path, search):
+    cache_dir = tmp_path / "pipeline-cache"
+    trainer = make_trainer(
+        model_config,
+        tmp_path,
+        model_path=str(tmp_path / "model.pkl"),
+        grid_search_params={
+            "model__n_estimators": [10, 20],
+            "model__max_depth": [2, 3],
+        },
+        search={**search, "cv": 2, "cache_dir": str(cache_dir)},
+    )
+
+    metrics = trainer.train("assets/datasets/synthetic_network_data.csv")
+
+    assert metrics["roc_auc"] > 0.95
+    assert trainer.pipeline.memory is None
+    # Fitted preprocessing was cached and shared across candidates
+    assert any(cache_dir.rglob("output.pkl"))
+    saved = joblib.load(tmp_path / "model.pkl")
+    assert saved.memory is None
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from core.tree_ensemble import FlatTreeEnsemble
+
+
+def test_flat_ensemble_matches_predict_proba(trained_pipeline, network_data):
+    model = trained_pipeline.named_steps["model"]
+    ensemble = FlatTreeEnsemble.from_model(model)
+    X = trained_pipeline[:-1].transform(network_data.drop("congestion", axis=1))
+
+    assert ensemble.n_trees == model.n_estimators_
+    np.testing.assert_allclose(
+        ensemble.predict_proba(X), model.predict_proba(X), rtol=1e-12, atol=1e-12
+    )
+
+
+def test_flat_ensemble_single_row(trained_pipeline, network_data):
+    model = trained_pipeline.named_steps["model"]
+    ensemble = FlatTreeEnsemble.from_model(model)
+    X = trained_pipeline[:-1].transform(network_data.drop("congestion", axis=1))[:20]
+
+    single = [ensemble.raw_predict_one(row.astype(np.float32)) for row in X]
+    np.testing.assert_allclose(single, ensemble.raw_predict(X), rtol=1e-12)
+
+
+def test_flat_ensemble_rejects_wrong_shape(trained_pipeline):
+    ensemble = FlatTreeEnsemble.from_model(trained_pipeline.named_steps["model"])
+    with pytest.raises(ValueError):
+        ensemble.raw_predict(np.zeros((3, ensemble.n_features + 1)))
@@ -1,26 +1,56 @@
+import argparse
+
 import pandas as pd
 
-from core.trainer import TrafficModelTrainer
+from core.data_loader import iter_chunks
+from core.forecaster import train_forecaster
+from core.trainer import PROJECT_ROOT, TrafficModelTrainer
+
+DEFAULT_DATA_FILE = "assets/datasets/synthetic_network_data.csv"
 
 
-def train_model():
+def train_model(data_file: str = DEFAULT_DATA_FILE, incremental: bool = False):
     """Script to train the model."""
-    print("🔄 Training model...")
+    print("🔄 Retraining model..." if incremental else "🔄 Training model...")
 
-    # Load and check data
-    data_file = "assets/datasets/synthetic_network_data.csv"
-    df = pd.read_csv(data_file)
-    print(f"\nDataset shape: {df.shape}")
-    print(f"Congestion distribution:\n{df['congestion'].value_counts()}")
+    # Check data by streaming only the label column
+    counts = pd.Series(dtype="int64")
+    for chunk in iter_chunks(data_file, usecols=["congestion"]):
+        counts = counts.add(chunk["congestion"].value_counts(), fill_value=0)
+    counts = counts.astype("int64").rename_axis("congestion").rename("count")
+    print(f"\nDataset rows: {counts.sum()}")
+    print(f"Congestion distribution:\n{counts}")
 
     trainer = TrafficModelTrainer()
-    metrics = trainer.train(data_file)
+    if incremental:
+        metrics = trainer.train_incremental(data_file)
+    else:
+        metrics = trainer.train(data_file)
 
     print("\n✅ Model trained successfully!")
+    if trainer.version:
+        print(f"Registered as model {trainer.version}")
     print("\nModel Performance Metrics:")
     for metric, value in metrics.items():
         print(f"{metric}: {value:.3f}")
 
+    if not incremental and (trainer.config.get("forecast") or {}).get("enabled"):
+        print("\n🔄 Training congestion forecaster...")
+        forecast_metrics = train_forecaster(trainer.config, PROJECT_ROOT / data_file)
+        print("\nForecast Mean Absolute Error:")
+        for metric, value in forecast_metrics.items():
+            print(f"{metric}: {value:.3f}")
+
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the congestion model.")
+    parser.add_argument(
+        "--data", type=str, default=DEFAULT_DATA_FILE, help="Training CSV path."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Add trees to the saved model using only this data.",
+    )
+    args = parser.parse_args()
+    train_model(args.data, incremental=args.incremental)
@@ -0,0 +1,151 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from .email_service import EmailService
+
+_STOP = object()
+
+
+class AlertDispatcher:
+    """Delivers alert emails from a background thread.
+
+    ``submit`` only enqueues and never blocks the request handler. The queue
+    is bounded: when it is full the alert is dropped and counted rather than
+    holding up the response, so a slow or unreachable SMTP server cannot back
+    up into request latency. A single worker thread drains the queue through
+    ``EmailService.notify``, which deduplicates and rate-limits alerts, and
+    checks for due digests every ``flush_interval`` seconds.
+
+    The thread is started lazily in the process that submits, so an instance
+    created before gunicorn forks gets its own worker in each child.
+    """
+
+    def __init__(
+        self,
+        email_service: EmailService,
+        max_queue: int = 1000,
+        flush_interval: float = 5.0,
+    ):
+        if max_queue <= 0:
+            raise ValueError("Alert queue size must be positive")
+        self.email_service = email_service
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._counts = {
+            "submitted": 0,
+            "sent": 0,
+            "digested": 0,
+            "digests_sent": 0,
+            "failed": 0,
+            "dropped": 0,
+        }
+        atexit.register(self.stop)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self._counts[name] += n
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Alerts and counts from before a fork belong to the parent
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._counts = dict.fromkeys(self._counts, 0)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="alert-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, recipient: str, prediction_data: Dict[str, Any]) -> bool:
+        """Queue an alert; returns False if it was dropped because the queue is full."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((recipient, dict(prediction_data)))
+        except queue.Full:
+            self._count("dropped")
+            logger.warning(
+                f"Alert queue full ({self.max_queue}), dropping alert for {recipient}"
+            )
+            return False
+        self._count("submitted")
+        return True
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if item is not None:
+                try:
+                    if item is _STOP:
+                        self._flush(force=True)
+                        return
+                    recipient, prediction_data = item
+                    self._count(self.email_service.notify(recipient, prediction_data))
+                except Exception as e:
+                    self._count("failed")
+                    logger.error(f"Alert delivery failed: {e}")
+                finally:
+                    self._queue.task_done()
+
+            # Check digests on a timer, even while the queue stays busy
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush()
+                last_flush = time.monotonic()
+
+    def _flush(self, force: bool = False) -> None:
+        try:
+            self._count("digests_sent", self.email_service.flush_due(force=force))
+        except Exception as e:
+            logger.error(f"Alert digest delivery failed: {e}")
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued alert has been processed; False on timeout."""
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Deliver what is already queued and any pending digests, then stop."""
+        with self._start_lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._thread = None
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Alert queue still full at shutdown, abandoning alerts")
+            return
+        thread.join(timeout)
+        self.email_service.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Delivery counters plus the current queue depth."""
+        with self._stats_lock:
+            counts = dict(self._counts)
+        counts["queued"] = self._queue.qsize()
+        counts["max_queue"] = self.max_queue
+        return counts
@@ -4,16 +4,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 import os
+import time
 from typing import Any, Dict
 
-import pandas as pd
 from dotenv import load_dotenv
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, Response, g, jsonify, render_template, request
 from flask_cors import CORS
 from loguru import logger
 
-from core.predictor import TrafficPredictor
+from core.metrics import REGISTRY
+from core.predictor import STAGE_SECONDS, TrafficPredictor
+from core.schema import SchemaError
 
+from .alert_queue import AlertDispatcher
 from .email_service import EmailService
 
 load_dotenv()
@@ -21,7 +24,93 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 predictor = TrafficPredictor()
-email_service = EmailService()
+email_service = EmailService(
+    window_seconds=float(os.getenv("ALERT_WINDOW_SECONDS", 300)),
+    burst=int(os.getenv("ALERT_BURST", 5)),
+    rate_per_minute=float(os.getenv("ALERT_RATE_PER_MINUTE", 1)),
+)
+alert_dispatcher = AlertDispatcher(
+    email_service, max_queue=int(os.getenv("ALERT_QUEUE_SIZE", 1000))
+)
+
+
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests served.", ("endpoint", "method", "status")
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "http_request_errors_total", "HTTP responses with status >= 400.", ("endpoint",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("endpoint",)
+)
+_ALERT_ENQUEUE = STAGE_SECONDS.labels("alert_enqueue")
+
+for _name, _help in (
+    ("model_load_seconds", "Time taken to load the model being served."),
+    ("model_info", "The model being served; the value is always 1."),
+    ("model_reloads_total", "Models hot-swapped since the process started."),
+):
+    REGISTRY.callback(
+        _name,
+        _help,
+        lambda name=_name: predictor.metric_samples()[name],
+        kind="counter" if _name.endswith("_total") else "gauge",
+    )
+REGISTRY.callback(
+    "alerts_queued",
+    "Alerts waiting in the delivery queue.",
+    lambda: [({}, alert_dispatcher.stats()["queued"])],
+)
+REGISTRY.callback(
+    "alerts_total",
+    "Alerts by outcome.",
+    lambda: [
+        ({"outcome": outcome}, value)
+        for outcome, value in alert_dispatcher.stats().items()
+        if outcome not in ("queued", "max_queue")
+    ],
+    kind="counter",
+)
+REGISTRY.callback(
+    "prediction_cache_events_total",
+    "Prediction cache lookups and removals by kind.",
+    lambda: (
+        [
+            ({"event": event}, predictor.cache.stats()[event])
+            for event in ("hits", "misses", "evictions", "expirations", "invalidations")
+        ]
+        if predictor.cache is not None
+        else []
+    ),
+    kind="counter",
+)
+
+
+@app.before_request
+def before_request():
+    """Start the request timer and this process's model watcher (once)."""
+    g.request_start = time.perf_counter()
+    predictor.start_watcher()
+
+
+@app.after_request
+def record_request(response):
+    start = g.get("request_start")
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        if response.status_code >= 400:
+            REQUEST_ERRORS.inc(endpoint)
+    return response
+
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition of this process's metrics."""
+    return Response(
+        REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 @app.route("/")
@@ -30,16 +119,108 @@ def index():
     return render_template("index.html")
 
 
+@app.route("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz")
+def readyz():
+    """Readiness: the model is loaded and has scored a warm-up record."""
+    if not predictor.ready:
+        try:
+            predictor.warm_up()
+        except Exception as e:
+            logger.error(f"Readiness check failed: {e}")
+            return jsonify({"status": "unavailable", "error": str(e)}), 503
+    return jsonify(
+        {
+            "status": "ready",
+            "engine": predictor.inference_engine,
+            "model_version": predictor.model_version,
+        }
+    )
+
+
+@app.route("/api/alerts/stats")
+def alert_stats():
+    """Alert queue depth and delivery/drop counters."""
+    return jsonify(alert_dispatcher.stats())
+
+
+@app.route("/api/cache/stats")
+def cache_stats():
+    """Prediction cache counters, or enabled: false when the cache is off."""
+    if predictor.cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **predictor.cache.stats()})
+
+
+@app.route("/api/models")
+def models():
+    """The served model, shadow and A/B models, and registry aliases."""
+    return jsonify(predictor.model_stats())
+
+
+@app.route("/api/forecast")
+def forecast():
+    """Forecast congestion for the next intervals from recently scored flows."""
+    if predictor.forecaster is None:
+        return jsonify({"error": "Forecasting is not enabled"}), 404
+    return jsonify(predictor.forecaster.forecast())
+
+
 @app.route("/api/predict", methods=["POST"])
 def api_predict():
     try:
         data = request.get_json()
         result = predictor.predict(data)
         return jsonify(result)
+    except SchemaError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
+@app.route("/api/predict/batch", methods=["POST"])
+def api_predict_batch():
+    """Score a list of flow records in one vectorized pass."""
+    data = request.get_json(silent=True)
+    records = data.get("records") if isinstance(data, dict) else data
+    if not isinstance(records, list):
+        return (
+            jsonify({"error": "Expected a JSON list of records or {'records': [...]}"}),
+            400,
+        )
+
+    if len(records) > predictor.max_batch_size:
+        return (
+            jsonify(
+                {
+                    "error": f"Batch of {len(records)} records exceeds the limit "
+                    f"of {predictor.max_batch_size}"
+                }
+            ),
+            413,
+        )
+
+    try:
+        results = predictor.predict_batch(records)
+    except Exception as e:
+        logger.error(f"Batch prediction API error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+    n_invalid = sum(1 for result in results if "error" in result)
+    return jsonify(
+        {
+            "results": results,
+            "n_valid": len(results) - n_invalid,
+            "n_invalid": n_invalid,
+        }
+    )
+
+
 @app.route("/dashboard", methods=["GET"])
 def dashboard():
     return render_template("dashboard.html")
@@ -54,10 +235,15 @@ def predict():
 
         result = predictor.predict(data)
 
-        # Send email alert if congestion predicted with high probability
+        # Queue an email alert if congestion predicted with high probability;
+        # delivery happens off the request thread
         alert_email = os.getenv("ALERT_EMAIL")
         if alert_email and result["congestion"] and result["probability"] > 0.9:
-            email_service.send_alert(recipient=alert_email, prediction_data=result)
+            start = time.perf_counter()
+            alert_dispatcher.submit(
+                recipient=alert_email, prediction_data={**data, **result}
+            )
+            _ALERT_ENQUEUE.observe(time.perf_counter() - start)
 
         return (
             jsonify(
@@ -69,6 +255,8 @@ def predict():
             200,
         )
 
+    except SchemaError as e:
+        return jsonify({"error": str(e), "errors": e.errors}), 400
     except Exception as e:
         logger.error(f"Prediction API error: {e}")
         return jsonify({"error": str(e)}), 500
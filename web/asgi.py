@@ -0,0 +1,267 @@
+"""Async ASGI front end for the prediction API with micro-batching.
+
+Serves the JSON routes of ``web.app`` (not the HTML pages) with the same
+predictor, alert queue and metrics. Concurrent ``/api/predict`` and
+``/predict`` requests are coalesced by a ``MicroBatcher`` into vectorized
+``predict_batch`` calls, which do not use the prediction cache. Run with gunicorn's ASGI worker (gunicorn 24.0+):
+
+    gunicorn -c gunicorn.conf.py -k asgi web.asgi:app
+
+or set ``server.asgi: true`` in the config and use ``python run.py serve``.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import yaml
+from loguru import logger
+
+from core.metrics import REGISTRY
+from core.predictor import PROJECT_ROOT
+from core.schema import SchemaError
+
+from .app import (
+    _ALERT_ENQUEUE,
+    REQUEST_ERRORS,
+    REQUEST_SECONDS,
+    REQUESTS,
+    alert_dispatcher,
+    predictor,
+)
+from .micro_batcher import MicroBatcher
+
+Response = Tuple[int, Any]
+Handler = Callable[[Any], Awaitable[Response]]
+
+
+def _build_batcher() -> MicroBatcher:
+    """Batch limits from the ``server.microbatch`` section of the model config."""
+    config_path = os.getenv("MODEL_CONFIG", str(PROJECT_ROOT / "core" / "config.yaml"))
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f) or {}
+    settings = (config.get("server") or {}).get("microbatch") or {}
+    return MicroBatcher(
+        predictor.predict_batch,
+        max_batch_size=int(settings.get("max_batch_size", 64)),
+        max_wait_ms=float(settings.get("max_wait_ms", 2.0)),
+    )
+
+
+batcher = _build_batcher()
+
+
+class BadRequest(Exception):
+    pass
+
+
+async def _score(data: Any) -> Dict[str, Any]:
+    """Score one record through the batcher; invalid records raise SchemaError."""
+    result = await batcher.submit(data)
+    if "error" in result:
+        raise SchemaError(result["errors"])
+    return {"congestion": result["congestion"], "probability": result["probability"]}
+
+
+async def healthz(body: Any) -> Response:
+    return 200, {"status": "ok"}
+
+
+async def readyz(body: Any) -> Response:
+    if not predictor.ready:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, predictor.warm_up)
+        except Exception as e:
+            logger.error(f"Readiness check failed: {e}")
+            return 503, {"status": "unavailable", "error": str(e)}
+    return 200, {
+        "status": "ready",
+        "engine": predictor.inference_engine,
+        "model_version": predictor.model_version,
+    }
+
+
+async def metrics(body: Any) -> Response:
+    return 200, REGISTRY.render()
+
+
+async def alert_stats(body: Any) -> Response:
+    return 200, alert_dispatcher.stats()
+
+
+async def cache_stats(body: Any) -> Response:
+    if predictor.cache is None:
+        return 200, {"enabled": False}
+    return 200, {"enabled": True, **predictor.cache.stats()}
+
+
+async def batch_stats(body: Any) -> Response:
+    return 200, batcher.stats()
+
+
+async def models(body: Any) -> Response:
+    return 200, predictor.model_stats()
+
+
+async def forecast(body: Any) -> Response:
+    if predictor.forecaster is None:
+        return 404, {"error": "Forecasting is not enabled"}
+    return 200, predictor.forecaster.forecast()
+
+
+async def api_predict(body: Any) -> Response:
+    try:
+        return 200, await _score(body)
+    except SchemaError as e:
+        return 400, {"error": str(e), "errors": e.errors}
+    except Exception as e:
+        return 400, {"error": str(e)}
+
+
+async def api_predict_batch(body: Any) -> Response:
+    """Score a list of flow records in one vectorized pass."""
+    records = body.get("records") if isinstance(body, dict) else body
+    if not isinstance(records, list):
+        return 400, {"error": "Expected a JSON list of records or {'records': [...]}"}
+    if len(records) > predictor.max_batch_size:
+        return 413, {
+            "error": f"Batch of {len(records)} records exceeds the limit "
+            f"of {predictor.max_batch_size}"
+        }
+
+    try:
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, predictor.predict_batch, records
+        )
+    except Exception as e:
+        logger.error(f"Batch prediction API error: {e}")
+        return 500, {"error": str(e)}
+
+    n_invalid = sum(1 for result in results if "error" in result)
+    return 200, {
+        "results": results,
+        "n_valid": len(results) - n_invalid,
+        "n_invalid": n_invalid,
+    }
+
+
+async def predict(body: Any) -> Response:
+    """Dashboard predictions, with the same high-probability alerts as Flask."""
+    try:
+        result = await _score(body)
+        alert_email = os.getenv("ALERT_EMAIL")
+        if alert_email and result["congestion"] and result["probability"] > 0.9:
+            start = time.perf_counter()
+            alert_dispatcher.submit(
+                recipient=alert_email, prediction_data={**body, **result}
+            )
+            _ALERT_ENQUEUE.observe(time.perf_counter() - start)
+        return 200, result
+    except SchemaError as e:
+        return 400, {"error": str(e), "errors": e.errors}
+    except Exception as e:
+        logger.error(f"Prediction API error: {e}")
+        return 500, {"error": str(e)}
+
+
+ROUTES: Dict[Tuple[str, str], Handler] = {
+    ("GET", "/healthz"): healthz,
+    ("GET", "/readyz"): readyz,
+    ("GET", "/metrics"): metrics,
+    ("GET", "/api/alerts/stats"): alert_stats,
+    ("GET", "/api/cache/stats"): cache_stats,
+    ("GET", "/api/batching/stats"): batch_stats,
+    ("GET", "/api/models"): models,
+    ("GET", "/api/forecast"): forecast,
+    ("POST", "/api/predict"): api_predict,
+    ("POST", "/api/predict/batch"): api_predict_batch,
+    ("POST", "/predict"): predict,
+}
+PATHS = {path for _, path in ROUTES}
+
+
+async def _read_json(receive) -> Any:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ConnectionError("client disconnected")
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    payload = b"".join(chunks)
+    if not payload:
+        return None
+    try:
+        return json.loads(payload)
+    except ValueError as e:
+        raise BadRequest(f"Invalid JSON body: {e}")
+
+
+async def _send(send, status: int, payload: Any) -> None:
+    if isinstance(payload, str):
+        body = payload.encode()
+        content_type = b"text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload).encode()
+        content_type = b"application/json"
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+                (b"access-control-allow-origin", b"*"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await batcher.stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    start = time.perf_counter()
+    predictor.start_watcher()
+    method, path = scope["method"], scope["path"]
+    handler = ROUTES.get((method, path))
+    endpoint = path if path in PATHS else "unmatched"
+    try:
+        if handler is None:
+            status, payload = (
+                (405, {"error": "Method not allowed"})
+                if path in PATHS
+                else (404, {"error": "Not found"})
+            )
+        else:
+            status, payload = await handler(
+                await _read_json(receive) if method == "POST" else None
+            )
+    except BadRequest as e:
+        status, payload = 400, {"error": str(e)}
+    except ConnectionError:
+        return
+
+    await _send(send, status, payload)
+    REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+    REQUESTS.inc(endpoint, method, str(status))
+    if status >= 400:
+        REQUEST_ERRORS.inc(endpoint)
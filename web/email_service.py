@@ -1,9 +1,12 @@
 import os
 import smtplib
+import socket
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from loguru import logger
@@ -12,34 +15,150 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 load_dotenv(dotenv_path=PROJECT_ROOT / ".env")
 
+# Errors after which the cached connection is discarded and reopened once;
+# other SMTPExceptions (also OSErrors) are delivery failures, not retried
+CONNECTION_ERRORS = (
+    smtplib.SMTPServerDisconnected,
+    ConnectionError,
+    socket.timeout,
+    socket.gaierror,
+)
+
+AlertKey = Tuple[Any, Any, Any]
+
+
+def alert_key(prediction_data: Dict[str, Any]) -> AlertKey:
+    """Alerts for the same protocol, service and hour describe one episode."""
+    return (
+        prediction_data.get("protocol"),
+        prediction_data.get("service"),
+        prediction_data.get("hour"),
+    )
+
+
+class TokenBucket:
+    """Allows bursts of ``capacity`` events, refilled at ``rate`` per second."""
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
 
 class EmailService:
-    """Handles sending congestion alert emails"""
+    """Handles sending congestion alert emails over one persistent connection.
 
-    def __init__(self):
-        pass
+    The SMTP session (connect, STARTTLS, login) is opened on first use and
+    kept for later alerts. A connection idle for longer than
+    ``idle_check_seconds`` is probed with ``NOOP`` before reuse, and a send
+    that fails because the server dropped the session reconnects and retries
+    once.
 
-    def send_alert(self, recipient: str, prediction_data: Dict[str, Any]) -> bool:
-        """Send congestion alert email"""
-        smtp_server = os.getenv("SMTP_SERVER")
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_password = os.getenv("SMTP_PASSWORD")
+    ``notify`` adds deduplication and rate limiting on top of ``send_alert``:
+    the first alert for a (protocol, service, hour) key in a window of
+    ``window_seconds`` is sent at once if the recipient's token bucket
+    (``burst`` tokens, refilled at ``rate_per_minute``) allows it. Repeats
+    and rate-limited alerts are folded into a per-recipient digest that
+    ``flush_due`` sends once its window has elapsed, so a storm costs one
+    email per key plus one digest per window rather than one per request.
+    """
 
-        if not smtp_server or not smtp_user or not smtp_password or not recipient:
-            logger.warning(
-                "Email alerts disabled - SMTP credentials or recipient not configured"
-            )
-            return False
+    def __init__(
+        self,
+        idle_check_seconds: float = 60.0,
+        timeout: float = 10.0,
+        window_seconds: float = 300.0,
+        burst: int = 5,
+        rate_per_minute: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self.rate_per_minute = rate_per_minute
+        self.clock = clock
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self._alerts_lock = threading.Lock()
+        # (recipient, key) -> start of the window in which key was last sent
+        self._windows: Dict[Tuple[str, AlertKey], float] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        # recipient -> {"start": t, "entries": {key: summary}}
+        self._digests: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _settings() -> Dict[str, Any]:
+        return {
+            "server": os.getenv("SMTP_SERVER"),
+            "port": int(os.getenv("SMTP_PORT", 587)),
+            "user": os.getenv("SMTP_USER"),
+            "password": os.getenv("SMTP_PASSWORD"),
+            "starttls": os.getenv("SMTP_STARTTLS", "true").lower() == "true",
+        }
 
-        smtp_port = int(os.getenv("SMTP_PORT", 587))
+    def _connect(self, settings: Dict[str, Any]) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(settings["server"], settings["port"], timeout=self.timeout)
+        try:
+            if settings["starttls"]:
+                smtp.starttls()
+            smtp.login(settings["user"], settings["password"])
+        except Exception:
+            smtp.close()
+            raise
+        logger.info(f"Opened SMTP connection to {settings['server']}")
+        return smtp
+
+    def _connection(self, settings: Dict[str, Any]) -> smtplib.SMTP:
+        """Return the cached connection, probing it if it has been idle."""
+        if (
+            self._smtp is not None
+            and time.monotonic() - self._last_used > self.idle_check_seconds
+        ):
+            try:
+                if self._smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except CONNECTION_ERRORS + (smtplib.SMTPException,):
+                self._discard()
+
+        if self._smtp is None:
+            self._smtp = self._connect(settings)
+        return self._smtp
 
+    def _discard(self) -> None:
+        if self._smtp is None:
+            return
         try:
-            msg = MIMEMultipart()
-            msg["From"] = smtp_user
-            msg["To"] = recipient
-            msg["Subject"] = "Network Congestion Alert"
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+    def close(self) -> None:
+        """Close the persistent SMTP connection, if any."""
+        with self._lock:
+            self._discard()
+
+    @staticmethod
+    def build_message(
+        sender: str, recipient: str, prediction_data: Dict[str, Any]
+    ) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg["From"] = sender
+        msg["To"] = recipient
+        msg["Subject"] = "Network Congestion Alert"
 
-            body = f"""
+        body = f"""
             <h1>Network Congestion Predicted</h1>
             <p>High probability of network congestion detected:</p>
             <ul>
@@ -54,16 +173,153 @@ class EmailService:
             </ul>
             """
 
-            msg.attach(MIMEText(body, "html"))
+        msg.attach(MIMEText(body, "html"))
+        return msg
 
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
+    @staticmethod
+    def build_digest(
+        sender: str,
+        recipient: str,
+        entries: List[Dict[str, Any]],
+        window_seconds: float,
+    ) -> MIMEMultipart:
+        msg = MIMEMultipart()
+        msg["From"] = sender
+        msg["To"] = recipient
+        total = sum(entry["count"] for entry in entries)
+        msg["Subject"] = f"Network Congestion Alert Digest ({total} alerts)"
 
-            logger.success(f"Alert email sent to {recipient}")
+        rows = "".join(f"""
+                <tr>
+                    <td>{entry['protocol']}</td>
+                    <td>{entry['service']}</td>
+                    <td>{entry['hour']}</td>
+                    <td>{entry['count']}</td>
+                    <td>{entry['max_probability']:.2%}</td>
+                </tr>""" for entry in entries)
+        body = f"""
+            <h1>Network Congestion Digest</h1>
+            <p>{total} further high-probability alerts in the last
+            {window_seconds / 60:.0f} minutes:</p>
+            <table>
+                <tr>
+                    <th>Protocol</th><th>Service</th><th>Hour</th>
+                    <th>Alerts</th><th>Max Probability</th>
+                </tr>{rows}
+            </table>
+            """
+
+        msg.attach(MIMEText(body, "html"))
+        return msg
+
+    def _deliver(
+        self, recipient: str, build: Callable[[str], MIMEMultipart], kind: str
+    ) -> bool:
+        """Send the message built for ``recipient`` over the shared connection."""
+        settings = self._settings()
+        if (
+            not settings["server"]
+            or not settings["user"]
+            or not settings["password"]
+            or not recipient
+        ):
+            logger.warning(
+                "Email alerts disabled - SMTP credentials or recipient not configured"
+            )
+            return False
+
+        try:
+            msg = build(settings["user"])
+
+            with self._lock:
+                try:
+                    self._connection(settings).send_message(msg)
+                except CONNECTION_ERRORS as e:
+                    logger.warning(f"SMTP connection lost ({e}), reconnecting")
+                    self._discard()
+                    self._connection(settings).send_message(msg)
+                self._last_used = time.monotonic()
+
+            logger.success(f"{kind} sent to {recipient}")
             return True
 
         except Exception as e:
-            logger.error(f"Failed to send alert email: {e}")
+            logger.error(f"Failed to send {kind.lower()}: {e}")
+            with self._lock:
+                self._discard()
             return False
+
+    def send_alert(self, recipient: str, prediction_data: Dict[str, Any]) -> bool:
+        """Send congestion alert email"""
+        return self._deliver(
+            recipient,
+            lambda sender: self.build_message(sender, recipient, prediction_data),
+            "Alert email",
+        )
+
+    def notify(self, recipient: str, prediction_data: Dict[str, Any]) -> str:
+        """Send or fold one alert; returns ``sent``, ``digested`` or ``failed``."""
+        key = alert_key(prediction_data)
+        now = self.clock()
+        with self._alerts_lock:
+            started = self._windows.get((recipient, key))
+            fresh = started is None or now - started >= self.window_seconds
+            bucket = self._buckets.get(recipient)
+            if bucket is None:
+                bucket = self._buckets[recipient] = TokenBucket(
+                    self.burst, self.rate_per_minute / 60.0, now
+                )
+            if fresh and bucket.take(now):
+                self._windows[(recipient, key)] = now
+            else:
+                self._add_to_digest(recipient, key, prediction_data, now)
+                return "digested"
+
+        return "sent" if self.send_alert(recipient, prediction_data) else "failed"
+
+    def _add_to_digest(
+        self, recipient: str, key: AlertKey, prediction_data: Dict[str, Any], now: float
+    ) -> None:
+        digest = self._digests.setdefault(recipient, {"start": now, "entries": {}})
+        entry = digest["entries"].get(key)
+        if entry is None:
+            protocol, service, hour = key
+            entry = digest["entries"][key] = {
+                "protocol": protocol,
+                "service": service,
+                "hour": hour,
+                "count": 0,
+                "max_probability": 0.0,
+            }
+        entry["count"] += 1
+        entry["max_probability"] = max(
+            entry["max_probability"], float(prediction_data.get("probability", 0.0))
+        )
+
+    def flush_due(self, force: bool = False) -> int:
+        """Send every digest whose window has elapsed; returns how many were sent."""
+        now = self.clock()
+        with self._alerts_lock:
+            due = [
+                recipient
+                for recipient, digest in self._digests.items()
+                if force or now - digest["start"] >= self.window_seconds
+            ]
+            batches = [(r, list(self._digests.pop(r)["entries"].values())) for r in due]
+            # Forget dedup windows that can no longer suppress anything
+            self._windows = {
+                key: started
+                for key, started in self._windows.items()
+                if now - started < self.window_seconds
+            }
+
+        sent = 0
+        for recipient, entries in batches:
+            sent += self._deliver(
+                recipient,
+                lambda sender: self.build_digest(
+                    sender, recipient, entries, self.window_seconds
+                ),
+                "Alert digest",
+            )
+        return sent
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.metrics import REGISTRY
+from core.predictor import STAGE_SECONDS
+
+BATCH_SIZE = REGISTRY.histogram(
+    "predictor_microbatch_size",
+    "Requests coalesced into each micro-batched predict_batch call.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+).labels()
+_BATCH_WAIT = STAGE_SECONDS.labels("batch_wait")
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-record predictions into batch calls.
+
+    ``submit`` parks a record with a future on the running event loop. A
+    collector task takes whatever is pending once ``max_batch_size`` records
+    have arrived or the oldest has waited ``max_wait_ms``, scores them with
+    one ``predict_batch`` call on an executor thread, and resolves each
+    future with its own result. Records that arrive while a batch is being
+    scored form the next one, so batches grow with load while the added
+    latency stays bounded by the wait budget plus one batch.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Dict[str, Any]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        executor: Optional[Executor] = None,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.batches = 0
+        self.records = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _ensure_started(self) -> None:
+        """Start the collector on the running loop (again after a fork or new loop)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._pending: List[Tuple[Any, asyncio.Future, float]] = []
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = loop.create_task(self._collect())
+
+    async def submit(self, record: Any) -> Dict[str, Any]:
+        """Score one record as part of the next batch; returns its result."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._pending.append((record, future, time.perf_counter()))
+        if len(self._pending) == 1:
+            self._wakeup.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _collect(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending:
+                continue
+            # The wait budget runs from the oldest request's arrival
+            remaining = self._pending[0][2] + self.max_wait - time.perf_counter()
+            if len(self._pending) < self.max_batch_size and remaining > 0:
+                try:
+                    await asyncio.wait_for(self._full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            if self._pending:
+                self._wakeup.set()
+                if len(self._pending) >= self.max_batch_size:
+                    self._full.set()
+            await self._score(batch)
+
+    async def _score(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, arrived in batch:
+            _BATCH_WAIT.observe(started - arrived)
+        BATCH_SIZE.observe(len(batch))
+        self.batches += 1
+        self.records += len(batch)
+
+        records = [record for record, _, _ in batch]
+        try:
+            results = await self._loop.run_in_executor(
+                self.executor, self.predict_batch, records
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            # A client that disconnected has cancelled its future
+            if not future.done():
+                future.set_result(result)
+
+    async def stop(self) -> None:
+        """Cancel the collector and fail any requests still waiting."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for _, future, _ in self._pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Server is shutting down"))
+        self._pending = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "mean_batch_size": self.records / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }